@@ -0,0 +1,333 @@
+# applications/assessment_grading.py
+import asyncio
+import hashlib
+import json
+import logging
+import time
+
+from django.conf import settings
+from postgrest.exceptions import APIError as PostgrestAPIError
+
+from .assessment_questions import load_job_assessment_questions
+from .metrics import RPC_FALLBACKS
+from .supabase_client import async_supabase, supabase
+
+logger = logging.getLogger(__name__)
+
+# Daftar jenis pertanyaan yang membutuhkan review manual
+MANUAL_REVIEW_TYPES = ['ESSAY', 'FILE_UPLOAD', 'CODING_CHALLENGE']
+FULL_SCORE = 100
+# Status yang menandakan pelamar pernah submit sehingga mungkin ada jawaban lama
+SUBMITTED_STATUSES = ('Assessment - Completed', 'Assessment - Needs Review', 'Lolos Assessment', 'Gagal Assessment')
+# Kode PostgREST bila fungsi RPC belum dibuat (lihat applications/sql/)
+FUNCTION_NOT_FOUND = 'PGRST202'
+
+
+class QuestionNotFound(Exception):
+    def __init__(self, question_id):
+        super().__init__(f"Question with ID {question_id} not found.")
+        self.question_id = question_id
+
+
+def parse_choice_set(value):
+    """
+    Menormalkan jawaban/solusi pilihan ganda menjadi set string. Menerima list,
+    string JSON ('["A", "B"]' dari AssessmentPage), literal array Postgres
+    ('{A,B}') atau satu nilai tunggal.
+    """
+    if value is None:
+        return set()
+    if isinstance(value, (list, tuple, set)):
+        return {str(item).strip() for item in value}
+    text = str(value).strip()
+    if text.startswith('['):
+        try:
+            return parse_choice_set(json.loads(text))
+        except ValueError:
+            pass
+    if text.startswith('{') and text.endswith('}'):
+        return {item.strip().strip('"') for item in text[1:-1].split(',') if item.strip()}
+    return {text} if text else set()
+
+
+def grade_single_choice(answer, solution):
+    if answer == solution:
+        return True, FULL_SCORE
+    return False, 0
+
+
+def grade_multiple_choice(answer, solution):
+    selected = parse_choice_set(answer)
+    expected = parse_choice_set(solution)
+    if selected == expected:
+        return True, FULL_SCORE
+    if settings.ASSESSMENT_MULTIPLE_CHOICE_SCORING == 'partial' and expected:
+        # Pilihan benar menambah nilai, pilihan salah menguranginya; minimal 0
+        earned = len(selected & expected) - len(selected - expected)
+        return False, max(0, round(FULL_SCORE * earned / len(expected)))
+    return False, 0
+
+
+def grade_integer_input(answer, solution):
+    try:
+        if int(answer) == int(solution):
+            return True, FULL_SCORE
+        return False, 0
+    except (ValueError, TypeError):
+        return False, 0
+
+
+# question_type -> grader(answer, solution) -> (is_correct, score)
+GRADERS = {
+    'SINGLE_CHOICE': grade_single_choice,
+    'MULTIPLE_CHOICE': grade_multiple_choice,
+    'INTEGER_INPUT': grade_integer_input,
+}
+
+
+def fetch_question_metadata(job_id, question_ids):
+    """
+    Mengambil question_type dan solution untuk semua pertanyaan yang dijawab.
+    Pertanyaan job diambil dari cache pertanyaan asesmen; sisanya (mis. pertanyaan
+    yang sudah dilepas dari job) diambil dengan satu query `in`.
+    """
+    metadata = {}
+    if job_id:
+        payload, _etag = load_job_assessment_questions(job_id)
+        for question in (payload or {}).get('questions', []):
+            metadata[str(question['id'])] = question
+
+    missing_ids = [question_id for question_id in question_ids if question_id not in metadata]
+    if missing_ids:
+        rows = supabase.from_('questions').select('id, question_type, solution').in_('id', missing_ids).execute().data
+        for question in rows or []:
+            metadata[str(question['id'])] = question
+
+    _require_all(metadata, question_ids)
+    return metadata
+
+
+def _require_all(metadata, question_ids):
+    for question_id in question_ids:
+        if question_id not in metadata:
+            raise QuestionNotFound(question_id)
+
+
+async def afetch_question_metadata(question_ids):
+    """
+    Versi async untuk submit asesmen: tidak menunggu job_id pelamar untuk memakai
+    cache pertanyaan, melainkan satu query `in` yang dijalankan bersamaan dengan
+    pembacaan pelamar.
+    """
+    metadata = {}
+    if question_ids:
+        rows = (await async_supabase.from_('questions').select('id, question_type, solution').in_('id', question_ids).execute()).data
+        for question in rows or []:
+            metadata[str(question['id'])] = question
+    _require_all(metadata, question_ids)
+    return metadata
+
+
+def grade_answers(applicant_id, answers, questions):
+    """
+    Menilai semua jawaban sekaligus. Mengembalikan (rows untuk assessment_answers,
+    total skor otomatis, perlu review manual).
+    """
+    rows = []
+    total_score = 0
+    requires_manual_review = False
+    for question_id, answer_text in answers.items():
+        question = questions[str(question_id)]
+        question_type = question.get('question_type')
+        is_correct, answer_score = None, 0
+        if question_type in MANUAL_REVIEW_TYPES:
+            requires_manual_review = True
+        elif question_type in GRADERS:
+            is_correct, answer_score = GRADERS[question_type](answer_text, question.get('solution'))
+
+        total_score += answer_score
+        rows.append({
+            'applicant_id': str(applicant_id),
+            'question_id': str(question_id),
+            'answer': answer_text,
+            'is_correct': is_correct,
+            'score': answer_score,
+        })
+    return rows, total_score, requires_manual_review
+
+
+def save_answers(applicant_data, rows):
+    """
+    Menyimpan jawaban dengan satu upsert pada (applicant_id, question_id). Jawaban lama
+    untuk pertanyaan yang kini tidak dijawab hanya perlu dihapus bila pelamar pernah
+    submit sebelumnya.
+    """
+    applicant_id = str(applicant_data['id'])
+    if rows:
+        supabase.from_('assessment_answers').upsert(rows, on_conflict='applicant_id,question_id').execute()
+    if applicant_data.get('status') in SUBMITTED_STATUSES:
+        stale = supabase.from_('assessment_answers').delete().eq('applicant_id', applicant_id)
+        if rows:
+            stale = stale.not_.in_('question_id', [row['question_id'] for row in rows])
+        stale.execute()
+
+
+async def asave_answers(applicant_data, rows):
+    """Versi async save_answers; penghapusan jawaban lama tidak menyentuh baris yang di-upsert."""
+    applicant_id = str(applicant_data['id'])
+    writes = []
+    if rows:
+        writes.append(async_supabase.from_('assessment_answers').upsert(rows, on_conflict='applicant_id,question_id').execute())
+    if applicant_data.get('status') in SUBMITTED_STATUSES:
+        stale = async_supabase.from_('assessment_answers').delete().eq('applicant_id', applicant_id)
+        if rows:
+            stale = stale.not_.in_('question_id', [row['question_id'] for row in rows])
+        writes.append(stale.execute())
+    await asyncio.gather(*writes)
+
+
+def make_idempotency_key(applicant_id, answers, client_key=None):
+    """
+    Key dari header Idempotency-Key bila klien mengirimnya. Tanpa header, key diturunkan
+    dari pelamar + isi jawaban sehingga klik ganda dengan jawaban yang sama tetap
+    dianggap satu submit.
+    """
+    if client_key:
+        return f"{applicant_id}:{client_key}"
+    body = json.dumps(answers, sort_keys=True, default=str).encode('utf-8')
+    return f"{applicant_id}:{hashlib.sha256(body).hexdigest()}"
+
+
+def _submit_rpc_missing(error):
+    """
+    RPC submit_assessment_answers belum dibuat. Jalur pengganti tidak atomik dan tidak
+    idempoten, jadi selalu dicatat sebagai error + metrik; bila
+    ASSESSMENT_SUBMIT_RPC_FALLBACK dimatikan, error aslinya diteruskan (fail closed).
+    """
+    RPC_FALLBACKS.labels(function='submit_assessment_answers').inc()
+    if not settings.ASSESSMENT_SUBMIT_RPC_FALLBACK:
+        logger.error(f"[ASSESSMENT] RPC submit_assessment_answers belum ada, submit ditolak: {error.message}")
+        raise error
+    logger.error(f"[ASSESSMENT] RPC submit_assessment_answers belum ada, menyimpan tanpa transaksi: {error.message}")
+
+
+def submit_graded_answers(applicant_data, rows, new_status, response_body, idempotency_key):
+    """
+    Menulis jawaban + status pelamar dalam satu transaksi lewat RPC
+    submit_assessment_answers. Mengembalikan (respons, replayed); bila key sudah
+    pernah dipakai, respons tersimpan dikembalikan tanpa menulis ulang.
+    """
+    applicant_id = str(applicant_data['id'])
+    try:
+        result = supabase.rpc('submit_assessment_answers', {
+            'p_applicant_id': applicant_id,
+            'p_idempotency_key': idempotency_key,
+            'p_answers': rows,
+            'p_status': new_status,
+            'p_response': response_body,
+        }).execute().data
+    except PostgrestAPIError as e:
+        if e.code != FUNCTION_NOT_FOUND:
+            raise
+        _submit_rpc_missing(e)
+        save_answers(applicant_data, rows)
+        supabase.from_('applicants').update({'status': new_status}).eq('id', applicant_id).execute()
+        return response_body, False
+    return result['response'], result['replayed']
+
+
+async def asubmit_graded_answers(applicant_data, rows, new_status, response_body, idempotency_key):
+    """Versi async submit_graded_answers (RPC yang sama, fallback tanpa transaksi yang sama)."""
+    applicant_id = str(applicant_data['id'])
+    try:
+        result = (await async_supabase.rpc('submit_assessment_answers', {
+            'p_applicant_id': applicant_id,
+            'p_idempotency_key': idempotency_key,
+            'p_answers': rows,
+            'p_status': new_status,
+            'p_response': response_body,
+        }).execute()).data
+    except PostgrestAPIError as e:
+        if e.code != FUNCTION_NOT_FOUND:
+            raise
+        _submit_rpc_missing(e)
+        await asyncio.gather(
+            asave_answers(applicant_data, rows),
+            async_supabase.from_('applicants').update({'status': new_status}).eq('id', applicant_id).execute(),
+        )
+        return response_body, False
+    return result['response'], result['replayed']
+
+
+def normalize_manual_scores(manual_scores):
+    """Mengubah {question_id: skor} dari reviewer menjadi baris untuk RPC."""
+    rows = []
+    for question_id, score in manual_scores.items():
+        try:
+            numeric_score = float(score) if score is not None else 0
+        except (ValueError, TypeError):
+            numeric_score = 0
+        rows.append({
+            'question_id': str(question_id),
+            'score': int(numeric_score),
+            'is_correct': numeric_score > 0,
+        })
+    return rows
+
+
+def _finalize_review_per_question(applicant_id, score_rows):
+    """Jalur lama bila RPC belum dibuat: satu update per pertanyaan + satu select."""
+    for row in score_rows:
+        supabase.from_('assessment_answers').update({
+            'score': row['score'],
+            'is_correct': row['is_correct'],
+        }).eq('applicant_id', applicant_id).eq('question_id', row['question_id']).execute()
+
+    answers = supabase.from_('assessment_answers').select('score').eq('applicant_id', applicant_id).execute().data or []
+    final_score = 0
+    for ans in answers:
+        try:
+            final_score += float(ans['score']) if ans['score'] is not None else 0
+        except (ValueError, TypeError):
+            continue
+    final_score = int(final_score)
+    new_status = 'Lolos Assessment' if final_score * 3 >= len(answers) * 100 * 2 else 'Gagal Assessment'
+    supabase.from_('applicants').update({
+        'status': new_status,
+        'final_score': final_score,
+    }).eq('id', applicant_id).execute()
+    return {'final_score': final_score, 'total_questions': len(answers), 'new_status': new_status}, len(score_rows) + 2
+
+
+def finalize_review(applicant_id, manual_scores):
+    """
+    Menerapkan semua nilai manual dan menghitung skor akhir + status dalam satu
+    panggilan RPC finalize_assessment_review. Mengembalikan dict hasil dengan
+    `final_score`, `total_questions`, `new_status` dan `timing`.
+    """
+    applicant_id = str(applicant_id)
+    score_rows = normalize_manual_scores(manual_scores)
+    started = time.perf_counter()
+    try:
+        result = supabase.rpc('finalize_assessment_review', {
+            'p_applicant_id': applicant_id,
+            'p_scores': score_rows,
+        }).execute().data
+        round_trips = 1
+    except PostgrestAPIError as e:
+        if e.code != FUNCTION_NOT_FOUND:
+            raise
+        logger.warning(f"[REVIEW] RPC finalize_assessment_review belum ada, memakai update per pertanyaan: {e.message}")
+        result, round_trips = _finalize_review_per_question(applicant_id, score_rows)
+
+    elapsed_ms = (time.perf_counter() - started) * 1000
+    # Alur lama: update per pertanyaan + select skor + select question_id + update pelamar
+    legacy_round_trips = len(score_rows) + 3
+    logger.info(f"[REVIEW] Pelamar {applicant_id}: {len(score_rows)} nilai manual, {round_trips} round trip "
+                f"(alur lama {legacy_round_trips}), {elapsed_ms:.1f} ms")
+    result['timing'] = {
+        'elapsed_ms': round(elapsed_ms, 1),
+        'round_trips': round_trips,
+        'legacy_round_trips': legacy_round_trips,
+    }
+    return result
@@ -0,0 +1,256 @@
+# applications/assessment_questions.py
+import asyncio
+import hashlib
+import json
+import logging
+import uuid
+
+from django.conf import settings
+from django.core.cache import cache
+from postgrest.exceptions import APIError as PostgrestAPIError
+
+from .supabase_client import async_supabase, supabase
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_DURATION = 60
+# Kode PostgREST bila relasi untuk embed tidak ditemukan di schema cache
+RELATIONSHIP_NOT_FOUND = 'PGRST200'
+
+JOB_QUESTIONS_SELECT = (
+    'assessment_template_id, custom_fields, assessment_details, '
+    'assessment_templates(template_questions(questions(*))), '
+    'job_custom_questions(questions(*))'
+)
+
+
+def _version_key(kind, object_id):
+    return f"assessment-questions:version:{kind}:{object_id}"
+
+
+def _entry_key(job_id, job_version):
+    return f"assessment-questions:{job_id}:{job_version}"
+
+
+def _version(kind, object_id):
+    """Versi saat ini untuk job/template; dibuat bila belum ada."""
+    key = _version_key(kind, object_id)
+    version = cache.get(key)
+    if version is None:
+        version = uuid.uuid4().hex
+        if not cache.add(key, version, None):
+            version = cache.get(key, version)
+    return version
+
+
+async def _aversion(kind, object_id):
+    key = _version_key(kind, object_id)
+    version = await cache.aget(key)
+    if version is None:
+        version = uuid.uuid4().hex
+        if not await cache.aadd(key, version, None):
+            version = await cache.aget(key, version)
+    return version
+
+
+def _bump(kind, object_id):
+    cache.set(_version_key(kind, object_id), uuid.uuid4().hex, None)
+
+
+def invalidate_job_questions(job_id):
+    """Dipanggil saat job atau pertanyaan kustomnya berubah."""
+    _bump('job', job_id)
+
+
+def invalidate_template_questions(template_id):
+    """Dipanggil saat isi template berubah; semua job yang memakainya ikut kedaluwarsa."""
+    _bump('template', template_id)
+
+
+def make_etag(payload):
+    body = json.dumps(payload, sort_keys=True, default=str).encode('utf-8')
+    return '"' + hashlib.sha256(body).hexdigest()[:32] + '"'
+
+
+def _append_unique(questions, seen, question):
+    if question and question.get('id') not in seen:
+        seen.add(question.get('id'))
+        questions.append(question)
+
+
+def _legacy_custom_ids(custom_fields):
+    # Format lama: custom_fields = {"custom_questions": [id, ...]}
+    if isinstance(custom_fields, dict):
+        return custom_fields.get('custom_questions') or []
+    return []
+
+
+def _embedded_questions(job_data):
+    """Pertanyaan dari hasil embed: template dulu, lalu pertanyaan kustom job."""
+    questions, seen = [], set()
+    template = job_data.get('assessment_templates') or {}
+    for link in template.get('template_questions') or []:
+        _append_unique(questions, seen, link.get('questions'))
+    for link in job_data.get('job_custom_questions') or []:
+        _append_unique(questions, seen, link.get('questions'))
+    return questions, seen
+
+
+def _resolve_questions(job_data):
+    questions, seen = _embedded_questions(job_data)
+    missing_ids = [qid for qid in _legacy_custom_ids(job_data.get('custom_fields')) if qid not in seen]
+    if missing_ids:
+        for question in supabase.from_('questions').select('*').in_('id', missing_ids).execute().data or []:
+            _append_unique(questions, seen, question)
+    return questions
+
+
+def _fetch_job_sequential(job_id):
+    """
+    Jalur cadangan bila relasi embed belum dikenal PostgREST (mis. foreign key
+    job_custom_questions belum dibuat): query terpisah seperti versi lama.
+    """
+    rows = supabase.from_('jobs').select('assessment_template_id, custom_fields, assessment_details').eq('id', job_id).execute().data
+    if not rows:
+        return None
+    job_data = rows[0]
+    template_id = job_data.get('assessment_template_id')
+    if template_id:
+        links = supabase.from_('template_questions').select('questions(*)').eq('template_id', template_id).execute().data
+        job_data['assessment_templates'] = {'template_questions': links or []}
+    return job_data
+
+
+def _fetch_job(job_id):
+    try:
+        rows = supabase.from_('jobs').select(JOB_QUESTIONS_SELECT).eq('id', job_id).execute().data
+    except PostgrestAPIError as e:
+        if e.code != RELATIONSHIP_NOT_FOUND:
+            raise
+        logger.warning(f"[ASSESSMENT] Embed pertanyaan tidak tersedia, memakai query terpisah: {e.message}")
+        return _fetch_job_sequential(job_id)
+    return rows[0] if rows else None
+
+
+def _make_entry(job_data, questions):
+    assessment_details = job_data.get('assessment_details')
+    duration = DEFAULT_DURATION
+    if isinstance(assessment_details, dict):
+        duration = assessment_details.get('duration', DEFAULT_DURATION)
+    payload = {'questions': questions, 'duration': duration}
+    return {
+        'template_id': job_data.get('assessment_template_id'),
+        'payload': payload,
+        'etag': make_etag(payload),
+    }
+
+
+def _build_entry(job_id):
+    job_data = _fetch_job(job_id)
+    if job_data is None:
+        return None
+    return _make_entry(job_data, _resolve_questions(job_data))
+
+
+def load_job_assessment_questions(job_id):
+    """
+    Mengembalikan (payload, etag) untuk halaman asesmen, atau (None, None) bila job
+    tidak ada. Hasil disimpan per (job, versi job, versi template); perubahan lewat
+    backend langsung membuat entri lama tidak terpakai, sedangkan perubahan job
+    yang ditulis langsung ke Supabase tertangkap paling lambat setelah
+    ASSESSMENT_QUESTIONS_CACHE_TTL detik.
+    """
+    job_id = str(job_id)
+    key = _entry_key(job_id, _version('job', job_id))
+    entry = cache.get(key)
+    if entry is not None:
+        template_id = entry['template_id']
+        if not template_id or entry['template_version'] == _version('template', template_id):
+            return entry['payload'], entry['etag']
+
+    entry = _build_entry(job_id)
+    if entry is None:
+        return None, None
+    template_id = entry['template_id']
+    entry['template_version'] = _version('template', template_id) if template_id else None
+    cache.set(key, entry, settings.ASSESSMENT_QUESTIONS_CACHE_TTL)
+    return entry['payload'], entry['etag']
+
+
+async def _aquestions_by_id(question_ids):
+    if not question_ids:
+        return []
+    return (await async_supabase.from_('questions').select('*').in_('id', question_ids).execute()).data or []
+
+
+async def _atemplate_links(template_id):
+    if not template_id:
+        return []
+    return (await async_supabase.from_('template_questions').select('questions(*)').eq('template_id', template_id).execute()).data or []
+
+
+async def _afetch_job_sequential(job_id):
+    """
+    Versi async _fetch_job_sequential. Pertanyaan template dan pertanyaan kustom
+    format lama sama-sama hanya bergantung pada baris job, jadi keduanya dibaca
+    bersamaan.
+    """
+    rows = (await async_supabase.from_('jobs').select('assessment_template_id, custom_fields, assessment_details').eq('id', job_id).execute()).data
+    if not rows:
+        return None, None
+    job_data = rows[0]
+    links, legacy_questions = await asyncio.gather(
+        _atemplate_links(job_data.get('assessment_template_id')),
+        _aquestions_by_id(_legacy_custom_ids(job_data.get('custom_fields'))),
+    )
+    job_data['assessment_templates'] = {'template_questions': links}
+    questions, seen = _embedded_questions(job_data)
+    for question in legacy_questions:
+        _append_unique(questions, seen, question)
+    return job_data, questions
+
+
+async def _afetch_job(job_id):
+    """(job_data, pertanyaan) seperti _fetch_job + _resolve_questions, atau (None, None)."""
+    try:
+        rows = (await async_supabase.from_('jobs').select(JOB_QUESTIONS_SELECT).eq('id', job_id).execute()).data
+    except PostgrestAPIError as e:
+        if e.code != RELATIONSHIP_NOT_FOUND:
+            raise
+        logger.warning(f"[ASSESSMENT] Embed pertanyaan tidak tersedia, memakai query terpisah: {e.message}")
+        return await _afetch_job_sequential(job_id)
+    if not rows:
+        return None, None
+    job_data = rows[0]
+    questions, seen = _embedded_questions(job_data)
+    missing_ids = [qid for qid in _legacy_custom_ids(job_data.get('custom_fields')) if qid not in seen]
+    for question in await _aquestions_by_id(missing_ids):
+        _append_unique(questions, seen, question)
+    return job_data, questions
+
+
+async def aload_job_assessment_questions(job_id):
+    """Versi async load_job_assessment_questions untuk view ASGI (cache dan key yang sama)."""
+    job_id = str(job_id)
+    key = _entry_key(job_id, await _aversion('job', job_id))
+    entry = await cache.aget(key)
+    if entry is not None:
+        template_id = entry['template_id']
+        if not template_id or entry['template_version'] == await _aversion('template', template_id):
+            return entry['payload'], entry['etag']
+
+    job_data, questions = await _afetch_job(job_id)
+    if job_data is None:
+        return None, None
+    entry = _make_entry(job_data, questions)
+    template_id = entry['template_id']
+    entry['template_version'] = await _aversion('template', template_id) if template_id else None
+    await cache.aset(key, entry, settings.ASSESSMENT_QUESTIONS_CACHE_TTL)
+    return entry['payload'], entry['etag']
+
+
+def etag_matches(if_none_match, etag):
+    if not if_none_match:
+        return False
+    candidates = [value.strip() for value in if_none_match.split(',')]
+    return '*' in candidates or etag in candidates or f"W/{etag}" in candidates
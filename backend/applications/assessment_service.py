@@ -0,0 +1,121 @@
+# applications/assessment_service.py
+import asyncio
+
+from applications.assessment_grading import (
+    MANUAL_REVIEW_TYPES, afetch_question_metadata, asubmit_graded_answers, fetch_question_metadata, finalize_review,
+    grade_answers, make_idempotency_key, submit_graded_answers,
+)
+from applications.assessment_questions import aload_job_assessment_questions, load_job_assessment_questions
+from applications.profiling import DB_READ, DB_WRITE, GRADE, stage, staged
+from applications.screening_service import ApplicantNotFound
+from applications.supabase_client import async_supabase, supabase
+
+
+def get_job_questions(job_id):
+    """(payload, etag) pertanyaan asesmen job, atau (None, None) bila job tidak ada."""
+    with stage(DB_READ, table='jobs', cached=True):
+        return load_job_assessment_questions(job_id)
+
+
+async def aget_job_questions(job_id):
+    with stage(DB_READ, table='jobs', cached=True):
+        return await aload_job_assessment_questions(job_id)
+
+
+def _fetch_applicant(applicant_id, columns):
+    with stage(DB_READ, table='applicants'):
+        applicant_data = supabase.from_('applicants').select(columns).eq('id', str(applicant_id)).single().execute().data
+    if not applicant_data:
+        raise ApplicantNotFound(f"Pelamar dengan ID '{applicant_id}' tidak ditemukan.")
+    return applicant_data
+
+
+def submit_assessment(applicant_id, answers, client_idempotency_key=None):
+    """
+    Menilai dan menyimpan jawaban asesmen pelamar. Mengembalikan (hasil, replayed).
+    QuestionNotFound naik ke pemanggil bila ada jawaban untuk pertanyaan yang tidak ada.
+    """
+    applicant_id = str(applicant_id)
+    applicant_data = _fetch_applicant(applicant_id, 'id, job_id, status')
+    answers = answers or {}
+
+    with stage(GRADE, answers=len(answers)):
+        questions = fetch_question_metadata(applicant_data.get('job_id'), [str(question_id) for question_id in answers])
+        rows, total_score, requires_manual_review = grade_answers(applicant_id, answers, questions)
+
+    new_status, result = _submission_result(total_score, requires_manual_review)
+    # Jawaban + status ditulis atomik; submit ulang dengan key yang sama memakai hasil tersimpan
+    idempotency_key = make_idempotency_key(applicant_id, answers, client_idempotency_key)
+    with stage(DB_WRITE, table='assessment_answers', rows=len(rows)):
+        return submit_graded_answers(applicant_data, rows, new_status, result, idempotency_key)
+
+
+def _submission_result(total_score, requires_manual_review):
+    new_status = 'Assessment - Needs Review' if requires_manual_review else 'Assessment - Completed'
+    return new_status, {
+        "message": "Assessment submitted successfully.",
+        "status": new_status,
+        "total_score_auto_graded": total_score
+    }
+
+
+async def asubmit_assessment(applicant_id, answers, client_idempotency_key=None):
+    """
+    Versi async submit_assessment: pelamar dan metadata pertanyaan dibaca bersamaan,
+    lalu dinilai dan disimpan lewat RPC yang sama.
+    """
+    applicant_id = str(applicant_id)
+    answers = answers or {}
+    applicant_response, questions = await asyncio.gather(
+        staged(DB_READ, async_supabase.from_('applicants').select('id, job_id, status').eq('id', applicant_id).single().execute(), table='applicants'),
+        staged(DB_READ, afetch_question_metadata([str(question_id) for question_id in answers]), table='questions'),
+    )
+    applicant_data = applicant_response.data
+    if not applicant_data:
+        raise ApplicantNotFound(f"Pelamar dengan ID '{applicant_id}' tidak ditemukan.")
+
+    with stage(GRADE, answers=len(answers)):
+        rows, total_score, requires_manual_review = grade_answers(applicant_id, answers, questions)
+
+    new_status, result = _submission_result(total_score, requires_manual_review)
+    idempotency_key = make_idempotency_key(applicant_id, answers, client_idempotency_key)
+    with stage(DB_WRITE, table='assessment_answers', rows=len(rows)):
+        return await asubmit_graded_answers(applicant_data, rows, new_status, result, idempotency_key)
+
+
+def get_review(applicant_id):
+    """Jawaban yang perlu dinilai manual dan hasil penilaian otomatis untuk halaman review."""
+    applicant_data = _fetch_applicant(applicant_id, 'name')
+    with stage(DB_READ, table='assessment_answers'):
+        all_answers = supabase.from_('assessment_answers').select('*, question:questions(*)').eq('applicant_id', str(applicant_id)).execute().data
+
+    answers_to_review = []
+    auto_graded_scores = []
+    for ans in all_answers:
+        question_type = ans['question']['question_type']
+        if question_type in MANUAL_REVIEW_TYPES:
+            answers_to_review.append({
+                'question_id': ans['question']['id'],
+                'question_text': ans['question']['text'],
+                'answer': ans['answer'],
+                'type': question_type,
+            })
+        else:
+            auto_graded_scores.append({
+                'question_text': ans['question']['text'],
+                'score': ans['score'],
+                'is_correct': ans['is_correct']
+            })
+
+    return {
+        'applicant_name': applicant_data['name'],
+        'answers_to_review': answers_to_review,
+        'auto_graded_scores': auto_graded_scores
+    }
+
+
+def complete_review(applicant_id, manual_scores):
+    """Menerapkan nilai manual dan menetapkan status akhir asesmen (satu RPC)."""
+    _fetch_applicant(applicant_id, 'id')
+    with stage(DB_WRITE, table='assessment_answers', rows=len(manual_scores)):
+        return finalize_review(applicant_id, manual_scores)
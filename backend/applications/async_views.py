@@ -0,0 +1,180 @@
+# applications/async_views.py
+# Varian async (ASGI) untuk endpoint yang hampir seluruh waktunya menunggu Supabase.
+# Dipasang urls.py bila ASYNC_VIEWS aktif (default saat dijalankan lewat backend.asgi);
+# URL, nama route, payload dan kode status sama dengan versi sync di views.py.
+import asyncio
+import json
+import logging
+
+import httpx
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.http import HttpResponse, JsonResponse
+from django.views.decorators.csrf import csrf_exempt
+from django.views.decorators.http import require_GET, require_POST
+from postgrest.exceptions import APIError as PostgrestAPIError
+
+from applications import assessment_service
+from applications.assessment_grading import QuestionNotFound
+from applications.assessment_questions import etag_matches
+from applications.cv_storage import aprobe_cv_size
+from applications.profiling import DB_READ, DB_WRITE, DOWNLOAD, staged
+from applications.scheduling_service import aschedule_job_interviews
+from applications.screening_queue import get_queue
+from applications.screening_service import ApplicantNotFound
+from applications.supabase_client import async_supabase
+
+logger = logging.getLogger(__name__)
+
+
+@csrf_exempt
+@require_GET
+async def get_job_assessment_questions(request, job_id):
+    try:
+        payload, etag = await assessment_service.aget_job_questions(job_id)
+        if payload is None:
+            return JsonResponse({"error": "Job not found - no data returned."}, status=404)
+
+        if etag_matches(request.headers.get('If-None-Match'), etag):
+            response = HttpResponse(status=304)
+        else:
+            response = JsonResponse(payload, status=200)
+        response['ETag'] = etag
+        response['Cache-Control'] = 'private, no-cache'
+        return response
+
+    except PostgrestAPIError as e:
+        logger.error(f"Error Supabase saat mengambil pertanyaan job: {e.message}")
+        return JsonResponse({"error": f"Error Supabase: {e.message}"}, status=500)
+    except Exception as e:
+        logger.error(f"Error tak terduga: {e}", exc_info=True)
+        return JsonResponse({"error": f"Unexpected error: {str(e)}"}, status=500)
+
+
+async def _cv_size(cv_path):
+    """Ukuran CV di storage, atau None bila tidak diketahui; kegagalan probe tidak menggagalkan lamaran."""
+    if not cv_path or not isinstance(cv_path, str):
+        return None
+    try:
+        return await aprobe_cv_size(cv_path)
+    except httpx.HTTPError as e:
+        logger.warning(f"[APPLY] Ukuran CV '{cv_path}' tidak bisa diperiksa: {e}")
+        return None
+
+
+@csrf_exempt
+async def apply(request):
+    if request.method != 'POST':
+        return HttpResponse(status=405)
+    logger.debug("[APPLY] Menerima permintaan lamaran baru.")
+    try:
+        data = json.loads(request.body)
+        name = data.get('name')
+        email = data.get('email')
+        job_id = data.get('job_id')
+        user_id = data.get('user_id')
+        uploaded_files = data.get('uploaded_files')
+        company = data.get('company')
+        custom_answers = data.get('custom_answers', {})
+
+        if not all([job_id, name, email]):
+            logger.info("[APPLY] Gagal: Data yang dibutuhkan (job_id, name, email) tidak lengkap.")
+            return JsonResponse({'error': 'Job ID, name, and email are required.'}, status=400)
+
+        # Job dan ukuran CV di storage diperiksa bersamaan; CV yang melebihi
+        # CV_MAX_BYTES ditolak sebelum pelamar disimpan, bukan baru gagal di worker.
+        cv_path = uploaded_files[0] if isinstance(uploaded_files, list) and uploaded_files else None
+        try:
+            job_data_response, cv_size = await asyncio.gather(
+                staged(DB_READ, async_supabase.from_('jobs').select('id').eq('id', job_id).single().execute(), table='jobs'),
+                staged(DOWNLOAD, _cv_size(cv_path), probe=True),
+            )
+            job_data = job_data_response.data
+        except PostgrestAPIError as e:
+            logger.error(f"[APPLY] Gagal: Error saat mengambil data job. {e.message}")
+            return JsonResponse({'error': f'Failed to fetch job: {e.message}'}, status=500)
+
+        if not job_data:
+            logger.info(f"[APPLY] Gagal: Lowongan dengan ID '{job_id}' tidak ditemukan.")
+            return JsonResponse({'error': 'Job not found.'}, status=404)
+
+        if cv_size and settings.CV_MAX_BYTES and cv_size > settings.CV_MAX_BYTES:
+            logger.info(f"[APPLY] Gagal: CV '{cv_path}' berukuran {cv_size} byte melebihi batas {settings.CV_MAX_BYTES}.")
+            return JsonResponse({'error': 'CV file is too large.'}, status=413)
+
+        applicant_status = 'Applied'
+        insert_data = {
+            'name': name,
+            'email': email,
+            'job_id': job_id,
+            'user_id': user_id,
+            'status': applicant_status,
+            'uploaded_files': uploaded_files,
+            'company': company,
+            'custom_answers': custom_answers,
+            'auto_screening_status': 'Pending',
+            'auto_screening_log': {},
+            'ai_score': None,
+            'final_score': None,
+            'gemini_reason': None
+        }
+        try:
+            insert_response = await staged(DB_WRITE, async_supabase.from_('applicants').insert(insert_data).execute(), table='applicants')
+            applicant_id = insert_response.data[0]['id']
+        except PostgrestAPIError as e:
+            logger.error(f"[APPLY] Gagal: Error saat menyimpan data ke Supabase. {e.message}")
+            return JsonResponse({'error': f'Failed to save application: {e.message}'}, status=500)
+
+        # Antrean screening memakai ORM Django (sync)
+        task_id = await sync_to_async(get_queue().enqueue)(applicant_id, job_id)
+        logger.info(f"[APPLY] Screening pelamar {applicant_id} masuk antrean (task {task_id}).")
+
+        return JsonResponse({
+            'message': 'Lamaran Anda berhasil dikirim!',
+            'applicant_id': applicant_id,
+            'task_id': task_id,
+            'screening_result': None,
+            'applicant_status': applicant_status,
+            'status_url': f'/api/applicants/{applicant_id}/screening-status/'
+        }, status=202)
+
+    except Exception as e:
+        logger.error(f"[APPLY] Terjadi kesalahan tak terduga: {e}", exc_info=True)
+        return JsonResponse({'error': str(e)}, status=500)
+
+
+@csrf_exempt
+@require_POST
+async def auto_schedule_interviews(request, job_id):
+    try:
+        payload, status_code = await aschedule_job_interviews(job_id)
+        return JsonResponse(payload, status=status_code)
+
+    except PostgrestAPIError as e:
+        logger.error(f"Error Supabase saat auto-scheduling: {e.message}")
+        return JsonResponse({"error": f"Error Supabase: {e.message}"}, status=500)
+    except Exception as e:
+        logger.error(f"Error tak terduga saat auto-scheduling: {e}")
+        return JsonResponse({"error": str(e)}, status=500)
+
+
+@csrf_exempt
+@require_POST
+async def submit_assessment(request, applicant_id):
+    try:
+        data = json.loads(request.body or b'{}')
+        result, replayed = await assessment_service.asubmit_assessment(
+            applicant_id, data.get('answers'), request.headers.get('Idempotency-Key'),
+        )
+        response = JsonResponse(result, status=201)
+        if replayed:
+            response['Idempotent-Replayed'] = 'true'
+        return response
+
+    except ApplicantNotFound:
+        return JsonResponse({"error": "Applicant not found."}, status=404)
+    except QuestionNotFound as e:
+        return JsonResponse({"error": str(e)}, status=404)
+    except Exception as e:
+        logger.error(f"Error saat submit assessment: {e}")
+        return JsonResponse({"error": str(e)}, status=500)
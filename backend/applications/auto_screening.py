@@ -1,7 +1,10 @@
 # applications/auto_screening.py
+import logging
 import re
 from .gemini_client import get_gemini_score
 
+logger = logging.getLogger(__name__)
+
 def preprocess_answers(job_custom_fields, raw_answers):
     processed_answers = raw_answers.copy()
     if not job_custom_fields or not raw_answers:
@@ -29,7 +32,7 @@ def run_auto_screening(job_custom_fields, applicant_answers, ai_score=None):
     }
     
     final_score = 0
-    print("\n[AUTO-SCREENING] Memulai proses screening otomatis...")
+    logger.debug("[AUTO-SCREENING] Memulai proses screening otomatis...")
 
     # Ambil ambang batas dari custom field
     score_threshold = 20  # default
@@ -44,7 +47,7 @@ def run_auto_screening(job_custom_fields, applicant_answers, ai_score=None):
     # Tambahkan skor AI sebagai bagian dari final_score (opsional)
     if ai_score is not None:
         final_score += ai_score
-        print(f"[AUTO-SCREENING] Menambahkan Skor AI: {ai_score}. Skor sementara: {final_score}")
+        logger.debug(f"[AUTO-SCREENING] Menambahkan Skor AI: {ai_score}. Skor sementara: {final_score}")
     else:
         log_message["Review"].append({"reason": "Tidak ada skor AI yang tersedia."})
 
@@ -72,7 +75,7 @@ def run_auto_screening(job_custom_fields, applicant_answers, ai_score=None):
         if label == 'ai_score_threshold':
             continue
 
-        print(f"[AUTO-SCREENING] Mengevaluasi kriteria: {label}")
+        logger.debug(f"[AUTO-SCREENING] Mengevaluasi kriteria: {label}")
         is_passed = False
         
         if required and (applicant_answer is None or applicant_answer == ''):
@@ -111,7 +114,7 @@ def run_auto_screening(job_custom_fields, applicant_answers, ai_score=None):
         if is_passed:
             point_gain = points_per_criteria
             final_score += point_gain
-            print(f"[AUTO-SCREENING] Kriteria '{label}' terpenuhi! +{point_gain} poin. Skor saat ini: {final_score}")
+            logger.debug(f"[AUTO-SCREENING] Kriteria '{label}' terpenuhi! +{point_gain} poin. Skor saat ini: {final_score}")
 
     # Evaluasi akhir pakai FINAL SCORE
     if final_score < score_threshold:
@@ -125,8 +128,7 @@ def run_auto_screening(job_custom_fields, applicant_answers, ai_score=None):
             "reason": f"Skor final ({final_score}) memenuhi ambang batas ({score_threshold})."
         })
         
-    print(f"[AUTO-SCREENING] Proses selesai. Status akhir: {status}")
-    print(f"[AUTO-SCREENING] Skor total final: {final_score}")
+    logger.debug(f"[AUTO-SCREENING] Proses selesai. Status akhir: {status}, skor total final: {final_score}")
 
     return {'status': status, 'log': log_message, 'ai_score': ai_score, 'final_score': final_score}
 
@@ -1,24 +1,33 @@
 from docx import Document
-import spacy
-import re
 import io
 import json
+import logging
 import os
-import pdfplumber
 import pypdf
+from .cv_patterns import extract_email, extract_phone, extract_experience_years, extract_projects_count
+from .keyword_matcher import KeywordMatcher
+from .model_registry import get_nlp
+
+logger = logging.getLogger(__name__)
 
 # Tentukan jalur file JSON secara relatif
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 KEYWORDS_FILE = os.path.join(BASE_DIR, 'data', 'keywords.json')
 
-# Muat model spaCy untuk ekstraksi entitas
-try:
-    nlp = spacy.load("en_core_web_sm")
-except OSError:
-    print("Downloading spaCy model 'en_core_web_sm'...")
-    from spacy.cli import download
-    download("en_core_web_sm")
-    nlp = spacy.load("en_core_web_sm")
+# Naikkan setiap kali logika ekstraksi/parsing berubah agar cache hasil parsing lama
+# (lihat parse_cache.py) tidak dipakai lagi.
+PARSER_VERSION = '6'
+
+# NER hanya dijalankan pada bagian awal CV, tempat nama dan lokasi kandidat
+# biasanya berada; sisa teks tetap dipakai untuk regex dan kata kunci.
+NER_HEADER_CHARS = int(os.environ.get('CV_NER_HEADER_CHARS', '1500'))
+
+# Batas ekstraksi: PDF portofolio ratusan halaman tidak boleh menahan worker. CV
+# jarang lebih dari beberapa halaman; 0 berarti tanpa batas.
+CV_PDF_MAX_PAGES = int(os.environ.get('CV_PDF_MAX_PAGES', '10'))
+CV_TEXT_MAX_CHARS = int(os.environ.get('CV_TEXT_MAX_CHARS', '50000'))
+
+# Model spaCy untuk ekstraksi entitas dimuat saat pertama dipakai (lihat model_registry.py)
 
 # Muat kata kunci dari file JSON
 try:
@@ -34,39 +43,149 @@ except FileNotFoundError:
     EDUCATION_KEYWORDS = {}
     CERTIFICATION_KEYWORDS = []
 
-def extract_text_from_pdf(pdf_file_bytes):
-    text = ""
-    try:
-        # Coba menggunakan pypdf
-        reader = pypdf.PdfReader(io.BytesIO(pdf_file_bytes))
-        for page in reader.pages:
-            text += page.extract_text() or ""
-    except Exception as e:
-        print(f"Error extracting text with pypdf: {e}")
-        # Jika pypdf gagal, coba dengan pdfplumber
+# Bangun matcher sekali saat import agar setiap CV cukup di-scan satu kali
+KEYWORD_MATCHER = KeywordMatcher({
+    'skills': SKILL_KEYWORDS,
+    'education': EDUCATION_KEYWORDS.keys(),
+    'certifications': CERTIFICATION_KEYWORDS,
+})
+
+def _open_stream(source):
+    """Menerima bytes atau file-like biner (bisa di-seek) dan mengembalikan stream."""
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        return io.BytesIO(source)
+    source.seek(0)
+    return source
+
+
+class _PdfplumberPages:
+    """Membuka dokumen dengan pdfplumber hanya bila ada halaman yang gagal di pypdf."""
+
+    def __init__(self, source):
+        self.source = source
+        self._pdf = None
+
+    def extract(self, index):
         try:
-            with pdfplumber.open(io.BytesIO(pdf_file_bytes)) as pdf:
-                for page in pdf.pages:
-                    text += page.extract_text() or ""
+            if self._pdf is None:
+                import pdfplumber
+
+                self._pdf = pdfplumber.open(_open_stream(self.source))
+            return self._pdf.pages[index].extract_text() or ""
         except Exception as e:
-            print(f"Error extracting text with pdfplumber: {e}")
+            logger.warning(f"Error extracting text with pdfplumber (halaman {index + 1}): {e}")
             return None
-    return text
 
-def extract_text_from_docx(docx_file_bytes):
+    def page_count(self):
+        self.extract(0)
+        return len(self._pdf.pages) if self._pdf is not None else 0
+
+    def close(self):
+        if self._pdf is not None:
+            self._pdf.close()
+
+
+def iter_pdf_pages(source, max_pages=None):
+    """
+    Generator teks per halaman PDF. Halaman yang gagal di pypdf diambil ulang dengan
+    pdfplumber untuk halaman itu saja; halaman yang sudah berhasil tidak diproses
+    ulang. Bila pypdf tidak bisa membuka dokumen sama sekali, seluruh halaman
+    diambil lewat pdfplumber. Halaman yang gagal di keduanya menghasilkan None.
+    """
+    max_pages = CV_PDF_MAX_PAGES if max_pages is None else max_pages
+    fallback = _PdfplumberPages(source)
     try:
-        doc = Document(io.BytesIO(docx_file_bytes))
-        text = " ".join([para.text for para in doc.paragraphs])
-        return text
+        try:
+            reader = pypdf.PdfReader(_open_stream(source))
+            pages = reader.pages
+            page_count = len(pages)
+        except Exception as e:
+            logger.warning(f"Error extracting text with pypdf: {e}")
+            reader = None
+            page_count = fallback.page_count()
+
+        for index in range(min(page_count, max_pages) if max_pages else page_count):
+            text = None
+            if reader is not None:
+                try:
+                    text = pages[index].extract_text() or ""
+                except Exception as e:
+                    logger.warning(f"Error extracting text with pypdf (halaman {index + 1}): {e}")
+            if text is None:
+                text = fallback.extract(index)
+            yield text
+    finally:
+        fallback.close()
+
+
+def extract_text_from_pdf(pdf_file_bytes, max_pages=None, max_chars=None):
+    """
+    Mengumpulkan teks PDF halaman demi halaman dan berhenti lebih awal saat batas
+    halaman (CV_PDF_MAX_PAGES) atau karakter (CV_TEXT_MAX_CHARS) tercapai. Tidak ada
+    penghentian berdasarkan isi: skill dan pengalaman bisa muncul di halaman mana pun,
+    dan pencocokan kata kunci butuh seluruh teks sampai batas itu. Mengembalikan None
+    bila tidak ada satu halaman pun yang bisa dibaca.
+    """
+    max_chars = CV_TEXT_MAX_CHARS if max_chars is None else max_chars
+    parts = []
+    length = 0
+    readable = False
+    for page_text in iter_pdf_pages(pdf_file_bytes, max_pages=max_pages):
+        if page_text is None:
+            continue
+        readable = True
+        parts.append(page_text)
+        length += len(page_text)
+        if max_chars and length >= max_chars:
+            break
+    if not readable:
+        return None
+    text = "".join(parts)
+    return text[:max_chars] if max_chars else text
+
+
+def extract_text_from_docx(docx_file_bytes, max_chars=None):
+    max_chars = CV_TEXT_MAX_CHARS if max_chars is None else max_chars
+    try:
+        doc = Document(_open_stream(docx_file_bytes))
+        parts = []
+        length = 0
+        for para in doc.paragraphs:
+            parts.append(para.text)
+            length += len(para.text) + 1
+            if max_chars and length >= max_chars:
+                break
+        text = " ".join(parts)
+        return text[:max_chars] if max_chars else text
     except Exception as e:
-        print(f"Error extracting text from docx: {e}")
+        logger.warning(f"Error extracting text from docx: {e}")
         return None
 
 def parse_cv_text(text):
     if not text:
         return None
 
-    doc = nlp(text)
+    doc = get_nlp()(text[:NER_HEADER_CHARS])
+    return _parse_with_doc(text, doc)
+
+def parse_cv_texts(texts, batch_size=32, n_process=1):
+    """
+    Versi batch dari parse_cv_text untuk rescreen massal dan impor: NER untuk
+    semua CV dijalankan lewat nlp.pipe. Mengembalikan list dengan urutan yang sama
+    dengan input (None untuk teks kosong).
+    """
+    results = [None] * len(texts)
+    indexed = [(i, text) for i, text in enumerate(texts) if text]
+    if not indexed:
+        return results
+
+    headers = (text[:NER_HEADER_CHARS] for _i, text in indexed)
+    docs = get_nlp().pipe(headers, batch_size=batch_size, n_process=n_process)
+    for (i, text), doc in zip(indexed, docs):
+        results[i] = _parse_with_doc(text, doc)
+    return results
+
+def _parse_with_doc(text, doc):
     parsed_data = {
         'name': '',
         'email': '',
@@ -85,55 +204,31 @@ def parse_cv_text(text):
             parsed_data['name'] = ent.text
             break
 
-    # Ekstraksi Email
-    email_pattern = re.compile(r'[\w\.-]+@[\w\.-]+\.\w+')
-    email_match = email_pattern.search(text)
-    if email_match:
-        parsed_data['email'] = email_match.group(0)
-
-    # Ekstraksi Nomor Telepon
-    phone_pattern = re.compile(r'(\+\d{1,3}\s?)?(\d{3,4}[\s-]?\d{3,4}[\s-]?\d{4})')
-    phone_match = phone_pattern.search(text)
-    if phone_match:
-        parsed_data['phone_number'] = phone_match.group(0)
-
-    # Ekstraksi Tahun Pengalaman
-    experience_pattern = re.compile(r'(\d+)\s+(tahun|year)s?\\s+experience|experience\\s+of\\s+(\\d+)\\s+(year|tahun)s?|\\b(\\d+)\\s+(tahun|year|thn)\\b')
-    experience_match = experience_pattern.search(text)
-    if experience_match:
-        parsed_data['experience_years'] = int(experience_match.group(1))
+    # Ekstraksi Email, Nomor Telepon dan Tahun Pengalaman (pola dikompilasi di cv_patterns.py)
+    parsed_data['email'] = extract_email(text)
+    parsed_data['phone_number'] = extract_phone(text)
+    parsed_data['experience_years'] = extract_experience_years(text)
 
     # Ekstraksi Lokasi
     locations_in_text = [ent.text for ent in doc.ents if ent.label_ == "GPE"]
     if locations_in_text:
         parsed_data['location'] = locations_in_text[0]
         
-    # Ekstraksi Pendidikan
-    education_match = None
-    for keyword, value in EDUCATION_KEYWORDS.items():
-        if re.search(r'\b' + keyword + r'\b', text, re.IGNORECASE):
-            education_match = value
-            break
+    # Ekstraksi Pendidikan, Skills dan Sertifikasi dalam satu kali scan
+    keyword_hits = KEYWORD_MATCHER.find(text)
+
+    # Urutan di keywords.json menentukan prioritas pendidikan yang dipilih
+    found_education = keyword_hits.get('education', set())
+    education_match = next((value for keyword, value in EDUCATION_KEYWORDS.items() if keyword in found_education), None)
     if education_match:
         parsed_data['education'] = education_match
         
     # Ekstraksi Skills dan Projects Count
-    found_skills = set()
-    for keyword in SKILL_KEYWORDS:
-        if re.search(r'\b' + keyword + r'\b', text, re.IGNORECASE):
-            found_skills.add(keyword)
-    parsed_data['skills'] = list(found_skills)
+    parsed_data['skills'] = list(keyword_hits.get('skills', set()))
     
-    projects_pattern = re.compile(r'(\d+)\s+(project|proyek)s?', re.IGNORECASE)
-    projects_match = projects_pattern.search(text)
-    if projects_match:
-        parsed_data['projects_count'] = int(projects_match.group(1))
+    parsed_data['projects_count'] = extract_projects_count(text)
     
     # Ditambahkan: Ekstraksi Sertifikasi
-    found_certifications = set()
-    for keyword in CERTIFICATION_KEYWORDS:
-        if re.search(r'\b' + keyword + r'\b', text, re.IGNORECASE):
-            found_certifications.add(keyword)
-    parsed_data['certifications'] = list(found_certifications)
+    parsed_data['certifications'] = list(keyword_hits.get('certifications', set()))
 
     return parsed_data
\ No newline at end of file
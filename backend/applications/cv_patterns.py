@@ -0,0 +1,55 @@
+# applications/cv_patterns.py
+import re
+
+# Semua pola dikompilasi sekali saat modul dimuat dan memakai named group.
+
+EMAIL_PATTERN = re.compile(r'(?P<email>[\w\.-]+@[\w\.-]+\.\w+)')
+
+PHONE_PATTERN = re.compile(r'(?P<country_code>\+\d{1,3}\s?)?(?P<number>\d{3,4}[\s-]?\d{3,4}[\s-]?\d{4})')
+
+# Satuan tahun dalam bahasa Inggris dan Indonesia: "year(s)", "yr(s)", "tahun", "thn"
+_YEAR_UNIT = r'(?:tahun|thn|years?|yrs?)\.?'
+# Angka 1-2 digit yang tidak didahului digit/titik, agar "2019" atau "2.5" tidak terbaca
+_YEARS = r'(?<![\d.])(?P<{name}>\d{{1,2}})\+?'
+
+# Kata yang boleh muncul antara "pengalaman/experience" dan angkanya
+_EXPERIENCE_FILLER = r'(?:\s+(?:kerja|profesional|professional|of|selama|sekitar|about|over|lebih\s+dari|more\s+than))*'
+
+# Bentuk yang jelas menyebut pengalaman; dicari lebih dulu agar "usia 25 tahun" di
+# awal CV tidak mengalahkan "pengalaman 3 tahun" yang muncul belakangan.
+EXPERIENCE_PATTERN = re.compile(
+    # "5 years experience", "5+ years of experience", "3 tahun pengalaman"; satu baris
+    # saja, agar "Budi, 28 tahun\nExperience of 4 years" tidak terbaca 28
+    _YEARS.format(name='years_before') + r'\s*' + _YEAR_UNIT + r'[ \t]+(?:of[ \t]+)?(?:experience|pengalaman)\b'
+    # "experience of 5 years", "pengalaman selama 3 thn", "pengalaman kerja 5 tahun"
+    + r'|\b(?:experience|pengalaman)' + _EXPERIENCE_FILLER + r'\s+' + _YEARS.format(name='years_after') + r'\s*' + _YEAR_UNIT,
+    re.IGNORECASE,
+)
+
+# Bentuk umum: "5 tahun", "3 thn", "4 yrs"; hanya dipakai bila EXPERIENCE_PATTERN tidak cocok
+YEARS_PATTERN = re.compile(_YEARS.format(name='years') + r'\s*' + _YEAR_UNIT + r'(?!\w)', re.IGNORECASE)
+
+PROJECTS_PATTERN = re.compile(r'(?P<count>\d+)\s+(?:project|proyek)s?', re.IGNORECASE)
+
+
+def extract_email(text):
+    match = EMAIL_PATTERN.search(text)
+    return match.group('email') if match else ''
+
+
+def extract_phone(text):
+    match = PHONE_PATTERN.search(text)
+    return match.group(0) if match else ''
+
+
+def extract_experience_years(text):
+    match = EXPERIENCE_PATTERN.search(text)
+    if match:
+        return int(match.group('years_before') or match.group('years_after'))
+    match = YEARS_PATTERN.search(text)
+    return int(match.group('years')) if match else 0
+
+
+def extract_projects_count(text):
+    match = PROJECTS_PATTERN.search(text)
+    return int(match.group('count')) if match else 0
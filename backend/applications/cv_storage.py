@@ -0,0 +1,406 @@
+# applications/cv_storage.py
+import asyncio
+import hashlib
+import io
+import mmap
+import os
+import re
+import tempfile
+import threading
+import weakref
+from urllib.parse import quote
+
+from django.conf import settings
+
+from .parse_cache import make_digest_key
+from .supabase_client import build_async_http_client, build_http_client
+
+CV_BUCKET = 'candidate-uploads'
+
+_CONTENT_RANGE = re.compile(r'bytes (\d+)-(\d+)/(\d+|\*)')
+
+
+class CVTooLarge(ValueError):
+    pass
+
+
+_client = None
+_client_pid = None
+_client_lock = threading.Lock()
+
+
+def get_client():
+    """httpx.Client per proses (pool, retry dan hitungan round trip dari supabase_client)."""
+    global _client, _client_pid
+    if _client is None or _client_pid != os.getpid():
+        with _client_lock:
+            if _client is None or _client_pid != os.getpid():
+                _client = build_http_client(
+                    headers={'Authorization': f"Bearer {settings.SUPABASE_KEY}", 'apikey': settings.SUPABASE_KEY},
+                    timeout=settings.STORAGE_TIMEOUT,
+                )
+                _client_pid = os.getpid()
+    return _client
+
+
+_async_clients = weakref.WeakKeyDictionary()
+
+
+def get_async_client():
+    """httpx.AsyncClient per event loop untuk view async."""
+    loop = asyncio.get_running_loop()
+    client = _async_clients.get(loop)
+    if client is None:
+        client = _async_clients[loop] = build_async_http_client(
+            headers={'Authorization': f"Bearer {settings.SUPABASE_KEY}", 'apikey': settings.SUPABASE_KEY},
+            timeout=settings.STORAGE_TIMEOUT,
+        )
+    return client
+
+
+def object_url(cv_path, bucket=CV_BUCKET):
+    endpoint = settings.STORAGE_ENDPOINT or f"{settings.SUPABASE_URL.rstrip('/')}/storage/v1"
+    return f"{endpoint.rstrip('/')}/object/{bucket}/{quote(cv_path)}"
+
+
+def _check_size(size, max_bytes, cv_path):
+    if max_bytes and size > max_bytes:
+        raise CVTooLarge(f"File CV {cv_path} melebihi batas {max_bytes} byte.")
+
+
+class MappedStream(io.RawIOBase):
+    """mmap read-only dengan antarmuka file biner (zipfile/python-docx butuh seekable())."""
+
+    def __init__(self, mapped):
+        self._mmap = mapped
+
+    def readable(self):
+        return True
+
+    def seekable(self):
+        return True
+
+    def tell(self):
+        return self._mmap.tell()
+
+    def seek(self, offset, whence=io.SEEK_SET):
+        self._mmap.seek(offset, whence)
+        return self._mmap.tell()
+
+    def read(self, size=-1):
+        return self._mmap.read(-1 if size is None else size)
+
+    def readinto(self, buffer):
+        data = self._mmap.read(len(buffer))
+        buffer[:len(data)] = data
+        return len(data)
+
+
+class SpooledDocument:
+    """
+    CV yang diunduh utuh: di memori sampai CV_SPOOL_BYTES, selebihnya di file
+    sementara bernama (lihat path()). SHA-256 dihitung sambil mengunduh.
+    """
+
+    def __init__(self, cv_path, spool_bytes):
+        self.cv_path = cv_path
+        self.spool_bytes = spool_bytes
+        self.file = io.BytesIO()
+        self.size = 0
+        self._on_disk = False
+        self._sha256 = hashlib.sha256()
+        self._mmap = None
+
+    def write(self, chunk, max_bytes):
+        self.size += len(chunk)
+        _check_size(self.size, max_bytes, self.cv_path)
+        self._sha256.update(chunk)
+        if not self._on_disk and self.size > self.spool_bytes:
+            self._rollover()
+        self.file.write(chunk)
+
+    def _rollover(self):
+        spooled = self.file
+        self.file = tempfile.NamedTemporaryFile(prefix='roxy-cv-')
+        self.file.write(spooled.getbuffer())
+        self._on_disk = True
+
+    @property
+    def cache_key(self):
+        # Sama dengan make_cache_key(bytes) sehingga entri parse cache lama tetap terpakai
+        return make_digest_key(self._sha256.hexdigest())
+
+    def open(self):
+        """
+        Stream untuk parser tanpa menyalin seluruh isi: buffer spool itu sendiri bila
+        masih di memori, atau mmap read-only bila sudah dipindah ke disk.
+        """
+        if not self._on_disk or self.size == 0:
+            self.file.seek(0)
+            return self.file
+        if self._mmap is None:
+            # Buffer file sementara harus sampai ke OS sebelum di-mmap
+            self.file.flush()
+            self._mmap = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+        self._mmap.seek(0)
+        return MappedStream(self._mmap)
+
+    def getvalue(self):
+        self.file.seek(0)
+        return self.file.read()
+
+    def path(self):
+        """Path file sementara berisi dokumen; dokumen yang masih di memori ditulis ke disk dulu."""
+        if not self._on_disk:
+            self._rollover()
+        self.file.flush()
+        return self.file.name
+
+    def portable(self):
+        """Dokumen untuk proses lain (pool ekstraksi): hanya path, isinya di-mmap di sana."""
+        return LocalDocument(self.cv_path, self.path())
+
+    def close(self):
+        if self._mmap is not None:
+            self._mmap.close()
+            self._mmap = None
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class LocalDocument:
+    """
+    Dokumen di file lokal milik SpooledDocument proses induk. Yang di-pickle hanya
+    path; proses pool membuka dan me-mmap file itu sendiri. File tetap ada selama
+    SpooledDocument asalnya belum ditutup.
+    """
+
+    def __init__(self, cv_path, path):
+        self.cv_path = cv_path
+        self.path = path
+        self._file = None
+        self._mmap = None
+
+    def open(self):
+        if self._file is None:
+            self._file = open(self.path, 'rb')
+        if self._mmap is None and os.fstat(self._file.fileno()).st_size:
+            self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        if self._mmap is None:
+            self._file.seek(0)
+            return self._file
+        self._mmap.seek(0)
+        return MappedStream(self._mmap)
+
+    def __getstate__(self):
+        return {'cv_path': self.cv_path, 'path': self.path, '_file': None, '_mmap': None}
+
+    def close(self):
+        if self._mmap is not None:
+            self._mmap.close()
+            self._mmap = None
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class RangeReader(io.RawIOBase):
+    """
+    File-like read-only di atas HTTP Range: hanya blok yang benar-benar dibaca
+    parser (header, xref di akhir PDF, objek halaman awal) yang diunduh.
+    Total byte yang diambil tetap dibatasi `max_bytes`.
+    """
+
+    def __init__(self, document):
+        self.document = document
+        self._position = 0
+        self._blocks = {}
+        self.bytes_fetched = 0
+        self.requests = 0
+
+    def readable(self):
+        return True
+
+    def seekable(self):
+        return True
+
+    def tell(self):
+        return self._position
+
+    def seek(self, offset, whence=io.SEEK_SET):
+        if whence == io.SEEK_SET:
+            position = offset
+        elif whence == io.SEEK_CUR:
+            position = self._position + offset
+        elif whence == io.SEEK_END:
+            position = self.document.size + offset
+        else:
+            raise ValueError(f"whence tidak valid: {whence}")
+        if position < 0:
+            raise ValueError("Posisi negatif.")
+        self._position = position
+        return position
+
+    def _block(self, index):
+        block = self._blocks.get(index)
+        if block is None:
+            block_size = self.document.block_size
+            start = index * block_size
+            end = min(start + block_size, self.document.size) - 1
+            self.bytes_fetched += end - start + 1
+            _check_size(len(self.document.first_block) + self.bytes_fetched, self.document.max_bytes, self.document.cv_path)
+            response = get_client().get(self.document.url, headers={'Range': f"bytes={start}-{end}"})
+            response.raise_for_status()
+            self.requests += 1
+            block = response.content
+            if response.status_code == 200:
+                # Server mengabaikan Range; potong sendiri bagian yang diminta
+                block = block[start:end + 1]
+            self._blocks[index] = block
+        return block
+
+    def readinto(self, buffer):
+        view = memoryview(buffer).cast('B')
+        prefix = self.document.first_block
+        written = 0
+        while written < len(view) and self._position < self.document.size:
+            if self._position < len(prefix):
+                # Byte awal sudah diambil oleh open_cv
+                data, offset = prefix, self._position
+            else:
+                index, offset = divmod(self._position, self.document.block_size)
+                data = self._block(index)
+            chunk = data[offset:offset + len(view) - written]
+            if not chunk:
+                break
+            view[written:written + len(chunk)] = chunk
+            written += len(chunk)
+            self._position += len(chunk)
+        return written
+
+
+class RangeDocument:
+    """
+    CV besar yang dibaca sesuai kebutuhan lewat HTTP Range (lihat RangeReader).
+    Bisa di-pickle (hanya URL, ukuran, ETag dan blok pertama) sehingga proses pool
+    ekstraksi membuka reader-nya sendiri.
+    """
+
+    def __init__(self, cv_path, url, size, etag, first_block, block_size, max_bytes):
+        self.cv_path = cv_path
+        self.url = url
+        self.size = size
+        self.etag = etag
+        self.first_block = first_block
+        self.block_size = block_size
+        self.max_bytes = max_bytes
+        self._reader = None
+
+    @property
+    def cache_key(self):
+        # Isi file tidak diunduh utuh; ETag storage + ukuran mewakili versinya
+        if not self.etag:
+            return None
+        return make_digest_key(hashlib.sha256(f"{self.url}|{self.etag}|{self.size}".encode('utf-8')).hexdigest())
+
+    def open(self):
+        if self._reader is None:
+            self._reader = io.BufferedReader(RangeReader(self), buffer_size=self.block_size)
+        self._reader.seek(0)
+        return self._reader
+
+    @property
+    def bytes_fetched(self):
+        reader = self._reader.raw if self._reader is not None else None
+        return len(self.first_block) + (reader.bytes_fetched if reader else 0)
+
+    def portable(self):
+        return self
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state['_reader'] = None
+        return state
+
+    def close(self):
+        self._reader = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def _total_size(response):
+    match = _CONTENT_RANGE.match(response.headers.get('Content-Range', ''))
+    if match and match.group(3) != '*':
+        return int(match.group(3))
+    return None
+
+
+def open_cv(cv_path, bucket=CV_BUCKET):
+    """
+    Mengunduh CV secara streaming dengan batas ukuran CV_MAX_BYTES.
+
+    Request pertama meminta CV_RANGE_THRESHOLD byte awal. File yang lebih kecil
+    selesai dalam satu request dan di-spool; file yang lebih besar dibaca per blok
+    lewat Range (CV_RANGE_READS) sehingga parser yang berhenti di halaman
+    CV_PDF_MAX_PAGES tidak mengunduh sisa dokumen. Server tanpa dukungan Range
+    dijawab 200 dan seluruh body di-stream ke spool.
+    """
+    url = object_url(cv_path, bucket)
+    max_bytes = settings.CV_MAX_BYTES
+    headers = {}
+    if settings.CV_RANGE_READS:
+        headers['Range'] = f"bytes=0-{settings.CV_RANGE_THRESHOLD - 1}"
+
+    with get_client().stream('GET', url, headers=headers) as response:
+        response.raise_for_status()
+        total = _total_size(response) if response.status_code == 206 else None
+        if response.status_code == 200 and response.headers.get('Content-Length'):
+            _check_size(int(response.headers['Content-Length']), max_bytes, cv_path)
+
+        document = SpooledDocument(cv_path, settings.CV_SPOOL_BYTES)
+        try:
+            for chunk in response.iter_bytes():
+                document.write(chunk, max_bytes)
+        except BaseException:
+            document.close()
+            raise
+
+    if total is None or document.size >= total:
+        return document
+
+    # Sisa file dibaca sesuai kebutuhan; blok pertama sudah ada di tangan
+    first_block = document.getvalue()
+    document.close()
+    return RangeDocument(
+        cv_path, url, total, response.headers.get('ETag'), first_block,
+        settings.CV_RANGE_BLOCK, max_bytes,
+    )
+
+
+async def aprobe_cv_size(cv_path, bucket=CV_BUCKET):
+    """
+    Ukuran CV di storage (byte) dari satu request `Range: bytes=0-0` tanpa membaca
+    isinya, atau None bila server tidak menyebutkan ukuran. Error HTTP (mis. 404)
+    diteruskan sebagai httpx.HTTPStatusError.
+    """
+    async with get_async_client().stream('GET', object_url(cv_path, bucket), headers={'Range': 'bytes=0-0'}) as response:
+        response.raise_for_status()
+        if response.status_code == 206:
+            return _total_size(response)
+        length = response.headers.get('Content-Length')
+        return int(length) if length else None
@@ -0,0 +1,288 @@
+# applications/extraction_service.py
+import logging
+import multiprocessing
+import signal
+import sys
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, TimeoutError as FutureTimeoutError
+from concurrent.futures.process import BrokenProcessPool
+
+from django.conf import settings
+
+from .cv_parser import extract_text_from_docx, extract_text_from_pdf, parse_cv_text
+from .metrics import EXTRACTION_FAILURES, EXTRACTION_QUEUE_DEPTH
+from .profiling import EXTRACT, NLP, record
+
+logger = logging.getLogger(__name__)
+
+
+class ExtractionTimeout(Exception):
+    pass
+
+
+class DocumentCPULimitExceeded(Exception):
+    pass
+
+
+class ExtractionBusy(Exception):
+    """Tidak ada slot pool ekstraksi yang bebas dalam batas waktu tunggu."""
+
+
+def extract_cv_text(cv_path, source):
+    """`source`: bytes, stream biner, atau dokumen dari cv_storage.open_cv."""
+    if hasattr(source, 'open'):
+        source = source.open()
+    if cv_path.endswith('.pdf'):
+        return extract_text_from_pdf(source)
+    elif cv_path.endswith('.docx'):
+        return extract_text_from_docx(source)
+    return None
+
+
+def _on_cpu_limit(signum, frame):
+    raise DocumentCPULimitExceeded("Batas waktu CPU per dokumen terlampaui.")
+
+
+def _on_deadline(signum, frame):
+    raise ExtractionTimeout("Batas waktu per dokumen terlampaui.")
+
+
+def _init_worker():
+    # SIGXCPU dikirim kernel saat soft limit RLIMIT_CPU terlampaui dan SIGALRM saat
+    # tenggat wall-clock habis; keduanya diubah jadi exception agar hanya dokumen itu
+    # yang gagal, sementara proses anak dan dokumen lain di pool tetap berjalan.
+    if hasattr(signal, 'SIGXCPU'):
+        signal.signal(signal.SIGXCPU, _on_cpu_limit)
+    signal.signal(signal.SIGALRM, _on_deadline)
+
+
+def _cpu_limit(cpu_seconds):
+    """Memasang soft limit CPU = pemakaian saat ini + cpu_seconds. Mengembalikan limit lama."""
+    try:
+        import resource
+    except ImportError:
+        return None
+    previous = resource.getrlimit(resource.RLIMIT_CPU)
+    usage = resource.getrusage(resource.RUSAGE_SELF)
+    soft = int(usage.ru_utime + usage.ru_stime + cpu_seconds) + 1
+    hard = previous[1]
+    if hard != resource.RLIM_INFINITY:
+        soft = min(soft, hard)
+    resource.setrlimit(resource.RLIMIT_CPU, (soft, hard))
+    return previous
+
+
+def _restore_cpu_limit(previous):
+    if previous is not None:
+        import resource
+
+        resource.setrlimit(resource.RLIMIT_CPU, previous)
+
+
+def extract_and_parse_document(cv_path, source, cpu_seconds=0, parse=True, timeout=0):
+    """
+    Ekstraksi teks + NER untuk satu dokumen. Dijalankan di proses pool (atau inline);
+    mengembalikan dict yang bisa di-pickle beserta durasi tiap tahap. Dengan
+    parse=False hanya teks yang diekstrak (NER dibatch pemanggil, lihat rescreen_job).
+    `timeout` (detik wall-clock, lewat SIGALRM) hanya dipakai di proses pool.
+    """
+    previous = _cpu_limit(cpu_seconds) if cpu_seconds else None
+    if timeout:
+        signal.setitimer(signal.ITIMER_REAL, timeout)
+    try:
+        started = time.perf_counter()
+        cv_text = extract_cv_text(cv_path, source)
+        extract_seconds = time.perf_counter() - started
+
+        cv_data = None
+        nlp_seconds = None
+        if cv_text and parse:
+            started = time.perf_counter()
+            cv_data = parse_cv_text(cv_text)
+            nlp_seconds = time.perf_counter() - started
+        return {'text': cv_text, 'parsed': cv_data, 'timings': {EXTRACT: extract_seconds, NLP: nlp_seconds}}
+    finally:
+        if timeout:
+            signal.setitimer(signal.ITIMER_REAL, 0)
+        _restore_cpu_limit(previous)
+
+
+def _extract_portable(cv_path, payload, cpu_seconds, parse, timeout):
+    """Titik masuk di proses pool: file/mmap dari LocalDocument ditutup sebelum task selesai."""
+    if not hasattr(payload, 'close'):
+        return extract_and_parse_document(cv_path, payload, cpu_seconds, parse, timeout)
+    with payload:
+        return extract_and_parse_document(cv_path, payload, cpu_seconds, parse, timeout)
+
+
+class InlineExtractionService:
+    """Tanpa process pool (development, atau platform tanpa fork/spawn yang memadai)."""
+
+    def extract_and_parse(self, cv_path, source):
+        result = extract_and_parse_document(cv_path, source)
+        _record_timings(result, cv_path)
+        return result['text'], result['parsed']
+
+    def extract_text(self, cv_path, source):
+        result = extract_and_parse_document(cv_path, source, parse=False)
+        _record_timings(result, cv_path)
+        return result['text']
+
+    def queue_depth(self):
+        return 0
+
+
+class ProcessExtractionService:
+    """
+    Ekstraksi PDF/DOCX dan NER di ProcessPoolExecutor terbatas, sehingga kerja CPU
+    tidak menahan GIL thread request dan dokumen patologis tidak menggantung worker:
+
+    - paling banyak `max_pending` dokumen menunggu/berjalan; pemanggil berikutnya
+      menunggu slot paling lama `slot_timeout` detik lalu mendapat ExtractionBusy;
+    - setiap dokumen dibatasi `cpu_seconds` waktu CPU (RLIMIT_CPU) dan `timeout`
+      detik wall-clock (SIGALRM) di proses anak, dihitung sejak dokumen mulai
+      diproses, sehingga dokumen yang melewati batas gagal sendiri tanpa
+      mengganggu dokumen lain di pool;
+    - pool baru dibuat ulang hanya bila proses anak tidak merespons sinyal sama
+      sekali (lihat _wait);
+    - proses anak diganti setelah `max_tasks_per_child` dokumen agar pertumbuhan
+      memori (pypdf, spaCy) tidak menumpuk.
+    """
+
+    # Jeda sebelum proses anak yang tidak merespons SIGALRM dianggap macet
+    HUNG_GRACE_SECONDS = 5.0
+
+    def __init__(self, max_workers, max_tasks_per_child, timeout, cpu_seconds, max_pending, slot_timeout):
+        self.max_workers = max_workers
+        self.max_tasks_per_child = max_tasks_per_child
+        self.timeout = timeout
+        self.cpu_seconds = cpu_seconds
+        self.slot_timeout = slot_timeout
+        self._slots = threading.BoundedSemaphore(max_pending)
+        self._lock = threading.Lock()
+        self._pending = 0
+        self._executor = None
+
+    def _create_executor(self):
+        # max_tasks_per_child tidak boleh dipakai dengan start method "fork"
+        method = 'forkserver' if 'forkserver' in multiprocessing.get_all_start_methods() else 'spawn'
+        kwargs = {
+            'max_workers': self.max_workers,
+            'mp_context': multiprocessing.get_context(method),
+            'initializer': _init_worker,
+        }
+        if self.max_tasks_per_child and sys.version_info >= (3, 11):
+            kwargs['max_tasks_per_child'] = self.max_tasks_per_child
+        return ProcessPoolExecutor(**kwargs)
+
+    def _get_executor(self):
+        with self._lock:
+            if self._executor is None:
+                self._executor = self._create_executor()
+            return self._executor
+
+    def _reset_executor(self, broken):
+        with self._lock:
+            if self._executor is not broken:
+                return
+            self._executor = None
+        # Proses yang masih menjalankan dokumen macet harus dihentikan paksa
+        for process in list((getattr(broken, '_processes', None) or {}).values()):
+            process.terminate()
+        broken.shutdown(wait=False, cancel_futures=True)
+
+    def _wait(self, future):
+        """
+        Menunggu hasil tanpa menghitung waktu antre di pool. Tenggat ditegakkan proses
+        anak; batas di sini hanya pengaman untuk proses yang tidak merespons sinyal.
+        Future berstatus running sejak masuk call queue pool, yang bisa berisi satu
+        dokumen di belakang dokumen yang sedang berjalan, maka batasnya dua kali timeout.
+        """
+        while not future.running():
+            try:
+                return future.result(timeout=0.05)
+            except FutureTimeoutError:
+                continue
+        return future.result(timeout=2 * self.timeout + self.HUNG_GRACE_SECONDS)
+
+    def _update_depth(self, delta):
+        with self._lock:
+            self._pending += delta
+            EXTRACTION_QUEUE_DEPTH.set(self._pending)
+
+    def queue_depth(self):
+        return self._pending
+
+    def extract_and_parse(self, cv_path, source):
+        result = self._run(cv_path, source, parse=True)
+        return result['text'], result['parsed']
+
+    def extract_text(self, cv_path, source):
+        return self._run(cv_path, source, parse=False)['text']
+
+    def _run(self, cv_path, source, parse):
+        if not self._slots.acquire(timeout=self.slot_timeout):
+            EXTRACTION_FAILURES.labels(reason='busy').inc()
+            raise ExtractionBusy(f"Pool ekstraksi penuh; {cv_path} tidak mendapat slot dalam {self.slot_timeout} detik.")
+        self._update_depth(1)
+        try:
+            # Baru disiapkan setelah dapat slot. Dokumen spool dikirim sebagai path (di-mmap
+            # proses anak), RangeDocument membuka reader sendiri di proses anak.
+            payload = source.portable() if hasattr(source, 'portable') else source
+            executor = self._get_executor()
+            future = executor.submit(_extract_portable, cv_path, payload, self.cpu_seconds, parse, self.timeout)
+            result = self._wait(future)
+        except ExtractionTimeout:
+            EXTRACTION_FAILURES.labels(reason='timeout').inc()
+            raise
+        except DocumentCPULimitExceeded:
+            EXTRACTION_FAILURES.labels(reason='cpu_limit').inc()
+            raise
+        except FutureTimeoutError:
+            # Proses anak tidak merespons SIGALRM: satu-satunya kasus pool dihentikan paksa
+            EXTRACTION_FAILURES.labels(reason='hung').inc()
+            self._reset_executor(executor)
+            raise ExtractionTimeout(f"Ekstraksi {cv_path} tidak merespons setelah {self.timeout} detik.")
+        except BrokenProcessPool:
+            # Proses anak mati (mis. OOM), atau pool dihentikan karena dokumen lain macet
+            reason = 'worker_died' if self._executor is executor else 'pool_reset'
+            EXTRACTION_FAILURES.labels(reason=reason).inc()
+            self._reset_executor(executor)
+            raise
+        finally:
+            self._update_depth(-1)
+            self._slots.release()
+        _record_timings(result, cv_path)
+        return result
+
+
+def _record_timings(result, cv_path):
+    # Tahap dijalankan di proses lain; durasinya dikirim ke hook profiling di sini
+    timings = result['timings']
+    record(EXTRACT, timings[EXTRACT], path=cv_path)
+    if timings[NLP] is not None:
+        record(NLP, timings[NLP])
+
+
+_service = None
+_service_lock = threading.Lock()
+
+
+def get_extraction_service():
+    global _service
+    if _service is None:
+        with _service_lock:
+            if _service is None:
+                if settings.EXTRACTION_MODE == 'inline':
+                    _service = InlineExtractionService()
+                else:
+                    _service = ProcessExtractionService(
+                        max_workers=settings.EXTRACTION_WORKERS,
+                        max_tasks_per_child=settings.EXTRACTION_MAX_TASKS_PER_CHILD,
+                        timeout=settings.EXTRACTION_TIMEOUT,
+                        cpu_seconds=settings.EXTRACTION_CPU_SECONDS,
+                        max_pending=settings.EXTRACTION_MAX_PENDING,
+                        slot_timeout=settings.EXTRACTION_SLOT_TIMEOUT,
+                    )
+    return _service
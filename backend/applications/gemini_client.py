@@ -1,25 +1,143 @@
 # backend/applications/gemini_client.py
-import google.generativeai as genai
-import os
+import hashlib
+import logging
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+
+from django.conf import settings
 from dotenv import load_dotenv
 
+from .llm_cache import get_llm_cache, make_llm_cache_key
+from .metrics import GEMINI_FAILURES, LLM_CACHE_LOOKUPS
+from .model_registry import get_genai
+
+logger = logging.getLogger(__name__)
+
 # Muat environment variables dari file .env
 load_dotenv()
 
-# Konfigurasi API key
-# Pastikan Anda sudah membuat file .env di direktori backend/
-# dengan baris GEMINI_API_KEY="YOUR_API_KEY_DI_SINI"
-genai.configure(api_key=os.getenv("GEMINI_API_KEY"))
+# SDK Gemini diimpor dan dikonfigurasi saat pertama dipakai (lihat model_registry.py)
 
-def get_gemini_score(cv_text, job_description, ml_score):
+# Naikkan setiap kali isi build_prompt berubah agar jawaban lama di LLM cache tidak dipakai
+PROMPT_VERSION = '1'
+
+
+class GeminiTimeoutError(Exception):
+    """Panggilan Gemini melewati deadline per panggilan."""
+
+
+def _retryable_exceptions():
+    from google.api_core import exceptions as api_exceptions
+
+    # 429 (rate limit) dan error sementara di sisi server
+    return (
+        api_exceptions.ResourceExhausted,
+        api_exceptions.ServiceUnavailable,
+        api_exceptions.InternalServerError,
+        api_exceptions.DeadlineExceeded,
+    )
+
+
+class GeminiClient:
     """
-    Mengirim data CV, lowongan, dan skor ML ke Gemini untuk mendapatkan skor dan alasan.
+    Klien Gemini yang dipakai bersama oleh semua request dalam satu proses.
+
+    - Satu instance GenerativeModel untuk semua panggilan.
+    - Pool thread berukuran tetap membatasi panggilan yang berjalan bersamaan;
+      sisanya menunggu giliran.
+    - Setiap panggilan punya deadline total (antre + retry), sehingga request
+      `apply` tidak lagi bisa tertahan tanpa batas.
+    - Rate limit dan error sementara diulang dengan exponential backoff + jitter.
+    - Prompt identik yang masih diproses tidak dikirim dua kali; pemanggil
+      berikutnya menunggu hasil panggilan yang sama.
     """
-    # Gunakan model generatif yang sesuai
-    model = genai.GenerativeModel('gemini-1.5-flash')
 
+    def __init__(self, model_name, max_concurrency, timeout, max_retries, backoff_base):
+        self.model_name = model_name
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self._executor = ThreadPoolExecutor(max_workers=max_concurrency, thread_name_prefix='gemini')
+        self._model = None
+        self._model_lock = threading.Lock()
+        self._inflight = {}
+        self._inflight_lock = threading.Lock()
+
+    def _get_model(self):
+        if self._model is None:
+            with self._model_lock:
+                if self._model is None:
+                    self._model = get_genai().GenerativeModel(self.model_name)
+        return self._model
+
+    def generate(self, prompt, timeout=None):
+        """Mengirim prompt dan mengembalikan teks respons. Raise GeminiTimeoutError bila lewat deadline."""
+        timeout = timeout or self.timeout
+        deadline = time.monotonic() + timeout
+        key = hashlib.sha256(prompt.encode('utf-8')).hexdigest()
+
+        with self._inflight_lock:
+            future = self._inflight.get(key)
+            if future is None:
+                future = self._executor.submit(self._call_with_retries, prompt, deadline)
+                self._inflight[key] = future
+                future.add_done_callback(lambda done, key=key: self._forget(key, done))
+
+        try:
+            return future.result(timeout=max(0.0, deadline - time.monotonic()))
+        except FutureTimeoutError:
+            raise GeminiTimeoutError(f"Gemini tidak merespons dalam {timeout} detik.")
+
+    def _forget(self, key, future):
+        with self._inflight_lock:
+            if self._inflight.get(key) is future:
+                del self._inflight[key]
+
+    def _call_with_retries(self, prompt, deadline):
+        retryable = _retryable_exceptions()
+        model = self._get_model()
+        attempt = 0
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                raise GeminiTimeoutError("Deadline habis sebelum Gemini sempat dipanggil.")
+            try:
+                response = model.generate_content(prompt, request_options={'timeout': remaining})
+                return response.text
+            except retryable as e:
+                attempt += 1
+                delay = self.backoff_base * (2 ** (attempt - 1)) * (1 + random.random())
+                if attempt > self.max_retries or time.monotonic() + delay >= deadline:
+                    raise
+                logger.info(f"[GEMINI] {e.__class__.__name__}, mencoba lagi dalam {delay:.1f}s (percobaan {attempt})")
+                time.sleep(delay)
+
+
+_client = None
+_client_lock = threading.Lock()
+
+
+def get_client():
+    """GeminiClient bersama untuk proses ini, dibuat saat pertama dipakai."""
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                _client = GeminiClient(
+                    model_name=settings.GEMINI_MODEL_NAME,
+                    max_concurrency=settings.GEMINI_MAX_CONCURRENCY,
+                    timeout=settings.GEMINI_TIMEOUT,
+                    max_retries=settings.GEMINI_MAX_RETRIES,
+                    backoff_base=settings.GEMINI_BACKOFF_BASE,
+                )
+    return _client
+
+
+def build_prompt(cv_text, job_description, ml_score):
     # Prompt yang dimodifikasi untuk menyertakan skor ML
-    prompt = f"""
+    return f"""
 Lakukan analisis mendalam terhadap CV berikut dan berikan penilaian (skor 1-100) serta alasan detail mengapa kandidat ini cocok atau tidak cocok untuk lowongan pekerjaan yang diberikan.
 Sebagai tambahan, skor awal dari model Machine Learning kami adalah {ml_score}. Gunakan skor ini sebagai salah satu pertimbangan Anda.
 
@@ -39,23 +157,63 @@ Skor: [skor_numerik]
 Alasan: [penjelasan_detail_dan_terstruktur]
 """
 
+
+def parse_gemini_response(raw_text):
+    # Parsing skor dan alasan dari teks respons
+    score_line = next((line for line in raw_text.split('\n') if "Skor:" in line), None)
+    reason_line_start = raw_text.find("Alasan:")
+
+    if score_line and reason_line_start != -1:
+        score = int(''.join(filter(str.isdigit, score_line)))
+        reason = raw_text[reason_line_start + len("Alasan:"):].strip()
+        return score, reason
+    else:
+        return None, "Gagal mendapatkan skor dan alasan dari Gemini."
+
+
+def get_gemini_score(cv_text, job_description, ml_score):
+    """
+    Mengirim data CV, lowongan, dan skor ML ke Gemini untuk mendapatkan skor dan alasan.
+    """
+    score, reason, _from_cache = get_gemini_score_cached(cv_text, job_description, ml_score)
+    return score, reason
+
+
+def get_gemini_score_cached(cv_text, job_description, ml_score):
+    """
+    Seperti get_gemini_score, tetapi lewat LLM cache dan mengembalikan
+    (score, reason, from_cache). Hanya jawaban yang berhasil di-parse yang disimpan.
+    """
+    cache = get_llm_cache()
+    key = None
+    if cache is not None:
+        key = make_llm_cache_key(cv_text, job_description, ml_score, settings.GEMINI_MODEL_NAME, PROMPT_VERSION)
+        cached = cache.get(key)
+        LLM_CACHE_LOOKUPS.labels(result='hit' if cached is not None else 'miss').inc()
+        if cached is not None:
+            return cached['score'], cached['reason'], True
+
+    score, reason = _call_gemini(cv_text, job_description, ml_score)
+    if cache is not None and score is not None:
+        cache.set(key, {'score': score, 'reason': reason})
+    return score, reason, False
+
+
+def _call_gemini(cv_text, job_description, ml_score):
+    prompt = build_prompt(cv_text, job_description, ml_score)
+
     try:
-        # Panggil Gemini API
-        response = model.generate_content(prompt)
-        # Dapatkan teks dari respons
-        raw_text = response.text
-        
-        # Parsing skor dan alasan dari teks respons
-        score_line = next((line for line in raw_text.split('\n') if "Skor:" in line), None)
-        reason_line_start = raw_text.find("Alasan:")
-        
-        if score_line and reason_line_start != -1:
-            score = int(''.join(filter(str.isdigit, score_line)))
-            reason = raw_text[reason_line_start + len("Alasan:"):].strip()
-            return score, reason
-        else:
-            return None, "Gagal mendapatkan skor dan alasan dari Gemini."
+        raw_text = get_client().generate(prompt)
+        score, reason = parse_gemini_response(raw_text)
+        if score is None:
+            GEMINI_FAILURES.labels(kind='unparsable').inc()
+        return score, reason
 
+    except GeminiTimeoutError as e:
+        logger.warning(f"[GEMINI] Timeout saat memanggil Gemini API: {e}")
+        GEMINI_FAILURES.labels(kind='timeout').inc()
+        return None, "Server AI tidak merespons tepat waktu."
     except Exception as e:
-        print(f"Error saat memanggil Gemini API: {e}")
-        return None, "Terjadi kesalahan saat menghubungi server AI."
\ No newline at end of file
+        logger.error(f"[GEMINI] Error saat memanggil Gemini API: {e}")
+        GEMINI_FAILURES.labels(kind='error').inc()
+        return None, "Terjadi kesalahan saat menghubungi server AI."
@@ -0,0 +1,126 @@
+# applications/interval_index.py
+from bisect import bisect_left, bisect_right
+
+
+class IntervalIndex:
+    """
+    Kumpulan interval setengah terbuka [start, end) yang sudah terisi, disimpan
+    tergabung (merged) dan terurut sehingga start dan end sama-sama monoton.
+    Nilai boleh berupa apa saja yang bisa dibandingkan (datetime, int, ...).
+
+    - overlapping / is_free: O(log n) lewat bisect.
+    - next_free: O(log n) per blok terisi yang dilompati; karena blok
+      bersebelahan sudah digabung, yang dilompati hanya celah yang lebih pendek
+      dari durasi yang diminta.
+    - add / remove: O(log n) pencarian + geser list.
+    """
+
+    def __init__(self, intervals=()):
+        self._starts = []
+        self._ends = []
+        for start, end in sorted(intervals):
+            self.add(start, end)
+
+    def __len__(self):
+        return len(self._starts)
+
+    def __iter__(self):
+        return zip(self._starts, self._ends)
+
+    def add(self, start, end):
+        if not start < end:
+            raise ValueError("Interval harus memiliki start < end.")
+        # Semua interval yang beririsan atau bersentuhan dengan [start, end) digabung
+        i = bisect_left(self._ends, start)
+        j = bisect_right(self._starts, end)
+        if i < j:
+            start = min(start, self._starts[i])
+            end = max(end, self._ends[j - 1])
+        self._starts[i:j] = [start]
+        self._ends[i:j] = [end]
+
+    def remove(self, start, end):
+        """
+        Mengosongkan [start, end). Karena interval disimpan tergabung, dua jadwal yang
+        saling tumpang tindih ikut terpotong; bangun ulang index bila itu penting.
+        """
+        i = bisect_right(self._ends, start)
+        j = bisect_left(self._starts, end)
+        if i >= j:
+            return
+        pieces_starts, pieces_ends = [], []
+        if self._starts[i] < start:
+            pieces_starts.append(self._starts[i])
+            pieces_ends.append(start)
+        if self._ends[j - 1] > end:
+            pieces_starts.append(end)
+            pieces_ends.append(self._ends[j - 1])
+        self._starts[i:j] = pieces_starts
+        self._ends[i:j] = pieces_ends
+
+    def overlapping(self, start, end):
+        """Blok terisi (start, end) pertama yang beririsan dengan [start, end), atau None."""
+        i = bisect_right(self._ends, start)
+        if i < len(self._starts) and self._starts[i] < end:
+            return self._starts[i], self._ends[i]
+        return None
+
+    def is_free(self, start, end):
+        return self.overlapping(start, end) is None
+
+    def next_free(self, after, length):
+        """Awal paling cepat t >= after sehingga [t, t + length) kosong."""
+        start = after
+        while True:
+            block = self.overlapping(start, start + length)
+            if block is None:
+                return start
+            start = block[1]
+
+
+class AvailabilityIndex:
+    """
+    Ketersediaan slot wawancara sebuah job di atas grid slot yang sudah diurutkan.
+
+    Jadwal disimpan per `resource` (mis. id pewawancara). Resource None berarti
+    panel job itu sendiri: jadwal tanpa pewawancara memblokir semua resource.
+    """
+
+    def __init__(self, slots, duration):
+        self.slots = slots
+        self.duration = duration
+        self._booked = {}
+
+    def booked(self, resource=None):
+        index = self._booked.get(resource)
+        if index is None:
+            index = self._booked[resource] = IntervalIndex()
+        return index
+
+    def book(self, start, end=None, resource=None):
+        self.booked(resource).add(start, end or start + self.duration)
+
+    def release(self, start, end=None, resource=None):
+        self.booked(resource).remove(start, end or start + self.duration)
+
+    def conflict(self, start, end=None, resource=None):
+        """Blok terisi yang bertabrakan dengan [start, end) untuk resource ini, atau None."""
+        end = end or start + self.duration
+        blocks = [self.booked(None).overlapping(start, end)]
+        if resource is not None:
+            blocks.append(self.booked(resource).overlapping(start, end))
+        blocks = [block for block in blocks if block is not None]
+        # Blok dengan akhir paling jauh, supaya pemanggil bisa melompatinya sekaligus
+        return max(blocks, key=lambda block: block[1]) if blocks else None
+
+    def next_free_slot(self, after, resource=None):
+        """Slot grid pertama >= after yang kosong sepanjang `duration`, atau None."""
+        i = bisect_left(self.slots, after)
+        while i < len(self.slots):
+            slot = self.slots[i]
+            block = self.conflict(slot, resource=resource)
+            if block is None:
+                return slot
+            # Lompati seluruh blok terisi, bukan maju satu slot per langkah
+            i = bisect_left(self.slots, block[1], lo=i + 1)
+        return None
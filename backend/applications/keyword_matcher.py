@@ -0,0 +1,72 @@
+# applications/keyword_matcher.py
+import re
+
+
+class KeywordMatcher:
+    """
+    Mencocokkan banyak kelompok kata kunci sekaligus dalam satu kali scan teks.
+
+    Semua kata kunci digabung menjadi satu regex alternation (dikompilasi sekali),
+    case-insensitive dan dengan batas kata seperti pencarian per kata kunci
+    sebelumnya. Batas kata ditulis sebagai (?<!\\w) / (?!\\w) sehingga identik
+    dengan \\b untuk kata kunci biasa, tetapi kata kunci yang diakhiri simbol
+    seperti 'c++' atau 'c#' tetap bisa ditemukan.
+
+    Kata kunci yang tumpang tindih (mis. 'google cloud' dan 'cloud') tetap
+    terdeteksi karena pola dibungkus lookahead sehingga setiap posisi awal kata
+    diperiksa tanpa "memakan" teks.
+    """
+
+    def __init__(self, groups):
+        # groups: {'nama_kelompok': iterable kata kunci}
+        self._lookup = {}
+        keywords = set()
+        for group, group_keywords in groups.items():
+            for keyword in group_keywords:
+                if not keyword:
+                    continue
+                lowered = keyword.lower()
+                entries = self._lookup.setdefault(lowered, {})
+                entries.setdefault(group, [])
+                if keyword not in entries[group]:
+                    entries[group].append(keyword)
+                keywords.add(lowered)
+
+        # Urutkan dari yang terpanjang agar alternation memilih kecocokan terpanjang
+        # di setiap posisi; kata kunci yang lebih pendek dengan awalan sama dicek
+        # ulang secara terpisah (lihat _prefix_patterns).
+        ordered = sorted(keywords, key=lambda k: (-len(k), k))
+        self._pattern = None
+        if ordered:
+            alternation = '|'.join(re.escape(k) for k in ordered)
+            self._pattern = re.compile(r'(?=(?<!\w)(' + alternation + r')(?!\w))', re.IGNORECASE)
+
+        self._prefix_patterns = {}
+        for keyword in ordered:
+            prefixes = [k for k in ordered if k != keyword and keyword.startswith(k)]
+            if prefixes:
+                self._prefix_patterns[keyword] = [
+                    (k, re.compile(r'(?<!\w)' + re.escape(k) + r'(?!\w)', re.IGNORECASE)) for k in prefixes
+                ]
+
+    def find(self, text):
+        """
+        Mengembalikan {'nama_kelompok': set(kata kunci asli)} untuk semua kata kunci
+        yang muncul di teks.
+        """
+        found = {}
+        if not text or self._pattern is None:
+            return found
+
+        matched = set()
+        for match in self._pattern.finditer(text):
+            keyword = match.group(1).lower()
+            matched.add(keyword)
+            for prefix, prefix_pattern in self._prefix_patterns.get(keyword, ()):
+                if prefix not in matched and prefix_pattern.match(text, match.start()):
+                    matched.add(prefix)
+
+        for keyword in matched:
+            for group, originals in self._lookup[keyword].items():
+                found.setdefault(group, set()).update(originals)
+        return found
@@ -0,0 +1,168 @@
+# applications/llm_cache.py
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+
+from cachetools import TTLCache
+from django.conf import settings
+from django.utils.module_loading import import_string
+
+logger = logging.getLogger(__name__)
+
+
+def _normalize(text):
+    # Spasi/baris kosong berlebih dari ekstraksi PDF tidak boleh menghasilkan key berbeda
+    return ' '.join((text or '').split())
+
+
+def make_llm_cache_key(cv_text, job_description, ml_score, model_name, prompt_version):
+    """Hash dari input prompt yang dinormalisasi + nama model + versi prompt."""
+    payload = json.dumps(
+        [_normalize(cv_text), _normalize(job_description), round(float(ml_score or 0), 2), model_name, prompt_version],
+        ensure_ascii=False,
+    )
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+class SQLiteBackend:
+    """
+    Backend default: satu file SQLite yang dipakai bersama semua proses di host.
+    Entri kedaluwarsa setelah `ttl` detik; saat jumlah entri melewati
+    `max_entries`, entri yang paling lama tidak diakses dihapus lebih dulu.
+    """
+
+    def __init__(self, ttl, max_entries, path=None):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.path = path or str(settings.LLM_CACHE_PATH)
+        self._local = threading.local()
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        with self._connection() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS llm_cache ("
+                " key TEXT PRIMARY KEY, value TEXT NOT NULL,"
+                " created_at REAL NOT NULL, accessed_at REAL NOT NULL)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS llm_cache_accessed_idx ON llm_cache (accessed_at)")
+
+    def _connection(self):
+        # Koneksi sqlite3 tidak boleh dipakai lintas thread, jadi satu per thread
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5)
+            conn.execute("PRAGMA journal_mode=WAL")
+            self._local.conn = conn
+        return conn
+
+    def get(self, key):
+        now = time.time()
+        with self._connection() as conn:
+            row = conn.execute("SELECT value, created_at FROM llm_cache WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return None
+            if row[1] + self.ttl < now:
+                conn.execute("DELETE FROM llm_cache WHERE key = ?", (key,))
+                return None
+            conn.execute("UPDATE llm_cache SET accessed_at = ? WHERE key = ?", (now, key))
+        return json.loads(row[0])
+
+    def set(self, key, value):
+        now = time.time()
+        with self._connection() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO llm_cache (key, value, created_at, accessed_at) VALUES (?, ?, ?, ?)",
+                (key, json.dumps(value), now, now),
+            )
+            conn.execute("DELETE FROM llm_cache WHERE created_at < ?", (now - self.ttl,))
+            conn.execute(
+                "DELETE FROM llm_cache WHERE key IN ("
+                " SELECT key FROM llm_cache ORDER BY accessed_at DESC LIMIT -1 OFFSET ?)",
+                (self.max_entries,),
+            )
+
+    def stats(self):
+        with self._connection() as conn:
+            (entries,) = conn.execute("SELECT COUNT(*) FROM llm_cache").fetchone()
+        return {'entries': entries}
+
+
+class MemoryBackend:
+    """Backend per proses (TTL + LRU), cocok untuk development dan pengujian."""
+
+    def __init__(self, ttl, max_entries, **kwargs):
+        self._cache = TTLCache(maxsize=max_entries, ttl=ttl)
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            return self._cache.get(key)
+
+    def set(self, key, value):
+        with self._lock:
+            self._cache[key] = value
+
+    def stats(self):
+        with self._lock:
+            return {'entries': len(self._cache)}
+
+
+class LLMCache:
+    """Cache respons LLM di depan get_gemini_score, dengan backend yang bisa diganti."""
+
+    def __init__(self, backend):
+        self.backend = backend
+        self._lock = threading.Lock()
+        self._counters = {'hits': 0, 'misses': 0, 'errors': 0}
+
+    def get(self, key):
+        try:
+            value = self.backend.get(key)
+        except Exception as e:
+            # Cache tidak boleh membuat screening gagal; anggap saja miss
+            logger.warning(f"Gagal membaca LLM cache: {e}")
+            value = None
+            with self._lock:
+                self._counters['errors'] += 1
+        with self._lock:
+            self._counters['hits' if value is not None else 'misses'] += 1
+        return value
+
+    def set(self, key, value):
+        try:
+            self.backend.set(key, value)
+        except Exception as e:
+            logger.warning(f"Gagal menulis LLM cache: {e}")
+            with self._lock:
+                self._counters['errors'] += 1
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._counters)
+        lookups = stats['hits'] + stats['misses']
+        stats['hit_ratio'] = stats['hits'] / lookups if lookups else None
+        try:
+            stats.update(self.backend.stats())
+        except Exception as e:
+            logger.warning(f"Gagal membaca statistik LLM cache: {e}")
+        return stats
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_llm_cache():
+    """LLMCache bersama untuk proses ini, atau None bila LLM_CACHE_ENABLED dimatikan."""
+    global _cache
+    if not settings.LLM_CACHE_ENABLED:
+        return None
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                backend_class = import_string(settings.LLM_CACHE_BACKEND)
+                _cache = LLMCache(backend_class(ttl=settings.LLM_CACHE_TTL, max_entries=settings.LLM_CACHE_MAX_ENTRIES))
+    return _cache
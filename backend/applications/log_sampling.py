@@ -0,0 +1,20 @@
+# applications/log_sampling.py
+import logging
+import random
+
+
+class SamplingFilter(logging.Filter):
+    """
+    Meneruskan semua WARNING ke atas, tetapi hanya sebagian (`rate`) dari log
+    INFO/DEBUG. Log per pelamar di jalur screening/asesmen tetap bisa dilihat
+    polanya tanpa menulis satu baris untuk setiap request.
+    """
+
+    def __init__(self, rate=1.0):
+        super().__init__()
+        self.rate = float(rate)
+
+    def filter(self, record):
+        if record.levelno >= logging.WARNING or self.rate >= 1.0:
+            return True
+        return random.random() < self.rate
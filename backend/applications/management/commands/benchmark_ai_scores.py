@@ -0,0 +1,61 @@
+import random
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from applications import model_utils
+from applications.model_registry import get_screening_model
+from applications.cv_parser import SKILL_KEYWORDS
+
+EDUCATION_VALUES = ['B.Sc', 'B.Tech', 'MBA', 'M.Tech', 'PhD', '']
+JOB_TITLES = ['AI Researcher', 'Cybersecurity Analyst', 'Data Scientist', 'Software Engineer']
+
+
+def build_synthetic_applicants(rng, count):
+    applicants = []
+    for _ in range(count):
+        applicants.append({
+            'experience_years': rng.randint(0, 15),
+            'projects_count': rng.randint(0, 10),
+            'education': rng.choice(EDUCATION_VALUES),
+            'skills': rng.sample(SKILL_KEYWORDS, k=min(len(SKILL_KEYWORDS), rng.randint(0, 12))),
+            'certifications': [],
+        })
+    return applicants
+
+
+class Command(BaseCommand):
+    help = 'Mengukur throughput skor ML (pelamar/detik) untuk get_ai_scores_batch dan get_ai_score.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sizes', type=int, nargs='+', default=[1, 100, 10000])
+        parser.add_argument('--repeat', type=int, default=3, help='Ambil waktu terbaik dari beberapa putaran.')
+        parser.add_argument('--single-limit', type=int, default=1000,
+                            help='Lewati pengukuran get_ai_score per pelamar untuk N di atas batas ini.')
+        parser.add_argument('--seed', type=int, default=42)
+
+    def handle(self, *args, **options):
+        if not get_screening_model():
+            raise CommandError('Model tidak dimuat; benchmark hanya akan mengukur skor fallback.')
+
+        rng = random.Random(options['seed'])
+        self.stdout.write(f"{'N':>7} | {'batch (pelamar/s)':>18} | {'per pelamar (pelamar/s)':>24}")
+        for size in options['sizes']:
+            applicants = build_synthetic_applicants(rng, size)
+            job = {'title': rng.choice(JOB_TITLES)}
+
+            batch_time = self._best_of(options['repeat'], lambda: model_utils.get_ai_scores_batch(applicants, job))
+            single = '-'
+            if size <= options['single_limit']:
+                single_time = self._best_of(options['repeat'], lambda: [model_utils.get_ai_score(a, job) for a in applicants])
+                single = f"{size / single_time:,.0f}"
+            self.stdout.write(f"{size:>7} | {size / batch_time:>18,.0f} | {single:>24}")
+
+    def _best_of(self, repeat, fn):
+        best = None
+        for _ in range(repeat):
+            start = time.perf_counter()
+            fn()
+            elapsed = time.perf_counter() - start
+            best = elapsed if best is None else min(best, elapsed)
+        return best
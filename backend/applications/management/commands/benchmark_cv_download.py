@@ -0,0 +1,109 @@
+import os
+import tempfile
+import time
+import tracemalloc
+
+import httpx
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from applications.cv_parser import extract_text_from_pdf
+from applications.cv_storage import CV_BUCKET, object_url, open_cv
+from applications.management.commands.benchmark_pdf_extraction import build_synthetic_pdf
+from applications.management.commands.run_fake_storage import start_server
+
+
+def legacy_download_and_extract(cv_path):
+    """Cara lama: seluruh file diunduh ke bytes lalu dibungkus BytesIO oleh parser."""
+    file_bytes = httpx.get(object_url(cv_path), timeout=settings.STORAGE_TIMEOUT).content
+    return extract_text_from_pdf(file_bytes)
+
+
+def streamed_download_and_extract(cv_path):
+    settings.CV_RANGE_READS = False
+    with open_cv(cv_path) as document:
+        return extract_text_from_pdf(document.open())
+
+
+def range_download_and_extract(cv_path):
+    settings.CV_RANGE_READS = True
+    with open_cv(cv_path) as document:
+        return extract_text_from_pdf(document.open())
+
+
+VARIANTS = {
+    'Lama (bytes utuh)': legacy_download_and_extract,
+    'open_cv (spool)': streamed_download_and_extract,
+    'open_cv (Range)': range_download_and_extract,
+}
+
+
+def measure(fn, cv_path, stats):
+    before = dict(stats)
+    tracemalloc.start()
+    started = time.perf_counter()
+    text = fn(cv_path)
+    elapsed = time.perf_counter() - started
+    _current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {
+        'elapsed': elapsed,
+        'peak': peak,
+        'chars': len(text or ''),
+        'requests': stats['requests'] - before['requests'],
+        'bytes': stats['bytes_sent'] - before['bytes_sent'],
+    }
+
+
+class Command(BaseCommand):
+    help = (
+        'Membandingkan download CV lama (bytes utuh) dengan open_cv (spool + HTTP Range) '
+        'terhadap server storage palsu lokal dan PDF sintetis.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--pages', type=int, nargs='+', default=[2, 20, 60])
+        parser.add_argument('--image-bytes', type=int, default=200 * 1024, help='Ukuran gambar per halaman.')
+        parser.add_argument('--latency', type=float, default=0.005, help='Latensi server per request (detik).')
+        parser.add_argument('--no-range', action='store_true', help='Server mengabaikan Range.')
+        parser.add_argument(
+            '--layout', choices=['interleaved', 'clustered'], default='clustered',
+            help='Letak objek /Page: setelah isi tiap halaman, atau dikumpulkan di akhir file.',
+        )
+
+    def handle(self, *args, **options):
+        with tempfile.TemporaryDirectory() as root:
+            os.makedirs(os.path.join(root, CV_BUCKET, 'bench'))
+            server, stats = start_server(root, latency=options['latency'], supports_range=not options['no_range'])
+            settings.STORAGE_ENDPOINT = f"http://127.0.0.1:{server.server_address[1]}"
+            # Benchmark membandingkan ukuran unduhan, bukan batas; file besar tetap diizinkan
+            settings.CV_MAX_BYTES = 0
+            self.stdout.write(
+                f"Server storage palsu: {settings.STORAGE_ENDPOINT} (server mendukung Range: {not options['no_range']}), "
+                f"CV_RANGE_THRESHOLD={settings.CV_RANGE_THRESHOLD}, CV_RANGE_BLOCK={settings.CV_RANGE_BLOCK}"
+            )
+            try:
+                # Pemanasan: import, koneksi keep-alive dan cache ETag server tidak ikut diukur
+                warmup_path = 'bench/warmup.pdf'
+                with open(os.path.join(root, CV_BUCKET, warmup_path), 'wb') as f:
+                    f.write(build_synthetic_pdf(1))
+                for fn in VARIANTS.values():
+                    fn(warmup_path)
+
+                for pages in options['pages']:
+                    cv_path = f"bench/cv-{pages}.pdf"
+                    pdf_bytes = build_synthetic_pdf(
+                        pages, image_bytes=options['image_bytes'], clustered=options['layout'] == 'clustered',
+                    )
+                    with open(os.path.join(root, CV_BUCKET, cv_path), 'wb') as f:
+                        f.write(pdf_bytes)
+                    self.stdout.write(f"\nPDF {pages} halaman ({len(pdf_bytes) / 1024:.0f} KiB)")
+                    for label, fn in VARIANTS.items():
+                        result = measure(fn, cv_path, stats)
+                        self.stdout.write(
+                            f"  {label:<18}: {result['elapsed'] * 1000:8.1f} ms, puncak memori {result['peak'] / 1024 / 1024:6.2f} MiB, "
+                            f"{result['requests']:3d} request, {result['bytes'] / 1024:8.0f} KiB diunduh, {result['chars']} karakter"
+                        )
+            finally:
+                server.shutdown()
+                server.server_close()
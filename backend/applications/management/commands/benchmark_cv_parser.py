@@ -0,0 +1,88 @@
+import random
+import re
+import time
+
+from django.core.management.base import BaseCommand
+
+from applications.cv_parser import (
+    CERTIFICATION_KEYWORDS,
+    EDUCATION_KEYWORDS,
+    KEYWORD_MATCHER,
+    SKILL_KEYWORDS,
+)
+
+FILLER_WORDS = [
+    'responsible', 'for', 'developing', 'team', 'project', 'company', 'client', 'delivered',
+    'improved', 'performance', 'managed', 'designed', 'built', 'the', 'and', 'with', 'using',
+]
+
+
+def legacy_keyword_scan(text):
+    """Loop lama: satu re.search per kata kunci (dipertahankan sebagai pembanding)."""
+    education_match = None
+    for keyword, value in EDUCATION_KEYWORDS.items():
+        if _legacy_search(keyword, text):
+            education_match = value
+            break
+    skills = {keyword for keyword in SKILL_KEYWORDS if _legacy_search(keyword, text)}
+    certifications = {keyword for keyword in CERTIFICATION_KEYWORDS if _legacy_search(keyword, text)}
+    return education_match, skills, certifications
+
+
+def _legacy_search(keyword, text):
+    try:
+        return re.search(r'\b' + keyword + r'\b', text, re.IGNORECASE)
+    except re.error:
+        return None
+
+
+def matcher_keyword_scan(text):
+    hits = KEYWORD_MATCHER.find(text)
+    found_education = hits.get('education', set())
+    education_match = next((value for keyword, value in EDUCATION_KEYWORDS.items() if keyword in found_education), None)
+    return education_match, hits.get('skills', set()), hits.get('certifications', set())
+
+
+def build_synthetic_cv(rng, words):
+    parts = []
+    keywords = SKILL_KEYWORDS + list(EDUCATION_KEYWORDS) + CERTIFICATION_KEYWORDS
+    for _ in range(words):
+        if keywords and rng.random() < 0.05:
+            parts.append(rng.choice(keywords))
+        else:
+            parts.append(rng.choice(FILLER_WORDS))
+    return ' '.join(parts)
+
+
+class Command(BaseCommand):
+    help = 'Membandingkan waktu ekstraksi kata kunci per CV: loop regex lama vs KeywordMatcher.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--cvs', type=int, default=200, help='Jumlah CV sintetis.')
+        parser.add_argument('--words', type=int, default=600, help='Jumlah kata per CV.')
+        parser.add_argument('--seed', type=int, default=42)
+
+    def handle(self, *args, **options):
+        rng = random.Random(options['seed'])
+        corpus = [build_synthetic_cv(rng, options['words']) for _ in range(options['cvs'])]
+
+        legacy_time, legacy_results = self._run(legacy_keyword_scan, corpus)
+        matcher_time, matcher_results = self._run(matcher_keyword_scan, corpus)
+
+        mismatches = sum(1 for a, b in zip(legacy_results, matcher_results) if a != b)
+        per_cv_legacy = legacy_time / len(corpus) * 1000
+        per_cv_matcher = matcher_time / len(corpus) * 1000
+
+        self.stdout.write(f"CV: {len(corpus)} x {options['words']} kata")
+        self.stdout.write(f"Loop lama      : {per_cv_legacy:.3f} ms/CV")
+        self.stdout.write(f"KeywordMatcher : {per_cv_matcher:.3f} ms/CV")
+        if per_cv_matcher:
+            self.stdout.write(f"Speedup        : {per_cv_legacy / per_cv_matcher:.1f}x")
+        # Perbedaan bisa muncul untuk kata kunci bersimbol (mis. 'vue.js', 'c++') karena
+        # loop lama memperlakukannya sebagai regex, bukan teks literal.
+        self.stdout.write(f"Hasil berbeda  : {mismatches} CV")
+
+    def _run(self, scan, corpus):
+        start = time.perf_counter()
+        results = [scan(text) for text in corpus]
+        return time.perf_counter() - start, results
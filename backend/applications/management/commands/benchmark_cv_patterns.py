@@ -0,0 +1,66 @@
+import json
+import os
+import re
+import time
+
+from django.core.management.base import BaseCommand
+
+from applications import cv_patterns
+
+GOLDEN_FILE = os.path.join(os.path.dirname(os.path.abspath(cv_patterns.__file__)), 'data', 'golden', 'cv_patterns.json')
+
+EXTRACTORS = {
+    'email': cv_patterns.extract_email,
+    'phone_number': cv_patterns.extract_phone,
+    'experience_years': cv_patterns.extract_experience_years,
+    'projects_count': cv_patterns.extract_projects_count,
+}
+
+
+def legacy_extract(text):
+    """Pola lama dari parse_cv_text (dikompilasi ulang setiap panggilan), sebagai pembanding."""
+    result = {'email': '', 'phone_number': '', 'experience_years': 0, 'projects_count': 0}
+    email_match = re.compile(r'[\w\.-]+@[\w\.-]+\.\w+').search(text)
+    if email_match:
+        result['email'] = email_match.group(0)
+    phone_match = re.compile(r'(\+\d{1,3}\s?)?(\d{3,4}[\s-]?\d{3,4}[\s-]?\d{4})').search(text)
+    if phone_match:
+        result['phone_number'] = phone_match.group(0)
+    experience_match = re.compile(r'(\d+)\s+(tahun|year)s?\\s+experience|experience\\s+of\\s+(\\d+)\\s+(year|tahun)s?|\\b(\\d+)\\s+(tahun|year|thn)\\b').search(text)
+    if experience_match and experience_match.group(1):
+        result['experience_years'] = int(experience_match.group(1))
+    projects_match = re.compile(r'(\d+)\s+(project|proyek)s?', re.IGNORECASE).search(text)
+    if projects_match:
+        result['projects_count'] = int(projects_match.group(1))
+    return result
+
+
+def current_extract(text):
+    return {field: extractor(text) for field, extractor in EXTRACTORS.items()}
+
+
+class Command(BaseCommand):
+    help = (
+        'Microbenchmark pola regex CV (pola lama vs cv_patterns) pada teks golden file. '
+        'Kebenarannya diuji di applications/tests/test_cv_patterns.py (manage.py test).'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--iterations', type=int, default=2000, help='Putaran microbenchmark per kasus.')
+
+    def handle(self, *args, **options):
+        with open(GOLDEN_FILE, 'r') as f:
+            cases = json.load(f)
+
+        legacy_missed = sum(1 for case in cases if legacy_extract(case['text'])['experience_years'] != case['experience_years'])
+        self.stdout.write(f"Golden: {len(cases)} kasus (pola lama salah membaca pengalaman pada {legacy_missed} kasus)")
+
+        texts = [case['text'] for case in cases]
+        iterations = options['iterations']
+        for label, fn in (('Pola lama', legacy_extract), ('cv_patterns', current_extract)):
+            start = time.perf_counter()
+            for _ in range(iterations):
+                for text in texts:
+                    fn(text)
+            elapsed = time.perf_counter() - start
+            self.stdout.write(f"{label:<12}: {elapsed / (iterations * len(texts)) * 1e6:.2f} µs/CV")
@@ -0,0 +1,58 @@
+import random
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from applications.gemini_client import get_gemini_score
+
+
+def percentile(values, fraction):
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(fraction * (len(ordered) - 1))))
+    return ordered[index]
+
+
+class Command(BaseCommand):
+    help = (
+        'Mengukur latensi (p50/p99) dan throughput get_gemini_score. Jalankan bersama '
+        '`manage.py run_fake_llm` dan GEMINI_API_ENDPOINT untuk pengujian offline.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=100)
+        parser.add_argument('--callers', type=int, default=16, help='Jumlah thread pemanggil bersamaan.')
+        parser.add_argument('--duplicate-ratio', type=float, default=0.3,
+                            help='Proporsi request yang memakai prompt yang sama (menguji coalescing).')
+        parser.add_argument('--seed', type=int, default=42)
+
+    def handle(self, *args, **options):
+        rng = random.Random(options['seed'])
+        inputs = []
+        for index in range(options['requests']):
+            if inputs and rng.random() < options['duplicate_ratio']:
+                inputs.append(rng.choice(inputs))
+            else:
+                inputs.append((f"CV kandidat #{index}: Python, Django, SQL, {index % 7} tahun pengalaman", 'Backend Engineer', 70))
+
+        def timed_call(args):
+            start = time.perf_counter()
+            score, reason = get_gemini_score(*args)
+            return time.perf_counter() - start, score is not None
+
+        self.stdout.write(
+            f"Model: {settings.GEMINI_MODEL_NAME}, concurrency: {settings.GEMINI_MAX_CONCURRENCY}, "
+            f"timeout: {settings.GEMINI_TIMEOUT}s, unik: {len(set(inputs))}/{len(inputs)}"
+        )
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=options['callers']) as pool:
+            results = list(pool.map(timed_call, inputs))
+        elapsed = time.perf_counter() - start
+
+        latencies = [latency for latency, _ in results]
+        succeeded = sum(1 for _, ok in results if ok)
+        self.stdout.write(f"Berhasil   : {succeeded}/{len(results)}")
+        self.stdout.write(f"p50        : {percentile(latencies, 0.5) * 1000:.0f} ms")
+        self.stdout.write(f"p99        : {percentile(latencies, 0.99) * 1000:.0f} ms")
+        self.stdout.write(f"Throughput : {len(results) / elapsed:.1f} request/detik")
@@ -0,0 +1,69 @@
+import random
+import time
+
+from django.core.management.base import BaseCommand
+
+from applications.cv_parser import NER_HEADER_CHARS, SKILL_KEYWORDS
+from applications.model_registry import SPACY_MODEL_NAME, get_nlp
+
+FIRST_NAMES = ['Andi', 'Siti', 'Budi', 'Dewi', 'John', 'Maria', 'Rizky', 'Putri']
+LAST_NAMES = ['Pratama', 'Wijaya', 'Santoso', 'Smith', 'Hidayat', 'Lestari']
+CITIES = ['Jakarta', 'Bandung', 'Surabaya', 'Yogyakarta', 'Singapore', 'London']
+SENTENCES = [
+    'Led a team of engineers to deliver a customer-facing platform.',
+    'Improved query performance and reduced infrastructure cost.',
+    'Collaborated with product managers to define the roadmap.',
+    'Mentored junior developers and reviewed pull requests.',
+    'Designed data pipelines for reporting and analytics.',
+]
+
+
+def build_synthetic_cvs(rng, count, sentences):
+    corpus = []
+    for _ in range(count):
+        name = f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}"
+        header = f"{name}\n{rng.choice(CITIES)}, Indonesia\n{name.split()[0].lower()}@example.com\n+62 812 3456 7890\n"
+        skills = ', '.join(rng.sample(SKILL_KEYWORDS, k=min(len(SKILL_KEYWORDS), 10)))
+        body = ' '.join(rng.choice(SENTENCES) for _ in range(sentences))
+        corpus.append(f"{header}\nSkills: {skills}\n\nExperience\n{body}")
+    return corpus
+
+
+class Command(BaseCommand):
+    help = 'Mengukur throughput NER (CV/detik): pipeline spaCy penuh vs pipeline ringkas dan nlp.pipe.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--cvs', type=int, default=200, help='Jumlah CV sintetis.')
+        parser.add_argument('--sentences', type=int, default=80, help='Jumlah kalimat per CV.')
+        parser.add_argument('--batch-size', type=int, default=32)
+        parser.add_argument('--n-process', type=int, default=1)
+        parser.add_argument('--skip-full', action='store_true', help='Lewati pengukuran pipeline penuh.')
+        parser.add_argument('--seed', type=int, default=42)
+
+    def handle(self, *args, **options):
+        rng = random.Random(options['seed'])
+        corpus = build_synthetic_cvs(rng, options['cvs'], options['sentences'])
+        avg_chars = sum(len(text) for text in corpus) / len(corpus)
+        self.stdout.write(f"CV: {len(corpus)} (rata-rata {avg_chars:,.0f} karakter)")
+
+        if not options['skip_full']:
+            import spacy
+
+            full_nlp = spacy.load(SPACY_MODEL_NAME)
+            self._report('Pipeline penuh, teks penuh', corpus, lambda: [full_nlp(text) for text in corpus])
+
+        nlp = get_nlp()
+        self.stdout.write(f"Komponen aktif pipeline ringkas: {nlp.pipe_names}")
+        headers = [text[:NER_HEADER_CHARS] for text in corpus]
+        self._report('Ringkas, header saja', corpus, lambda: [nlp(text) for text in headers])
+        self._report(
+            f"Ringkas + nlp.pipe (batch={options['batch_size']}, n_process={options['n_process']})",
+            corpus,
+            lambda: list(nlp.pipe(headers, batch_size=options['batch_size'], n_process=options['n_process'])),
+        )
+
+    def _report(self, label, corpus, fn):
+        start = time.perf_counter()
+        fn()
+        elapsed = time.perf_counter() - start
+        self.stdout.write(f"{label:<55}: {len(corpus) / elapsed:8.1f} CV/s")
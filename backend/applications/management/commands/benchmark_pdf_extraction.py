@@ -0,0 +1,105 @@
+import io
+import time
+import tracemalloc
+
+import pypdf
+from django.core.management.base import BaseCommand
+
+from applications.cv_parser import CV_PDF_MAX_PAGES, CV_TEXT_MAX_CHARS, extract_text_from_pdf
+
+LINE = 'Experienced Python developer building Django REST APIs, PostgreSQL, Docker and AWS pipelines'
+
+
+def build_synthetic_pdf(pages, lines_per_page=60, image_bytes=0, clustered=False):
+    """
+    PDF teks minimal (Helvetica) dengan `pages` halaman, dibuat tanpa library tambahan.
+    Bila `image_bytes` > 0 setiap halaman juga membawa XObject gambar sebesar itu
+    (meniru CV hasil scan/berfoto); gambar tidak dibaca saat ekstraksi teks.
+    `clustered=True` menaruh semua objek /Page di akhir file, seperti banyak generator
+    PDF modern; default-nya setiap /Page tepat setelah isi halamannya.
+    """
+    objects = [
+        b'<< /Type /Catalog /Pages 2 0 R >>',
+        None,  # diisi setelah objek halaman diketahui
+        b'<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>',
+    ]
+    page_refs = []
+    page_dicts = []
+    for page in range(pages):
+        lines = [f'({LINE} - halaman {page + 1} baris {line + 1}) Tj T*' for line in range(lines_per_page)]
+        stream = ('BT /F1 9 Tf 11 TL 40 800 Td ' + ' '.join(lines) + ' ET').encode('latin-1')
+        objects.append(b'<< /Length %d >>\nstream\n' % len(stream) + stream + b'\nendstream')
+        content_ref = len(objects)
+        xobject = b''
+        if image_bytes:
+            objects.append(
+                b'<< /Type /XObject /Subtype /Image /Width %d /Height 1 /ColorSpace /DeviceGray '
+                b'/BitsPerComponent 8 /Length %d >>\nstream\n' % (image_bytes, image_bytes)
+                + bytes(range(256)) * (image_bytes // 256) + bytes(image_bytes % 256) + b'\nendstream'
+            )
+            xobject = b' /XObject << /Im1 %d 0 R >>' % len(objects)
+        page_dict = (
+            b'<< /Type /Page /Parent 2 0 R /MediaBox [0 0 595 842] '
+            b'/Resources << /Font << /F1 3 0 R >>%s >> /Contents %d 0 R >>' % (xobject, content_ref)
+        )
+        if clustered:
+            page_dicts.append(page_dict)
+        else:
+            objects.append(page_dict)
+            page_refs.append(len(objects))
+    for page_dict in page_dicts:
+        objects.append(page_dict)
+        page_refs.append(len(objects))
+    kids = b' '.join(b'%d 0 R' % ref for ref in page_refs)
+    objects[1] = b'<< /Type /Pages /Kids [' + kids + b'] /Count %d >>' % pages
+
+    out = io.BytesIO()
+    out.write(b'%PDF-1.4\n')
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(out.tell())
+        out.write(b'%d 0 obj\n' % number + body + b'\nendobj\n')
+    xref = out.tell()
+    out.write(b'xref\n0 %d\n0000000000 65535 f \n' % (len(objects) + 1))
+    for offset in offsets:
+        out.write(b'%010d 00000 n \n' % offset)
+    out.write(b'trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n' % (len(objects) + 1, xref))
+    return out.getvalue()
+
+
+def legacy_extract(pdf_file_bytes):
+    """Ekstraksi lama: semua halaman digabung dengan konkatenasi string."""
+    text = ""
+    reader = pypdf.PdfReader(io.BytesIO(pdf_file_bytes))
+    for page in reader.pages:
+        text += page.extract_text() or ""
+    return text
+
+
+def measure(fn, pdf_bytes):
+    tracemalloc.start()
+    started = time.perf_counter()
+    text = fn(pdf_bytes)
+    elapsed = time.perf_counter() - started
+    _current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, peak, len(text or '')
+
+
+class Command(BaseCommand):
+    help = 'Membandingkan ekstraksi PDF lama (seluruh dokumen) dengan ekstraksi streaming berbatas pada PDF sintetis besar.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--pages', type=int, nargs='+', default=[2, 20, 200])
+        parser.add_argument('--lines-per-page', type=int, default=60)
+
+    def handle(self, *args, **options):
+        self.stdout.write(f"Batas aktif: CV_PDF_MAX_PAGES={CV_PDF_MAX_PAGES}, CV_TEXT_MAX_CHARS={CV_TEXT_MAX_CHARS}")
+        for pages in options['pages']:
+            pdf_bytes = build_synthetic_pdf(pages, options['lines_per_page'])
+            self.stdout.write(f"\nPDF {pages} halaman ({len(pdf_bytes) / 1024:.0f} KiB)")
+            for label, fn in (('Lama (semua halaman)', legacy_extract), ('Streaming berbatas', extract_text_from_pdf)):
+                elapsed, peak, chars = measure(fn, pdf_bytes)
+                self.stdout.write(
+                    f"  {label:<22}: {elapsed * 1000:9.1f} ms, puncak memori {peak / 1024 / 1024:7.2f} MiB, {chars} karakter"
+                )
@@ -0,0 +1,103 @@
+import math
+import random
+import time
+from datetime import date, datetime, timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from applications.interval_index import IntervalIndex
+from applications.scheduling_service import WIB_TZ, allocate_slots, build_availability, build_slot_grid
+
+
+def legacy_linear_walk(job_data, applicants, booked_times):
+    """
+    Algoritma lama auto_schedule_interviews tanpa I/O: maju satu `duration` per
+    langkah untuk setiap pelamar dan hanya mengecek timestamp yang persis sama.
+    Mengembalikan (slot terpilih, round trip Supabase).
+    """
+    start_date = datetime.strptime(job_data['schedule_start_date'], '%Y-%m-%d').date()
+    end_date = datetime.strptime(job_data['schedule_end_date'], '%Y-%m-%d').date()
+    daily_start_time_str = job_data['daily_start_time']
+    daily_end_time_str = job_data['daily_end_time']
+    duration = timedelta(minutes=job_data['duration_per_interview_minutes'])
+
+    current_datetime = WIB_TZ.localize(datetime.combine(start_date, datetime.strptime(daily_start_time_str, '%H:%M:%S').time()))
+    end_datetime_boundary = WIB_TZ.localize(datetime.combine(end_date, datetime.strptime(daily_end_time_str, '%H:%M:%S').time()))
+
+    chosen = []
+    round_trips = 0
+    for _applicant in applicants:
+        while current_datetime <= end_datetime_boundary:
+            daily_end_datetime = WIB_TZ.localize(datetime.combine(current_datetime.date(), datetime.strptime(daily_end_time_str, '%H:%M:%S').time()))
+            if current_datetime in booked_times:
+                current_datetime += duration
+                continue
+            if current_datetime + duration <= daily_end_datetime:
+                round_trips += 2  # insert schedules + update applicants
+                chosen.append(current_datetime)
+                current_datetime += duration
+                break
+            current_datetime = WIB_TZ.localize(datetime.combine(current_datetime.date() + timedelta(days=1), datetime.strptime(daily_start_time_str, '%H:%M:%S').time()))
+    return chosen, round_trips
+
+
+def bulk_allocate(job_data, applicants, booked_times):
+    existing_schedules = [{'interview_time': booked.isoformat()} for booked in booked_times]
+    availability = build_availability(job_data, existing_schedules)
+    assignments, _unassigned = allocate_slots(applicants, availability)
+    # Satu bulk insert + update status per SCHEDULING_UPDATE_CHUNK id
+    round_trips = 1 + math.ceil(len(assignments) / settings.SCHEDULING_UPDATE_CHUNK) if assignments else 0
+    return [slot for _applicant, slot in assignments], round_trips
+
+
+def count_conflicts(chosen, booked_times, duration):
+    booked = IntervalIndex((start, start + duration) for start in booked_times)
+    return sum(1 for slot in chosen if not booked.is_free(slot, slot + duration))
+
+
+class Command(BaseCommand):
+    help = 'Membandingkan penjadwalan lama (linear walk, 2 round trip per pelamar) dengan alokasi massal berbasis interval index.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--applicants', type=int, default=10000)
+        parser.add_argument('--weeks', type=int, default=12, help='Panjang jendela penjadwalan.')
+        parser.add_argument('--duration', type=int, default=5, help='Durasi wawancara (menit).')
+        parser.add_argument('--booked', type=int, default=500, help='Jumlah jadwal yang sudah ada.')
+        parser.add_argument('--off-grid', type=float, default=0.5,
+                            help='Proporsi jadwal lama yang tidak tepat di grid (mis. hasil reschedule).')
+        parser.add_argument('--rtt-ms', type=float, default=20.0, help='Perkiraan latensi per round trip Supabase.')
+        parser.add_argument('--seed', type=int, default=42)
+
+    def handle(self, *args, **options):
+        start = date(2025, 1, 6)
+        job_data = {
+            'schedule_start_date': start.isoformat(),
+            'schedule_end_date': (start + timedelta(weeks=options['weeks']) - timedelta(days=1)).isoformat(),
+            'daily_start_time': '08:00:00',
+            'daily_end_time': '18:00:00',
+            'duration_per_interview_minutes': options['duration'],
+        }
+        rng = random.Random(options['seed'])
+        grid = build_slot_grid(job_data)
+        duration = timedelta(minutes=options['duration'])
+        step = max(1, len(grid) // max(1, options['booked']))
+        booked_times = set()
+        for slot in grid[::step][:options['booked']]:
+            if rng.random() < options['off_grid']:
+                # Geser ke tengah slot: bertabrakan dengan dua slot grid tanpa timestamp yang sama
+                slot += duration / 2
+            booked_times.add(slot)
+        applicants = [{'id': f'applicant-{i}', 'name': f'Pelamar {i}'} for i in range(options['applicants'])]
+        self.stdout.write(f"Slot dalam jendela: {len(grid)}, sudah terisi: {len(booked_times)}, pelamar: {len(applicants)}")
+
+        for label, fn in (('Linear walk (lama)', legacy_linear_walk), ('Interval index', bulk_allocate)):
+            started = time.perf_counter()
+            chosen, round_trips = fn(job_data, applicants, booked_times)
+            cpu = time.perf_counter() - started
+            estimated = cpu + round_trips * options['rtt_ms'] / 1000
+            conflicts = count_conflicts(chosen, booked_times, duration)
+            self.stdout.write(
+                f"{label:<20}: {len(chosen)} terjadwal, {conflicts} bentrok, CPU {cpu * 1000:8.1f} ms, "
+                f"{round_trips:6d} round trip, perkiraan total {estimated:8.2f} s"
+            )
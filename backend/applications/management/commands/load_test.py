@@ -0,0 +1,101 @@
+import asyncio
+import json
+import time
+from collections import Counter
+
+import httpx
+from django.core.management.base import BaseCommand, CommandError
+
+
+def percentile(sorted_values, fraction):
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, round(fraction * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+
+def build_request(options):
+    """(method, path, body) untuk endpoint yang diuji."""
+    endpoint = options['endpoint']
+    job_id, applicant_id = options['job_id'], options['applicant_id']
+    if endpoint in ('questions', 'apply', 'schedule') and not job_id:
+        raise CommandError(f"--job-id wajib untuk endpoint {endpoint}.")
+    if endpoint == 'questions':
+        return 'GET', f"/api/jobs/{job_id}/assessment-questions/", None
+    if endpoint == 'schedule':
+        return 'POST', f"/api/jobs/{job_id}/schedule/", None
+    if endpoint == 'apply':
+        return 'POST', '/api/apply', {
+            'job_id': job_id,
+            'name': 'load-test',
+            'email': 'load-test@example.com',
+            'uploaded_files': [options['cv_path']] if options['cv_path'] else [],
+            'custom_answers': {},
+        }
+    if not applicant_id:
+        raise CommandError("--applicant-id wajib untuk endpoint submit.")
+    return 'POST', f"/api/applicants/{applicant_id}/submit-assessment/", {'answers': json.loads(options['answers'])}
+
+
+async def run_load(base_url, method, path, body, total, concurrency, timeout):
+    latencies, statuses = [], Counter()
+    remaining = iter(range(total))
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+
+    async with httpx.AsyncClient(base_url=base_url, timeout=timeout, limits=limits) as client:
+        async def user():
+            for _index in remaining:
+                started = time.perf_counter()
+                try:
+                    response = await client.request(method, path, json=body)
+                    statuses[response.status_code] += 1
+                except httpx.HTTPError as e:
+                    statuses[type(e).__name__] += 1
+                latencies.append(time.perf_counter() - started)
+
+        started = time.perf_counter()
+        await asyncio.gather(*(user() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - started
+    return sorted(latencies), statuses, elapsed
+
+
+class Command(BaseCommand):
+    help = (
+        'Load test HTTP untuk endpoint apply, submit asesmen, pertanyaan asesmen dan auto-schedule. '
+        'Jalankan backend dua kali (WEB_SERVER_MODE=wsgi dan WEB_SERVER_MODE=asgi di port berbeda) '
+        'lalu beri kedua URL ke --base-url untuk membandingkan p50/p99. Endpoint apply, submit dan '
+        'schedule menulis data: arahkan ke Supabase uji, bukan produksi.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--base-url', nargs='+', default=['http://127.0.0.1:8000'])
+        parser.add_argument('--endpoint', choices=['questions', 'apply', 'submit', 'schedule'], default='questions')
+        parser.add_argument('--job-id')
+        parser.add_argument('--applicant-id')
+        parser.add_argument('--answers', default='{}', help='JSON {question_id: jawaban} untuk endpoint submit.')
+        parser.add_argument('--cv-path', help='Path CV di bucket storage untuk endpoint apply.')
+        parser.add_argument('--requests', type=int, default=500)
+        parser.add_argument('--concurrency', type=int, default=50)
+        parser.add_argument('--warmup', type=int, default=20, help='Request pemanasan per URL (tidak diukur).')
+        parser.add_argument('--timeout', type=float, default=30.0)
+
+    def handle(self, *args, **options):
+        method, path, body = build_request(options)
+        self.stdout.write(
+            f"{method} {path}: {options['requests']} request, konkurensi {options['concurrency']}"
+        )
+        for base_url in options['base_url']:
+            if options['warmup']:
+                asyncio.run(run_load(
+                    base_url, method, path, body, options['warmup'], min(options['warmup'], options['concurrency']), options['timeout'],
+                ))
+            latencies, statuses, elapsed = asyncio.run(run_load(
+                base_url, method, path, body, options['requests'], options['concurrency'], options['timeout'],
+            ))
+            status_summary = ', '.join(f"{status}: {count}" for status, count in sorted(statuses.items(), key=str))
+            self.stdout.write(
+                f"  {base_url:<28} p50 {percentile(latencies, 0.50) * 1000:8.1f} ms, "
+                f"p95 {percentile(latencies, 0.95) * 1000:8.1f} ms, "
+                f"p99 {percentile(latencies, 0.99) * 1000:8.1f} ms, "
+                f"{len(latencies) / elapsed:7.1f} req/s ({status_summary})"
+            )
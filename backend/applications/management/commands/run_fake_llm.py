@@ -0,0 +1,91 @@
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from django.core.management.base import BaseCommand
+
+
+def make_handler(latency, jitter, rate_limit, stats):
+    """
+    Handler yang meniru endpoint REST Gemini `POST /v1beta/models/<model>:generateContent`.
+    Bila `rate_limit` > 0, request melebihi batas per detik dijawab 429.
+    """
+    window = {'second': 0, 'count': 0}
+    lock = threading.Lock()
+
+    class FakeGeminiHandler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+
+        def log_message(self, format, *args):
+            pass
+
+        def _send_json(self, status, payload):
+            body = json.dumps(payload).encode('utf-8')
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_POST(self):
+            length = int(self.headers.get('Content-Length') or 0)
+            self.rfile.read(length)
+
+            if not self.path.endswith(':generateContent'):
+                self._send_json(404, {'error': {'code': 404, 'message': 'Not found', 'status': 'NOT_FOUND'}})
+                return
+
+            with lock:
+                stats['requests'] += 1
+                now = int(time.time())
+                if window['second'] != now:
+                    window['second'], window['count'] = now, 0
+                window['count'] += 1
+                limited = rate_limit and window['count'] > rate_limit
+                if limited:
+                    stats['rate_limited'] += 1
+
+            if limited:
+                self._send_json(429, {'error': {'code': 429, 'message': 'Resource exhausted', 'status': 'RESOURCE_EXHAUSTED'}})
+                return
+
+            time.sleep(max(0.0, latency + random.uniform(-jitter, jitter)))
+            score = random.randint(40, 95)
+            text = f"Skor: {score}\nAlasan: Respons dari server LLM palsu untuk pengujian offline."
+            self._send_json(200, {
+                'candidates': [{
+                    'content': {'parts': [{'text': text}], 'role': 'model'},
+                    'finishReason': 'STOP',
+                    'index': 0,
+                }],
+            })
+
+    return FakeGeminiHandler
+
+
+class Command(BaseCommand):
+    help = (
+        'Menjalankan server LLM palsu yang kompatibel dengan REST Gemini. '
+        'Set GEMINI_API_ENDPOINT=http://localhost:<port> agar gemini_client memakainya.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--port', type=int, default=8765)
+        parser.add_argument('--latency', type=float, default=0.8, help='Latensi rata-rata per respons (detik).')
+        parser.add_argument('--jitter', type=float, default=0.2, help='Variasi latensi +/- (detik).')
+        parser.add_argument('--rate-limit', type=int, default=0, help='Maksimum request per detik (0 = tanpa batas).')
+
+    def handle(self, *args, **options):
+        stats = {'requests': 0, 'rate_limited': 0}
+        handler = make_handler(options['latency'], options['jitter'], options['rate_limit'], stats)
+        server = ThreadingHTTPServer(('127.0.0.1', options['port']), handler)
+        self.stdout.write(f"Server LLM palsu berjalan di http://127.0.0.1:{options['port']} (Ctrl+C untuk berhenti)")
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.server_close()
+            self.stdout.write(f"Total request: {stats['requests']}, ditolak 429: {stats['rate_limited']}")
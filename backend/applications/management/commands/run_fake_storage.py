@@ -0,0 +1,116 @@
+import hashlib
+import os
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import unquote
+
+from django.core.management.base import BaseCommand
+
+_RANGE = re.compile(r'bytes=(\d*)-(\d*)$')
+
+
+def make_handler(root, latency, supports_range, stats):
+    """
+    Handler yang meniru `GET /object/<bucket>/<path>` Supabase Storage, membaca file
+    dari `root/<bucket>/<path>`. Mendukung satu rentang `Range: bytes=a-b` (206) dan
+    ETag; bila `supports_range` False header Range diabaikan (200, body utuh).
+    """
+    lock = threading.Lock()
+    etags = {}
+
+    def read_object(file_path):
+        stat = os.stat(file_path)
+        with open(file_path, 'rb') as f:
+            data = f.read()
+        # ETag di-cache per (path, mtime, ukuran) agar request Range berikutnya murah
+        version = (file_path, stat.st_mtime_ns, stat.st_size)
+        if version not in etags:
+            etags[version] = f'"{hashlib.md5(data).hexdigest()}"'
+        return data, etags[version]
+
+    class FakeStorageHandler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+
+        def log_message(self, format, *args):
+            pass
+
+        def _send(self, status, body=b'', headers=None):
+            self.send_response(status)
+            for name, value in (headers or {}).items():
+                self.send_header(name, value)
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            try:
+                self.wfile.write(body)
+            except (BrokenPipeError, ConnectionResetError):
+                # Klien berhenti membaca (mis. batas CV_MAX_BYTES tercapai)
+                pass
+            with lock:
+                stats['requests'] += 1
+                stats['bytes_sent'] += len(body)
+
+        def do_GET(self):
+            prefix = '/object/'
+            path = unquote(self.path.split('?', 1)[0])
+            file_path = os.path.normpath(os.path.join(root, path[len(prefix):]))
+            if not path.startswith(prefix) or not file_path.startswith(os.path.abspath(root)) or not os.path.isfile(file_path):
+                self._send(404, b'{"statusCode":"404","error":"not_found","message":"Object not found"}')
+                return
+
+            time.sleep(latency)
+            data, etag = read_object(file_path)
+            headers = {'Content-Type': 'application/octet-stream', 'ETag': etag}
+            match = _RANGE.match(self.headers.get('Range', '')) if supports_range else None
+            if not match or (not match.group(1) and not match.group(2)):
+                self._send(200, data, headers)
+                return
+
+            size = len(data)
+            if match.group(1):
+                start = int(match.group(1))
+                end = min(int(match.group(2)), size - 1) if match.group(2) else size - 1
+            else:
+                start, end = max(0, size - int(match.group(2))), size - 1
+            if start >= size or start > end:
+                self._send(416, b'', {'Content-Range': f'bytes */{size}'})
+                return
+            headers['Content-Range'] = f'bytes {start}-{end}/{size}'
+            self._send(206, data[start:end + 1], headers)
+
+    return FakeStorageHandler
+
+
+def start_server(root, port=0, latency=0.0, supports_range=True):
+    """Menjalankan server di thread latar; mengembalikan (server, stats). Port 0 = port bebas."""
+    stats = {'requests': 0, 'bytes_sent': 0}
+    server = ThreadingHTTPServer(('127.0.0.1', port), make_handler(os.path.abspath(root), latency, supports_range, stats))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, stats
+
+
+class Command(BaseCommand):
+    help = (
+        'Menjalankan server storage palsu yang kompatibel dengan download objek Supabase Storage. '
+        'Set STORAGE_ENDPOINT=http://localhost:<port> agar cv_storage memakainya.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--port', type=int, default=8766)
+        parser.add_argument('--root', default='.', help='Direktori berisi <bucket>/<path> file yang dilayani.')
+        parser.add_argument('--latency', type=float, default=0.0, help='Latensi per request (detik).')
+        parser.add_argument('--no-range', action='store_true', help='Abaikan header Range (selalu 200).')
+
+    def handle(self, *args, **options):
+        stats = {'requests': 0, 'bytes_sent': 0}
+        handler = make_handler(os.path.abspath(options['root']), options['latency'], not options['no_range'], stats)
+        server = ThreadingHTTPServer(('127.0.0.1', options['port']), handler)
+        self.stdout.write(f"Server storage palsu berjalan di http://127.0.0.1:{options['port']} (Ctrl+C untuk berhenti)")
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.server_close()
+            self.stdout.write(f"Total request: {stats['requests']}, byte terkirim: {stats['bytes_sent']}")
@@ -0,0 +1,81 @@
+import multiprocessing
+import signal
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import connections
+from prometheus_client import start_http_server
+
+from applications.metrics import clear_multiprocess_dir, collector_registry, mark_process_dead, multiprocess_dir
+from applications.model_registry import preload
+from applications.screening_queue import DatabaseQueue, default_worker_name
+
+
+def _worker_main(index, poll_interval):
+    # Koneksi database milik parent tidak boleh dipakai bersama setelah fork
+    connections.close_all()
+
+    stop = {'requested': False}
+
+    def request_stop(signum, frame):
+        stop['requested'] = True
+
+    signal.signal(signal.SIGTERM, request_stop)
+    signal.signal(signal.SIGINT, request_stop)
+
+    DatabaseQueue().run_worker(
+        default_worker_name(index),
+        poll_interval=poll_interval,
+        should_stop=lambda: stop['requested'],
+    )
+
+
+class Command(BaseCommand):
+    help = 'Menjalankan pool worker yang memproses antrean screening pelamar.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--processes', type=int, default=2, help='Jumlah proses worker.')
+        parser.add_argument('--poll-interval', type=float, default=1.0, help='Jeda (detik) saat antrean kosong.')
+        parser.add_argument(
+            '--metrics-port', type=int, default=settings.SCREENING_METRICS_PORT,
+            help='Port exporter Prometheus untuk metrik semua proses worker (0 = mati).',
+        )
+
+    def handle(self, *args, **options):
+        if multiprocess_dir():
+            # Nilai run sebelumnya dibuang; proses worker hasil fork menulis ke file per PID sendiri
+            clear_multiprocess_dir(multiprocess_dir())
+        # Muat model sekali di parent; proses worker mewarisinya lewat copy-on-write
+        timings = preload()
+        self.stdout.write(f"Model dimuat: {timings}")
+        connections.close_all()
+        processes = []
+        for index in range(options['processes']):
+            process = multiprocessing.Process(target=_worker_main, args=(index, options['poll_interval']), daemon=False)
+            process.start()
+            processes.append(process)
+        self.stdout.write(f"{len(processes)} worker screening berjalan.")
+        # Setelah fork agar socket exporter tidak diwarisi proses worker
+        self._start_exporter(options['metrics_port'])
+
+        def forward_signal(signum, frame):
+            for process in processes:
+                if process.is_alive():
+                    process.terminate()
+
+        signal.signal(signal.SIGTERM, forward_signal)
+        signal.signal(signal.SIGINT, forward_signal)
+
+        for process in processes:
+            process.join()
+            mark_process_dead(process.pid)
+
+    def _start_exporter(self, port):
+        if not port:
+            return
+        if not multiprocess_dir():
+            # Tanpa direktori multi-proses, exporter di parent hanya melihat metriknya sendiri
+            self.stderr.write("PROMETHEUS_MULTIPROC_DIR tidak di-set sebelum Django dimuat; metrik worker tidak diekspor.")
+            return
+        start_http_server(port, registry=collector_registry())
+        self.stdout.write(f"Metrik worker screening di :{port}/metrics")
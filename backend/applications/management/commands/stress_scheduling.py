@@ -0,0 +1,133 @@
+import threading
+import time
+import uuid
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from applications.interval_index import IntervalIndex
+from applications.models import SchedulingRequest
+from applications.scheduling_queue import DatabaseSchedulingQueue
+from applications.scheduling_service import fetch_job_schedules, interview_duration, schedule_job_interviews
+from applications.supabase_client import supabase
+
+
+class Command(BaseCommand):
+    help = (
+        'Stress test penjadwalan: ratusan pelamar lolos bersamaan untuk satu job, lalu '
+        'memeriksa tidak ada slot ganda atau tumpang tindih. Jalankan terhadap Supabase lokal '
+        'dengan DATABASE_URL ke Postgres lokal (advisory lock hanya aktif di Postgres).'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--job-id', required=True, help='Job uji dengan parameter penjadwalan lengkap.')
+        parser.add_argument('--applicants', type=int, default=300)
+        parser.add_argument('--concurrency', type=int, default=100, help='Thread yang memicu penjadwalan bersamaan.')
+        parser.add_argument('--mode', choices=['queue', 'direct'], default='queue',
+                            help='queue: lewat antrean yang digabung per job; direct: schedule_job_interviews langsung.')
+        parser.add_argument('--workers', type=int, default=4, help='Thread worker penjadwalan (mode queue).')
+        parser.add_argument('--keep', action='store_true', help='Jangan hapus data uji setelah selesai.')
+
+    def handle(self, *args, **options):
+        job_id = options['job_id']
+        job_data = supabase.from_('jobs').select('*').eq('id', job_id).single().execute().data
+        if not job_data:
+            raise CommandError(f"Job {job_id} tidak ditemukan.")
+        if connection.vendor != 'postgresql':
+            self.stdout.write(self.style.WARNING("DATABASE_URL bukan Postgres: hanya lock per proses yang diuji."))
+
+        run_id = uuid.uuid4().hex[:8]
+        rows = [
+            {
+                'name': f'stress-{run_id}-{i}',
+                'email': f'stress-{run_id}-{i}@example.com',
+                'job_id': job_id,
+                'status': 'Shortlisted',
+                'auto_screening_status': 'Lolos',
+                'custom_answers': {},
+            }
+            for i in range(options['applicants'])
+        ]
+        applicant_ids = [row['id'] for row in supabase.from_('applicants').insert(rows).execute().data]
+        self.stdout.write(f"{len(applicant_ids)} pelamar uji dibuat (run {run_id}).")
+
+        try:
+            started = time.perf_counter()
+            runs = self._fire(job_id, options)
+            elapsed = time.perf_counter() - started
+            self._verify(job_id, job_data, set(map(str, applicant_ids)), runs, elapsed)
+        finally:
+            if not options['keep']:
+                supabase.from_('schedules').delete().in_('applicant_id', applicant_ids).execute()
+                supabase.from_('applicants').delete().in_('id', applicant_ids).execute()
+
+    def _fire(self, job_id, options):
+        queue = DatabaseSchedulingQueue()
+        runs = Counter()
+        runs_lock = threading.Lock()
+
+        def counted_process(scheduling_request):
+            with runs_lock:
+                runs['scheduling'] += 1
+            DatabaseSchedulingQueue.process(queue, scheduling_request)
+
+        queue.process = counted_process
+
+        def trigger(_index):
+            try:
+                if options['mode'] == 'queue':
+                    queue.request(job_id)
+                else:
+                    with runs_lock:
+                        runs['scheduling'] += 1
+                    schedule_job_interviews(job_id)
+            finally:
+                connection.close()
+
+        with ThreadPoolExecutor(max_workers=options['concurrency']) as pool:
+            list(pool.map(trigger, range(options['applicants'])))
+
+        if options['mode'] == 'queue':
+            def drain(index):
+                try:
+                    while queue.run_once(f'stress-{index}') or self._has_pending(job_id):
+                        time.sleep(0.05)
+                finally:
+                    connection.close()
+
+            with ThreadPoolExecutor(max_workers=options['workers']) as pool:
+                list(pool.map(drain, range(options['workers'])))
+        return runs
+
+    @staticmethod
+    def _has_pending(job_id):
+        return SchedulingRequest.objects.filter(job_id=job_id, pending=True).exists() or \
+            SchedulingRequest.objects.filter(job_id=job_id, lease_until__isnull=False).exists()
+
+    def _verify(self, job_id, job_data, applicant_ids, runs, elapsed):
+        schedules = fetch_job_schedules(job_id)
+        times = Counter(datetime.fromisoformat(s['interview_time']) for s in schedules)
+        duplicate_slots = sum(count - 1 for count in times.values() if count > 1)
+
+        duration = interview_duration(job_data)
+        booked = IntervalIndex()
+        overlaps = 0
+        for start in sorted(times):
+            if not booked.is_free(start, start + duration):
+                overlaps += 1
+            booked.add(start, start + duration)
+
+        per_applicant = Counter(str(s['applicant_id']) for s in schedules if str(s['applicant_id']) in applicant_ids)
+        double_booked_applicants = sum(1 for count in per_applicant.values() if count > 1)
+
+        self.stdout.write(f"Waktu total              : {elapsed:.2f} s")
+        self.stdout.write(f"Penjadwalan dijalankan   : {runs['scheduling']}x")
+        self.stdout.write(f"Pelamar uji terjadwal    : {len(per_applicant)}/{len(applicant_ids)}")
+        self.stdout.write(f"Slot ganda               : {duplicate_slots}")
+        self.stdout.write(f"Jadwal tumpang tindih    : {overlaps}")
+        self.stdout.write(f"Pelamar terjadwal ganda  : {double_booked_applicants}")
+        if duplicate_slots or overlaps or double_booked_applicants:
+            raise CommandError("Ditemukan double-booking.")
@@ -0,0 +1,87 @@
+# applications/metrics.py
+import glob
+import os
+
+from prometheus_client import CONTENT_TYPE_LATEST, REGISTRY, CollectorRegistry, Counter, Gauge, Histogram, generate_latest
+from prometheus_client import multiprocess
+
+# Batas bucket histogram durasi (detik): dari hit cache (ms) sampai panggilan Gemini/rescreen
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+# Dengan PROMETHEUS_MULTIPROC_DIR (lihat settings), prometheus_client menulis nilai
+# setiap proses ke file mmap di direktori itu; scrape menjumlahkan semua proses.
+STAGE_DURATION = Histogram(
+    'roxy_stage_duration_seconds', 'Durasi tiap tahap pipeline (download, extract, nlp, ml, llm, db_*).', ['stage'],
+    buckets=DEFAULT_BUCKETS,
+)
+STAGE_ERRORS = Counter(
+    'roxy_stage_errors_total', 'Tahap pipeline yang berakhir dengan exception.', ['stage', 'error'],
+)
+ML_FALLBACK_SCORES = Counter(
+    'roxy_ml_fallback_scores_total', 'Skor ML yang dihitung dengan heuristik fallback.', ['reason'],
+)
+GEMINI_FAILURES = Counter(
+    'roxy_gemini_failures_total', 'Panggilan Gemini yang gagal dan tidak menghasilkan skor.', ['kind'],
+)
+LLM_CACHE_LOOKUPS = Counter(
+    'roxy_llm_cache_lookups_total', 'Lookup cache skor Gemini.', ['result'],
+)
+SUPABASE_ROUND_TRIPS = Counter(
+    'roxy_supabase_round_trips_total', 'Round trip HTTP ke Supabase (PostgREST/Storage), termasuk retry.', ['method'],
+)
+SUPABASE_RETRIES = Counter(
+    'roxy_supabase_retries_total', 'Retry panggilan Supabase; outcome=budget_exhausted bila ditolak retry budget.', ['reason', 'outcome'],
+)
+SUPABASE_ROUND_TRIPS_PER_REQUEST = Histogram(
+    'roxy_supabase_round_trips_per_request', 'Jumlah round trip Supabase per request HTTP (N+1 terlihat di ekor distribusi).',
+    ['view'], buckets=(0, 1, 2, 3, 5, 8, 13, 21, 34, 55, 100),
+)
+RPC_FALLBACKS = Counter(
+    'roxy_rpc_fallbacks_total', 'Panggilan RPC Supabase yang gagal karena fungsinya belum dibuat (PGRST202).',
+    ['function'],
+)
+# Setiap proses web punya pool ekstraksi sendiri: nilai proses yang masih hidup dijumlahkan
+EXTRACTION_QUEUE_DEPTH = Gauge(
+    'roxy_extraction_queue_depth', 'Dokumen yang sedang menunggu atau diproses di pool ekstraksi.',
+    multiprocess_mode='livesum',
+)
+EXTRACTION_FAILURES = Counter(
+    'roxy_extraction_failures_total', 'Ekstraksi dokumen yang gagal di pool (timeout, cpu_limit, busy, hung, worker_died, pool_reset).', ['reason'],
+)
+
+
+def observe_stage(stage_name, duration, context):
+    """Hook profiling (lihat PROFILING_HOOKS) yang mengisi histogram durasi per tahap."""
+    STAGE_DURATION.labels(stage=stage_name).observe(duration)
+    if context.get('error'):
+        STAGE_ERRORS.labels(stage=stage_name, error=context['error']).inc()
+
+
+def multiprocess_dir():
+    return os.environ.get('PROMETHEUS_MULTIPROC_DIR')
+
+
+def collector_registry():
+    """Registry untuk scrape: gabungan semua proses bila mode multi-proses aktif."""
+    if not multiprocess_dir():
+        return REGISTRY
+    registry = CollectorRegistry()
+    multiprocess.MultiProcessCollector(registry)
+    return registry
+
+
+def render_latest():
+    return generate_latest(collector_registry())
+
+
+def clear_multiprocess_dir(path):
+    """Menghapus file metrik run sebelumnya; dipanggil sekali saat proses induk mulai."""
+    os.makedirs(path, exist_ok=True)
+    for filename in glob.glob(os.path.join(path, '*.db')):
+        os.remove(filename)
+
+
+def mark_process_dead(pid):
+    """Gauge `livesum` dari proses yang sudah berhenti tidak lagi ikut dijumlahkan."""
+    if multiprocess_dir():
+        multiprocess.mark_process_dead(pid)
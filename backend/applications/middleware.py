@@ -0,0 +1,51 @@
+# applications/middleware.py
+import logging
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+
+from .metrics import SUPABASE_ROUND_TRIPS_PER_REQUEST
+from .supabase_client import count_round_trips
+
+logger = logging.getLogger(__name__)
+
+
+class SupabaseRoundTripMiddleware:
+    """
+    Mencatat jumlah round trip Supabase per request ke histogram
+    roxy_supabase_round_trips_per_request (label view) dan memberi peringatan bila
+    melewati SUPABASE_ROUND_TRIP_WARN, tanda pola N+1 di view tersebut.
+
+    Mendukung sync dan async agar view async di bawah ASGI tidak dipindah ke thread.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.is_async = iscoroutinefunction(get_response)
+        if self.is_async:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.is_async:
+            return self.__acall__(request)
+        with count_round_trips() as counter:
+            response = self.get_response(request)
+        return self._observe(request, response, counter)
+
+    async def __acall__(self, request):
+        with count_round_trips() as counter:
+            response = await self.get_response(request)
+        return self._observe(request, response, counter)
+
+    def _observe(self, request, response, counter):
+        match = getattr(request, 'resolver_match', None)
+        view = match.view_name if match else 'unresolved'
+        SUPABASE_ROUND_TRIPS_PER_REQUEST.labels(view=view).observe(counter.count)
+        if settings.SUPABASE_ROUND_TRIP_WARN and counter.count >= settings.SUPABASE_ROUND_TRIP_WARN:
+            logger.warning(f"[DB] {view}: {counter.count} round trip Supabase dalam satu request (kemungkinan N+1)")
+        if settings.DEBUG:
+            response['X-Supabase-Round-Trips'] = str(counter.count)
+        return response
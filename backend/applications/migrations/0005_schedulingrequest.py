@@ -0,0 +1,32 @@
+# Generated by Django 5.2.5 on 2026-10-17 12:00
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('applications', '0004_screeningtask'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SchedulingRequest',
+            fields=[
+                ('job_id', models.UUIDField(primary_key=True, serialize=False)),
+                ('pending', models.BooleanField(default=True)),
+                ('requested_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('visible_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('lease_until', models.DateTimeField(blank=True, null=True)),
+                ('locked_by', models.CharField(blank=True, default='', max_length=100)),
+                ('attempts', models.IntegerField(default=0)),
+                ('last_error', models.TextField(blank=True, default='')),
+                ('last_result', models.JSONField(blank=True, null=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['pending', 'visible_at'], name='schedulingreq_pending_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,22 @@
+# Generated by Django 5.2.5 on 2026-10-17 13:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('applications', '0005_schedulingrequest'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='JobScheduleCursor',
+            fields=[
+                ('job_id', models.UUIDField(primary_key=True, serialize=False)),
+                ('window_signature', models.CharField(max_length=64)),
+                ('last_slot', models.DateTimeField(blank=True, null=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.5 on 2026-10-17 18:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('applications', '0006_jobschedulecursor'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='screeningtask',
+            name='kind',
+            field=models.CharField(choices=[('applicant', 'Applicant'), ('job_rescreen', 'Job Rescreen')], default='applicant', max_length=20),
+        ),
+        migrations.AlterField(
+            model_name='screeningtask',
+            name='applicant_id',
+            field=models.UUIDField(blank=True, db_index=True, null=True),
+        ),
+    ]
@@ -0,0 +1,164 @@
+# applications/model_registry.py
+import logging
+import os
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+# Tentukan jalur file model secara relatif
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+MODEL_FILE = os.path.join(BASE_DIR, 'auto_screening_model.joblib')
+VECTORIZER_FILE = os.path.join(BASE_DIR, 'tfidf_vectorizer.joblib')
+
+SPACY_MODEL_NAME = 'en_core_web_sm'
+# cv_parser hanya membaca doc.ents (PERSON/GPE), jadi komponen lain tidak dimuat sama sekali
+SPACY_UNUSED_COMPONENTS = ['tagger', 'parser', 'attribute_ruler', 'lemmatizer', 'senter']
+
+# Durasi (detik) setiap artefak dimuat, untuk instrumentasi startup
+STARTUP_TIMINGS = {}
+
+_lock = threading.Lock()
+_loaded = {}
+
+
+class ScreeningModel:
+    """Model screening beserta vectorizer TF-IDF dan peta kolom yang sudah dihitung."""
+
+    def __init__(self, vectorizer, model, feature_names, feature_index, tfidf_to_model_column):
+        self.vectorizer = vectorizer
+        self.model = model
+        self.feature_names = feature_names
+        self.feature_index = feature_index
+        self.tfidf_to_model_column = tfidf_to_model_column
+
+
+def record_timing(name, seconds):
+    STARTUP_TIMINGS[name] = round(seconds, 4)
+    logger.info(f"[STARTUP] {name} dimuat dalam {seconds:.3f}s")
+
+
+def _get(name, loader):
+    """
+    Memuat artefak `name` sekali per proses (thread-safe). Jika dipanggil sebelum
+    fork (gunicorn preload_app), hasilnya dibagi ke worker lewat copy-on-write.
+    """
+    if name in _loaded:
+        return _loaded[name]
+    with _lock:
+        if name not in _loaded:
+            start = time.perf_counter()
+            _loaded[name] = loader()
+            record_timing(name, time.perf_counter() - start)
+    return _loaded[name]
+
+
+def _load_nlp():
+    # Import spaCy di sini agar proses yang tidak melakukan parsing tidak membayar biayanya
+    import spacy
+
+    try:
+        nlp = spacy.load(SPACY_MODEL_NAME, exclude=SPACY_UNUSED_COMPONENTS)
+    except OSError:
+        logger.info(f"[MODEL] Model spaCy '{SPACY_MODEL_NAME}' belum terpasang, mengunduh...")
+        from spacy.cli import download
+        download(SPACY_MODEL_NAME)
+        nlp = spacy.load(SPACY_MODEL_NAME, exclude=SPACY_UNUSED_COMPONENTS)
+
+    # Di en_core_web_sm, NER punya tok2vec sendiri; tok2vec bersama hanya dipakai
+    # tagger/parser. Matikan bila tidak ada komponen tersisa yang mendengarkannya.
+    if 'tok2vec' in nlp.pipe_names and not getattr(nlp.get_pipe('tok2vec'), 'listening_components', None):
+        nlp.disable_pipe('tok2vec')
+    return nlp
+
+
+def _load_screening_model():
+    import joblib
+    import numpy as np
+
+    try:
+        vectorizer = joblib.load(VECTORIZER_FILE)
+        model = joblib.load(MODEL_FILE)
+    except FileNotFoundError:
+        logger.warning("[MODEL] File model tidak ditemukan. Pastikan Anda telah melatih dan menyimpan model.")
+        return None
+
+    # Ambil nama fitur yang diharapkan oleh model
+    # Ini memastikan urutan kolom yang benar saat prediksi
+    if hasattr(model, 'feature_names_in_'):
+        feature_names = model.feature_names_in_.tolist()
+    else:
+        # Fallback: jika model tidak memiliki fitur ini,
+        # kita harus membuat daftar fitur secara manual berdasarkan data pelatihan.
+        logger.warning("[MODEL] Model tidak memiliki 'feature_names_in_'. Membangun daftar fitur secara manual.")
+
+        # Contoh: berdasarkan AI_Resume_Screening.csv
+        numerical_features = ['Experience (Years)', 'Projects Count']
+        ohe_features = [
+            'Education_B.Sc', 'Education_B.Tech', 'Education_MBA', 'Education_M.Tech', 'Education_PhD',
+            'Certifications_AWS Certified', 'Certifications_Deep Learning Specialization', 'Certifications_Google ML', 'Certifications_None',
+            'Job Role_AI Researcher', 'Job Role_Cybersecurity Analyst', 'Job Role_Data Scientist', 'Job Role_Software Engineer'
+        ]
+        tfidf_features = vectorizer.get_feature_names_out().tolist()
+        feature_names = numerical_features + ohe_features + tfidf_features
+
+    logger.info(f"[MODEL] Model berhasil dimuat. Total fitur yang diharapkan: {len(feature_names)}")
+
+    # Peta kolom yang dihitung sekali: nama fitur -> indeks kolom model, dan
+    # kolom vectorizer TF-IDF -> kolom model (-1 jika model tidak memakainya).
+    feature_index = {name: i for i, name in enumerate(feature_names)}
+    tfidf_to_model_column = np.array(
+        [feature_index.get(name, -1) for name in vectorizer.get_feature_names_out()],
+        dtype=np.int64,
+    )
+    return ScreeningModel(vectorizer, model, feature_names, feature_index, tfidf_to_model_column)
+
+
+def _load_genai():
+    import google.generativeai as genai
+
+    # Pastikan Anda sudah membuat file .env di direktori backend/
+    # dengan baris GEMINI_API_KEY="YOUR_API_KEY_DI_SINI"
+    endpoint = os.getenv("GEMINI_API_ENDPOINT")
+    if endpoint:
+        # Endpoint alternatif (mis. server palsu `manage.py run_fake_llm`) lewat REST
+        genai.configure(
+            api_key=os.getenv("GEMINI_API_KEY") or "fake-key",
+            transport="rest",
+            client_options={"api_endpoint": endpoint},
+        )
+    else:
+        genai.configure(api_key=os.getenv("GEMINI_API_KEY"))
+    return genai
+
+
+def get_nlp():
+    return _get('spacy', _load_nlp)
+
+
+def get_genai():
+    """SDK google.generativeai yang sudah dikonfigurasi dengan API key."""
+    return _get('genai', _load_genai)
+
+
+def get_screening_model():
+    """Mengembalikan ScreeningModel, atau None bila file model tidak tersedia."""
+    return _get('screening_model', _load_screening_model)
+
+
+def preload():
+    """
+    Memuat semua artefak sekarang juga. Dipanggil dari hook gunicorn (lihat
+    gunicorn.conf.py) sebelum worker di-fork, atau oleh worker screening.
+    """
+    start = time.perf_counter()
+    get_nlp()
+    get_screening_model()
+    # get_genai() sengaja tidak dipanggil: SDK Gemini memakai gRPC yang tidak
+    # aman di-fork, jadi dimuat di masing-masing worker saat pertama dipakai.
+    record_timing('preload_total', time.perf_counter() - start)
+    return dict(STARTUP_TIMINGS)
+
+
+def is_loaded(name):
+    return name in _loaded
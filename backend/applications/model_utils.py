@@ -1,102 +1,100 @@
-import joblib
-import pandas as pd
-import os
+import logging
+import warnings
 import numpy as np
 
-# Tentukan jalur file model secara relatif
-BASE_DIR = os.path.dirname(os.path.abspath(__file__))
-MODEL_FILE = os.path.join(BASE_DIR, 'auto_screening_model.joblib')
-VECTORIZER_FILE = os.path.join(BASE_DIR, 'tfidf_vectorizer.joblib')
+from .metrics import ML_FALLBACK_SCORES
+from .model_registry import get_screening_model
 
-# Muat objek yang sudah disimpan
-try:
-    TFIDF_VECTORIZER = joblib.load(VECTORIZER_FILE)
-    MODEL = joblib.load(MODEL_FILE)
-    
-    # Ambil nama fitur yang diharapkan oleh model
-    # Ini memastikan urutan kolom yang benar saat prediksi
-    if hasattr(MODEL, 'feature_names_in_'):
-        MODEL_FEATURE_NAMES = MODEL.feature_names_in_.tolist()
-    else:
-        # Fallback: jika model tidak memiliki fitur ini,
-        # kita harus membuat daftar fitur secara manual berdasarkan data pelatihan.
-        print("Peringatan: Model tidak memiliki 'feature_names_in_'. Membangun daftar fitur secara manual.")
-        
-        # Contoh: berdasarkan AI_Resume_Screening.csv
-        numerical_features = ['Experience (Years)', 'Projects Count']
-        ohe_features = [
-            'Education_B.Sc', 'Education_B.Tech', 'Education_MBA', 'Education_M.Tech', 'Education_PhD',
-            'Certifications_AWS Certified', 'Certifications_Deep Learning Specialization', 'Certifications_Google ML', 'Certifications_None',
-            'Job Role_AI Researcher', 'Job Role_Cybersecurity Analyst', 'Job Role_Data Scientist', 'Job Role_Software Engineer'
-        ]
-        tfidf_features = TFIDF_VECTORIZER.get_feature_names_out().tolist()
-        MODEL_FEATURE_NAMES = numerical_features + ohe_features + tfidf_features
-    
-    print(f"Model berhasil dimuat. Total fitur yang diharapkan: {len(MODEL_FEATURE_NAMES)}")
-    
-except FileNotFoundError:
-    print("Peringatan: File model tidak ditemukan. Pastikan Anda telah melatih dan menyimpan model.")
-    TFIDF_VECTORIZER = None
-    MODEL = None
-    MODEL_FEATURE_NAMES = None
+logger = logging.getLogger(__name__)
 
-def get_ai_score(applicant_data, job_data):
+def build_feature_matrix(screening_model, applicants, job_data):
     """
-    Menghitung skor AI untuk pelamar berdasarkan data CV dan data job.
+    Menyusun matriks fitur sparse CSR (N x jumlah fitur model) untuk N pelamar
+    sekaligus, dengan urutan kolom = screening_model.feature_names.
     """
-    if not MODEL or not TFIDF_VECTORIZER or not MODEL_FEATURE_NAMES:
-        return calculate_fallback_score(applicant_data, job_data)
-    
-    try:
-        # Buat DataFrame dengan semua fitur yang diharapkan dan inisialisasi dengan nol
-        df_predict = pd.DataFrame(0, index=[0], columns=MODEL_FEATURE_NAMES)
-        
-        # Isi data yang tersedia
-        df_predict['Experience (Years)'] = applicant_data.get('experience_years', 0)
-        df_predict['Projects Count'] = applicant_data.get('projects_count', 0)
-        
-        # Isi fitur One-Hot Encoding
+    # scipy diimpor saat dibutuhkan saja agar startup proses tetap ringan
+    from scipy import sparse
+
+    n_rows = len(applicants)
+    rows, cols, values = [], [], []
+    feature_index = screening_model.feature_index
+
+    def put(row, column_name, value):
+        col = feature_index.get(column_name)
+        if col is not None and value:
+            rows.append(row)
+            cols.append(col)
+            values.append(float(value))
+
+    job_role_val = job_data.get('title')
+    for row, applicant_data in enumerate(applicants):
+        put(row, 'Experience (Years)', applicant_data.get('experience_years', 0))
+        put(row, 'Projects Count', applicant_data.get('projects_count', 0))
+
+        # Fitur One-Hot Encoding
         education_val = applicant_data.get('education')
         if education_val:
-            col_name = f'Education_{education_val}'
-            if col_name in df_predict.columns:
-                df_predict[col_name] = 1
-                
-        # Catatan: cv_parser.py tidak mengekstrak certifications, jadi kita asumsikan 'None'
+            put(row, f'Education_{education_val}', 1)
+
+        # Catatan: nilai selain string (mis. list dari cv_parser) tidak cocok dengan kolom mana pun
         cert_val = applicant_data.get('certifications', 'None')
-        col_name = f'Certifications_{cert_val}'
-        if col_name in df_predict.columns:
-            df_predict[col_name] = 1
-        
-        job_role_val = job_data.get('title')
+        put(row, f'Certifications_{cert_val}', 1)
+
         if job_role_val:
-            col_name = f'Job Role_{job_role_val}'
-            if col_name in df_predict.columns:
-                df_predict[col_name] = 1
-                
-        # Isi fitur TF-IDF
-        skills_text = ' '.join(applicant_data.get('skills', []))
-        if skills_text.strip():
-            skills_tfidf_matrix = TFIDF_VECTORIZER.transform([skills_text])
-            skills_df = pd.DataFrame(skills_tfidf_matrix.toarray(), columns=TFIDF_VECTORIZER.get_feature_names_out())
-            
-            # Update DataFrame prediksi dengan nilai TF-IDF
-            for col in skills_df.columns:
-                if col in df_predict.columns:
-                    df_predict[col] = skills_df[col]
-                    
-        # Pastikan urutan kolom sesuai dengan yang diharapkan oleh model
-        df_predict = df_predict[MODEL_FEATURE_NAMES]
-        
-        # Lakukan prediksi
-        score = MODEL.predict(df_predict)[0]
-        score = max(0, min(100, float(score)))
-        
-        return {'score': score, 'reason': 'Skor AI berhasil dihitung.'}
+            put(row, f'Job Role_{job_role_val}', 1)
+
+    base = sparse.csr_matrix((values, (rows, cols)), shape=(n_rows, len(screening_model.feature_names)))
+
+    # Fitur TF-IDF: satu transform untuk semua pelamar, lalu kolomnya dipetakan
+    # langsung ke kolom model tanpa DataFrame perantara.
+    skills_texts = [' '.join(applicant.get('skills', [])) for applicant in applicants]
+    tfidf = screening_model.vectorizer.transform(skills_texts).tocoo()
+    model_cols = screening_model.tfidf_to_model_column[tfidf.col]
+    keep = model_cols >= 0
+    tfidf_mapped = sparse.csr_matrix(
+        (tfidf.data[keep], (tfidf.row[keep], model_cols[keep])),
+        shape=base.shape,
+    )
+    return (base + tfidf_mapped).tocsr()
+
+def _predict(model, features):
+    with warnings.catch_warnings():
+        # Model dilatih dengan DataFrame; matriks sparse tidak membawa nama fitur
+        # tetapi urutan kolomnya sudah sama dengan feature_names model.
+        warnings.filterwarnings('ignore', message='X does not have valid feature names')
+        try:
+            return model.predict(features)
+        except (TypeError, ValueError):
+            # Estimator yang tidak menerima input sparse
+            return model.predict(features.toarray())
+
+def get_ai_score(applicant_data, job_data):
+    """
+    Menghitung skor AI untuk pelamar berdasarkan data CV dan data job.
+    """
+    return get_ai_scores_batch([applicant_data], job_data)[0]
+
+def get_ai_scores_batch(applicants, job_data):
+    """
+    Versi batch dari get_ai_score: semua pelamar diprediksi dengan satu panggilan
+    MODEL.predict. Mengembalikan list hasil dengan urutan yang sama dengan input.
+    """
+    if not applicants:
+        return []
+    screening_model = get_screening_model()
+    if not screening_model:
+        ML_FALLBACK_SCORES.labels(reason='no_model').inc(len(applicants))
+        return [calculate_fallback_score(applicant, job_data) for applicant in applicants]
+    
+    try:
+        features = build_feature_matrix(screening_model, applicants, job_data)
+        scores = np.clip(np.asarray(_predict(screening_model.model, features), dtype=float), 0, 100)
+        return [{'score': float(score), 'reason': 'Skor AI berhasil dihitung.'} for score in scores]
     
     except Exception as e:
-        print(f"Error dalam prediksi: {e}")
-        return calculate_fallback_score(applicant_data, job_data)
+        logger.error(f"Error dalam prediksi batch: {e}")
+        ML_FALLBACK_SCORES.labels(reason='predict_error').inc(len(applicants))
+        return [calculate_fallback_score(applicant, job_data) for applicant in applicants]
 
 def calculate_fallback_score(applicant_data, job_data):
     """
@@ -139,5 +137,5 @@ def calculate_fallback_score(applicant_data, job_data):
         return {'score': float(final_score), 'reason': 'Skor dihitung menggunakan metode fallback.'}
         
     except Exception as e:
-        print(f"Error dalam perhitungan skor fallback: {e}")
+        logger.error(f"Error dalam perhitungan skor fallback: {e}")
         return {'score': 0, 'reason': 'Error dalam perhitungan skor fallback.'}
\ No newline at end of file
@@ -84,4 +84,85 @@ class AssessmentAnswer(models.Model):
     score = models.IntegerField(null=True, blank=True)
     
     def __str__(self):
-        return f"Answer by {self.applicant.name} for question {self.question.id}"
\ No newline at end of file
+        return f"Answer by {self.applicant.name} for question {self.question.id}"
+
+# Model untuk antrean screening di background (pelamar sendiri disimpan di Supabase)
+class ScreeningTask(models.Model):
+    STATUS_CHOICES = [
+        ('queued', 'Queued'),
+        ('running', 'Running'),
+        ('done', 'Done'),
+        ('failed', 'Failed'),
+    ]
+    KIND_CHOICES = [
+        ('applicant', 'Applicant'),
+        ('job_rescreen', 'Job Rescreen'),
+    ]
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    # 'job_rescreen': rescreen semua pelamar job_id; progres per halaman disimpan di result
+    kind = models.CharField(max_length=20, choices=KIND_CHOICES, default='applicant')
+    applicant_id = models.UUIDField(null=True, blank=True, db_index=True)
+    job_id = models.UUIDField(null=True, blank=True)
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='queued')
+    attempts = models.IntegerField(default=0)
+    max_attempts = models.IntegerField(default=3)
+    # Task baru bisa diambil worker setelah waktu ini; saat 'running' berfungsi
+    # sebagai batas visibility timeout sebelum task dianggap ditinggal worker.
+    visible_at = models.DateTimeField(default=timezone.now)
+    locked_by = models.CharField(max_length=100, blank=True, default='')
+    last_error = models.TextField(blank=True, default='')
+    result = models.JSONField(null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['status', 'visible_at'], name='screeningtask_status_idx'),
+        ]
+
+    def __str__(self):
+        return f"ScreeningTask {self.id} ({self.status})"
+
+
+class SchedulingRequest(models.Model):
+    """
+    Permintaan penjadwalan wawancara per job. Satu baris per job, sehingga banyak
+    pelamar yang lolos bersamaan hanya menandai `pending` dan digabung menjadi
+    satu kali penjadwalan (lihat scheduling_queue.py).
+    """
+    job_id = models.UUIDField(primary_key=True)
+    pending = models.BooleanField(default=True)
+    requested_at = models.DateTimeField(default=timezone.now)
+    # Permintaan baru bisa diambil worker setelah waktu ini (dipakai untuk backoff retry)
+    visible_at = models.DateTimeField(default=timezone.now)
+    # Selama penjadwalan berjalan; bila lewat, worker dianggap mati dan job diulang
+    lease_until = models.DateTimeField(null=True, blank=True)
+    locked_by = models.CharField(max_length=100, blank=True, default='')
+    attempts = models.IntegerField(default=0)
+    last_error = models.TextField(blank=True, default='')
+    last_result = models.JSONField(null=True, blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['pending', 'visible_at'], name='schedulingreq_pending_idx'),
+        ]
+
+    def __str__(self):
+        return f"SchedulingRequest {self.job_id} (pending={self.pending})"
+
+
+class JobScheduleCursor(models.Model):
+    """
+    Slot terakhir yang dibagikan penjadwalan otomatis untuk sebuah job, dipakai
+    penjadwalan inkremental. `window_signature` mencatat parameter jendela job saat
+    cursor dibuat; bila berbeda, job dijadwalkan ulang penuh.
+    """
+    job_id = models.UUIDField(primary_key=True)
+    window_signature = models.CharField(max_length=64)
+    last_slot = models.DateTimeField(null=True, blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"JobScheduleCursor {self.job_id} ({self.last_slot})"
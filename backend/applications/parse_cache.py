@@ -0,0 +1,187 @@
+# applications/parse_cache.py
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import threading
+
+from cachetools import LRUCache
+from django.conf import settings
+
+from .cv_parser import CV_PDF_MAX_PAGES, CV_TEXT_MAX_CHARS, KEYWORDS_FILE, NER_HEADER_CHARS, PARSER_VERSION
+
+logger = logging.getLogger(__name__)
+
+
+def _keywords_version():
+    try:
+        with open(KEYWORDS_FILE, 'rb') as f:
+            return hashlib.sha256(f.read()).hexdigest()[:12]
+    except FileNotFoundError:
+        return 'none'
+
+
+# Versi parser, isi keywords.json, batas ekstraksi (halaman PDF, karakter teks) dan
+# panjang jendela NER ikut menentukan key, sehingga perubahan salah satunya otomatis
+# membuat entri lama (mis. teks terpotong di batas lama, entitas dari jendela lain)
+# tidak terpakai.
+CACHE_VERSION = f"{PARSER_VERSION}-{_keywords_version()}-p{CV_PDF_MAX_PAGES}-c{CV_TEXT_MAX_CHARS}-n{NER_HEADER_CHARS}"
+
+
+def make_digest_key(digest):
+    """Key dari SHA-256 (hex) yang sudah dihitung, mis. sambil mengunduh file."""
+    return f"{digest}-{CACHE_VERSION}"
+
+
+def make_cache_key(file_bytes):
+    return make_digest_key(hashlib.sha256(file_bytes).hexdigest())
+
+
+class ParseCache:
+    """
+    Cache dua tingkat untuk hasil ekstraksi teks CV dan parse_cv_text.
+
+    - Memori: LRU per proses, dibatasi total ukuran entri (byte). Entri disimpan
+      sebagai JSON sehingga setiap get() mengembalikan objek baru; pemanggil yang
+      mengubah hasilnya tidak mengubah isi cache.
+    - Disk: satu file JSON per entri, dipakai bersama semua proses worker.
+      Saat total ukuran melewati batas, file yang paling lama tidak diakses
+      (mtime) dihapus lebih dulu.
+
+    Key berasal dari SHA-256 isi file CV, jadi CV yang sama tidak pernah
+    di-parse ulang walaupun diunduh berkali-kali.
+    """
+
+    def __init__(self, directory, memory_max_bytes, disk_max_bytes):
+        self.directory = directory
+        self.disk_max_bytes = disk_max_bytes
+        self._memory = LRUCache(maxsize=memory_max_bytes, getsizeof=lambda entry: entry['size'])
+        self._lock = threading.Lock()
+        self._disk_bytes = None
+        self._counters = {'memory_hits': 0, 'disk_hits': 0, 'misses': 0, 'evictions': 0}
+
+    def get(self, key):
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                self._counters['memory_hits'] += 1
+        if entry is not None:
+            # Di-decode di luar lock; setiap pemanggil mendapat salinan sendiri
+            return json.loads(entry['payload'])
+
+        payload, value = self._read_disk(key)
+        with self._lock:
+            if value is None:
+                self._counters['misses'] += 1
+                return None
+            self._counters['disk_hits'] += 1
+            self._remember(key, payload)
+        return value
+
+    def set(self, key, value):
+        payload = json.dumps(value).encode('utf-8')
+        with self._lock:
+            self._remember(key, payload)
+        self._write_disk(key, payload)
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._counters)
+            stats['memory_entries'] = len(self._memory)
+            stats['memory_bytes'] = self._memory.currsize
+            stats['disk_bytes'] = self._disk_bytes
+            lookups = stats['memory_hits'] + stats['disk_hits'] + stats['misses']
+            stats['hit_ratio'] = (stats['memory_hits'] + stats['disk_hits']) / lookups if lookups else None
+        return stats
+
+    def _remember(self, key, payload):
+        if len(payload) <= self._memory.maxsize:
+            self._memory[key] = {'payload': payload, 'size': len(payload)}
+
+    def _path(self, key):
+        return os.path.join(self.directory, key[:2], f"{key}.json")
+
+    def _read_disk(self, key):
+        """(payload JSON, nilai) dari disk, atau (None, None)."""
+        path = self._path(key)
+        try:
+            with open(path, 'rb') as f:
+                payload = f.read()
+            value = json.loads(payload)
+            # Perbarui mtime supaya eviksi disk berperilaku seperti LRU
+            os.utime(path, None)
+            return payload, value
+        except FileNotFoundError:
+            return None, None
+        except (OSError, ValueError) as e:
+            logger.warning(f"Entri parse cache rusak, diabaikan: {path} ({e})")
+            return None, None
+
+    def _write_disk(self, key, payload):
+        path = self._path(key)
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            # Tulis ke file sementara lalu rename agar proses lain tidak membaca file setengah jadi
+            fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+            with os.fdopen(fd, 'wb') as f:
+                f.write(payload)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            logger.warning(f"Gagal menulis parse cache ke disk: {e}")
+            return
+
+        with self._lock:
+            if self._disk_bytes is not None:
+                self._disk_bytes += len(payload)
+            over_limit = self._disk_bytes is None or self._disk_bytes > self.disk_max_bytes
+        if over_limit:
+            self._evict_disk()
+
+    def _evict_disk(self):
+        files = []
+        for root, _dirs, names in os.walk(self.directory):
+            for name in names:
+                if not name.endswith('.json'):
+                    continue
+                path = os.path.join(root, name)
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+                files.append((stat.st_mtime, stat.st_size, path))
+
+        total = sum(size for _mtime, size, _path in files)
+        evicted = 0
+        if total > self.disk_max_bytes:
+            files.sort()
+            for _mtime, size, path in files:
+                if total <= self.disk_max_bytes:
+                    break
+                try:
+                    os.remove(path)
+                except OSError:
+                    continue
+                total -= size
+                evicted += 1
+
+        with self._lock:
+            self._disk_bytes = total
+            self._counters['evictions'] += evicted
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_parse_cache():
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = ParseCache(
+                    directory=str(settings.CV_PARSE_CACHE_DIR),
+                    memory_max_bytes=settings.CV_PARSE_CACHE_MEMORY_BYTES,
+                    disk_max_bytes=settings.CV_PARSE_CACHE_DISK_BYTES,
+                )
+    return _cache
@@ -0,0 +1,134 @@
+# applications/profiling.py
+import logging
+import threading
+import time
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.utils.module_loading import import_string
+
+logger = logging.getLogger(__name__)
+
+# Tahap pipeline yang diukur oleh service layer
+DOWNLOAD = 'download'
+EXTRACT = 'extract'
+NLP = 'nlp'
+ML = 'ml'
+LLM = 'llm'
+DB_READ = 'db_read'
+DB_WRITE = 'db_write'
+GRADE = 'grade'
+ALLOCATE = 'allocate'
+
+
+class StageStats:
+    """Agregat per tahap di proses ini: jumlah, total, maksimum dan error (detik)."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._stages = {}
+
+    def __call__(self, stage_name, duration, context):
+        with self._lock:
+            entry = self._stages.setdefault(stage_name, {'count': 0, 'total': 0.0, 'max': 0.0, 'errors': 0})
+            entry['count'] += 1
+            entry['total'] += duration
+            entry['max'] = max(entry['max'], duration)
+            if context.get('error'):
+                entry['errors'] += 1
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                name: {
+                    'count': entry['count'],
+                    'errors': entry['errors'],
+                    'avg_ms': round(entry['total'] / entry['count'] * 1000, 2),
+                    'max_ms': round(entry['max'] * 1000, 2),
+                    'total_ms': round(entry['total'] * 1000, 2),
+                }
+                for name, entry in self._stages.items()
+            }
+
+    def reset(self):
+        with self._lock:
+            self._stages.clear()
+
+
+stage_stats = StageStats()
+
+
+def log_stage(stage_name, duration, context):
+    """Hook yang menulis satu baris log per tahap (untuk investigasi, bukan produksi)."""
+    details = ' '.join(f"{key}={value}" for key, value in context.items())
+    logger.info(f"[PROFILE] {stage_name} {duration * 1000:.1f} ms {details}".rstrip())
+
+
+_hooks = None
+_hooks_lock = threading.Lock()
+
+
+def get_hooks():
+    """Hook dari PROFILING_HOOKS (dotted path ke callable `hook(stage, detik, context)`)."""
+    global _hooks
+    if _hooks is None:
+        with _hooks_lock:
+            if _hooks is None:
+                _hooks = [import_string(path) for path in settings.PROFILING_HOOKS]
+    return _hooks
+
+
+def register_hook(hook):
+    """Menambah hook saat runtime, mis. dari benchmark atau AppConfig.ready()."""
+    hooks = get_hooks()
+    with _hooks_lock:
+        if hook not in hooks:
+            hooks.append(hook)
+
+
+def _dispatch(stage_name, duration, context):
+    for hook in get_hooks():
+        try:
+            hook(stage_name, duration, context)
+        except Exception as e:
+            # Hook profiling tidak boleh menggagalkan request
+            logger.warning(f"[PROFILE] Hook {hook!r} gagal: {e}")
+
+
+def record(stage_name, duration, **context):
+    """Mengirim durasi yang diukur di tempat lain (mis. proses pool ekstraksi) ke semua hook."""
+    _dispatch(stage_name, duration, context)
+
+
+@contextmanager
+def stage(stage_name, **context):
+    """
+    Mengukur satu tahap pipeline:
+
+        with stage(DOWNLOAD, applicant_id=applicant_id):
+            document = open_cv(cv_path)
+
+    Durasi dikirim ke semua hook, termasuk saat tahap gagal (context `error`).
+    """
+    started = time.perf_counter()
+    try:
+        yield context
+    except BaseException as e:
+        context['error'] = type(e).__name__
+        raise
+    finally:
+        _dispatch(stage_name, time.perf_counter() - started, context)
+
+
+async def staged(stage_name, awaitable, **context):
+    """
+    Menunggu `awaitable` di dalam stage(); untuk panggilan yang dijalankan bersamaan
+    sehingga tiap panggilan tetap terukur sendiri:
+
+        job, schedules = await asyncio.gather(
+            staged(DB_READ, jobs_query.execute(), table='jobs'),
+            staged(DB_READ, schedules_query.execute(), table='schedules'),
+        )
+    """
+    with stage(stage_name, **context):
+        return await awaitable
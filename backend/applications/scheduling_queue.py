@@ -0,0 +1,205 @@
+# applications/scheduling_queue.py
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from .models import SchedulingRequest
+from .scheduling_service import schedule_job_interviews, schedule_passed_applicant
+
+logger = logging.getLogger(__name__)
+
+
+def _summarize(payload, http_status):
+    return {
+        'http_status': http_status,
+        'message': payload.get('message') or payload.get('error'),
+        'scheduled': len(payload.get('schedules') or []),
+    }
+
+
+class DatabaseSchedulingQueue:
+    """
+    Antrean penjadwalan yang menggabungkan permintaan per job. Berapa pun pelamar
+    yang lolos bersamaan, yang tersimpan hanya satu baris SchedulingRequest dengan
+    `pending=True`, dan worker menjalankan schedule_job_interviews sekali untuknya.
+    Permintaan yang masuk saat penjadwalan sedang berjalan membuat `pending` kembali
+    True sehingga job dijadwalkan sekali lagi setelahnya.
+
+    Lease yang habis diklaim ulang paling banyak sampai SCREENING_QUEUE_MAX_ATTEMPTS;
+    setelah itu baris ditandai gagal (tidak pending, last_error terisi) sampai ada
+    permintaan baru. Hasil worker hanya ditulis selama lease-nya masih dipegang.
+    """
+
+    def request(self, job_id):
+        now = timezone.now()
+        fields = {'pending': True, 'requested_at': now, 'attempts': 0}
+        if SchedulingRequest.objects.filter(job_id=job_id).update(**fields):
+            return
+        try:
+            with transaction.atomic():
+                SchedulingRequest.objects.create(job_id=job_id, **fields)
+        except IntegrityError:
+            # Baris dibuat proses lain di antara update dan create
+            SchedulingRequest.objects.filter(job_id=job_id).update(**fields)
+
+    def claim(self, worker_name):
+        now = timezone.now()
+        with transaction.atomic():
+            scheduling_request = (
+                SchedulingRequest.objects.select_for_update(skip_locked=True)
+                .filter(Q(lease_until__isnull=True) | Q(lease_until__lte=now))
+                # Lease yang habis berarti worker mati di tengah jalan: ulangi
+                .filter(Q(pending=True, visible_at__lte=now) | Q(lease_until__lte=now))
+                .order_by('visible_at')
+                .first()
+            )
+            if not scheduling_request:
+                return None
+
+            expired = scheduling_request.lease_until is not None
+            if expired and scheduling_request.attempts >= settings.SCREENING_QUEUE_MAX_ATTEMPTS:
+                # Worker mati berulang kali pada job ini (mis. OOM): jangan di-lease lagi
+                scheduling_request.pending = False
+                scheduling_request.lease_until = None
+                scheduling_request.last_error = scheduling_request.last_error or 'Lease habis pada percobaan terakhir.'
+                scheduling_request.save(update_fields=['pending', 'lease_until', 'last_error', 'updated_at'])
+                logger.error(f"[SCHEDULING-WORKER] Penjadwalan job {scheduling_request.job_id} dihentikan setelah "
+                             f"{scheduling_request.attempts} percobaan: {scheduling_request.last_error}")
+                return None
+
+            scheduling_request.pending = False
+            scheduling_request.attempts += 1
+            scheduling_request.locked_by = worker_name
+            scheduling_request.lease_until = now + timedelta(seconds=settings.SCREENING_QUEUE_VISIBILITY_TIMEOUT)
+            scheduling_request.save(update_fields=['pending', 'attempts', 'locked_by', 'lease_until', 'updated_at'])
+            return scheduling_request
+
+    def _leased(self, scheduling_request):
+        """Baris ini selama lease klaim worker ini belum habis atau diambil worker lain."""
+        return SchedulingRequest.objects.filter(
+            job_id=scheduling_request.job_id,
+            locked_by=scheduling_request.locked_by,
+            lease_until=scheduling_request.lease_until,
+        )
+
+    def _lease_lost(self, scheduling_request, action):
+        logger.warning(f"[SCHEDULING-WORKER] {action} job {scheduling_request.job_id} dibuang: lease "
+                       f"{scheduling_request.locked_by} sudah habis atau diambil worker lain.")
+
+    def process(self, scheduling_request):
+        job_id = scheduling_request.job_id
+        try:
+            payload, http_status = schedule_job_interviews(job_id)
+        except Exception as e:
+            logger.error(f"[SCHEDULING-WORKER] Penjadwalan job {job_id} gagal (percobaan {scheduling_request.attempts}): {e}")
+            self._fail(scheduling_request, e)
+            return
+        updated = self._leased(scheduling_request).update(
+            lease_until=None, last_error='', last_result=_summarize(payload, http_status), updated_at=timezone.now(),
+        )
+        if not updated:
+            self._lease_lost(scheduling_request, 'Hasil penjadwalan')
+
+    def _fail(self, scheduling_request, error):
+        with transaction.atomic():
+            # Baca ulang: request() di tengah jalan me-reset attempts dan pending
+            current = self._leased(scheduling_request).select_for_update().first()
+            if current is None:
+                self._lease_lost(scheduling_request, 'Kegagalan penjadwalan')
+                return
+            current.lease_until = None
+            current.last_error = str(error)
+            update_fields = ['lease_until', 'last_error', 'updated_at']
+            if current.attempts < settings.SCREENING_QUEUE_MAX_ATTEMPTS:
+                delay = settings.SCREENING_QUEUE_RETRY_DELAY * (2 ** max(0, current.attempts - 1))
+                current.pending = True
+                current.visible_at = timezone.now() + timedelta(seconds=delay)
+                update_fields += ['pending', 'visible_at']
+            current.save(update_fields=update_fields)
+
+    def run_once(self, worker_name):
+        """Memproses satu permintaan bila ada. Mengembalikan True bila ada yang diproses."""
+        scheduling_request = self.claim(worker_name)
+        if not scheduling_request:
+            return False
+        self.process(scheduling_request)
+        return True
+
+
+class InProcessSchedulingQueue:
+    """
+    Versi lokal: satu penjadwalan berjalan per job di thread pool; permintaan yang
+    datang saat berjalan hanya menandai job `dirty` sehingga diulang sekali lagi.
+    """
+
+    def __init__(self, max_workers=2):
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='scheduling')
+        self._lock = threading.Lock()
+        self._jobs = {}
+
+    def request(self, job_id):
+        job_id = str(job_id)
+        with self._lock:
+            state = self._jobs.setdefault(job_id, {'running': False, 'dirty': False})
+            if state['running']:
+                state['dirty'] = True
+                return
+            state['running'] = True
+        self._executor.submit(self._run, job_id)
+
+    def _run(self, job_id):
+        while True:
+            try:
+                schedule_job_interviews(job_id)
+            except Exception as e:
+                logger.error(f"[SCHEDULING] Penjadwalan job {job_id} gagal: {e}")
+            with self._lock:
+                state = self._jobs[job_id]
+                if not state['dirty']:
+                    state['running'] = False
+                    return
+                state['dirty'] = False
+
+    def run_once(self, worker_name):
+        return False
+
+
+_queue = None
+_queue_lock = threading.Lock()
+
+
+def get_scheduling_queue():
+    global _queue
+    if _queue is None:
+        with _queue_lock:
+            if _queue is None:
+                if settings.SCREENING_QUEUE_BACKEND == 'inprocess':
+                    _queue = InProcessSchedulingQueue(max_workers=settings.SCREENING_QUEUE_INPROCESS_WORKERS)
+                else:
+                    _queue = DatabaseSchedulingQueue()
+    return _queue
+
+
+def request_job_scheduling(job_id):
+    """Meminta penjadwalan ulang sebuah job; permintaan beruntun digabung menjadi satu."""
+    get_scheduling_queue().request(job_id)
+
+
+def request_applicant_scheduling(job_id, applicant_id):
+    """
+    Dipanggil saat satu pelamar lolos. Pada SCHEDULING_MODE 'incremental' pelamar
+    langsung diberi slot setelah cursor job; bila job perlu dihitung ulang penuh
+    (atau mode 'full'), permintaan masuk antrean penjadwalan yang digabung per job.
+    """
+    if settings.SCHEDULING_MODE == 'incremental':
+        result = schedule_passed_applicant(job_id, applicant_id)
+        if result is not None:
+            return result
+    request_job_scheduling(job_id)
+    return None
@@ -0,0 +1,508 @@
+# applications/scheduling_service.py
+import asyncio
+import hashlib
+import json
+import logging
+import threading
+from contextlib import asynccontextmanager, contextmanager
+from datetime import datetime, timedelta
+
+import pytz
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import connection, transaction
+from postgrest.exceptions import APIError as PostgrestAPIError
+
+from applications.interval_index import AvailabilityIndex
+from applications.models import JobScheduleCursor
+from applications.profiling import ALLOCATE, DB_READ, DB_WRITE, stage, staged
+from applications.supabase_client import async_supabase, supabase
+
+logger = logging.getLogger(__name__)
+
+WIB_TZ = pytz.timezone('Asia/Jakarta')
+
+# Kode error Postgres untuk pelanggaran unique constraint
+UNIQUE_VIOLATION = '23505'
+
+_local_locks = {}
+_local_locks_guard = threading.Lock()
+
+
+class SlotConflictError(Exception):
+    """Slot yang akan disimpan ternyata sudah diambil proses lain (unique constraint)."""
+
+
+@contextmanager
+def job_schedule_lock(job_id):
+    """
+    Mengunci penjadwalan satu job di semua proses. Di Postgres memakai advisory lock
+    transaksi (dilepas otomatis saat commit/rollback, juga bila proses mati); di
+    database lain (development) memakai lock per proses.
+    """
+    if connection.vendor == 'postgresql':
+        with transaction.atomic():
+            with connection.cursor() as cursor:
+                cursor.execute("SELECT pg_advisory_xact_lock(hashtext(%s))", [f"schedule:{job_id}"])
+            yield
+    else:
+        with _local_locks_guard:
+            lock = _local_locks.setdefault(str(job_id), threading.Lock())
+        with lock:
+            yield
+
+
+@asynccontextmanager
+async def ajob_schedule_lock(job_id):
+    """
+    job_schedule_lock untuk kode async. Advisory lock transaksi terikat pada satu
+    koneksi database, jadi lock dipegang thread khusus (dengan koneksinya sendiri)
+    selama blok async berjalan; event loop tidak pernah diblokir menunggu lock.
+    """
+    loop = asyncio.get_running_loop()
+    acquired = loop.create_future()
+    release = threading.Event()
+
+    def resolve(error):
+        if acquired.done():
+            if error is not None:
+                logger.error(f"Gagal melepas lock penjadwalan job {job_id}: {error}")
+        elif error is not None:
+            acquired.set_exception(error)
+        else:
+            acquired.set_result(None)
+
+    def hold():
+        try:
+            with job_schedule_lock(job_id):
+                loop.call_soon_threadsafe(resolve, None)
+                release.wait()
+        except Exception as e:
+            loop.call_soon_threadsafe(resolve, e)
+        finally:
+            connection.close()
+
+    thread = threading.Thread(target=hold, name=f"schedule-lock-{job_id}", daemon=True)
+    thread.start()
+    try:
+        await acquired
+        yield
+    finally:
+        release.set()
+        await asyncio.to_thread(thread.join)
+
+
+def schedule_job_interviews(job_id):
+    """
+    Menjadwalkan wawancara untuk semua pelamar 'Lolos' pada sebuah job yang belum
+    memiliki jadwal. Dipakai oleh view auto_schedule_interviews maupun worker
+    penjadwalan (lihat scheduling_queue.py).
+
+    Berjalan di bawah job_schedule_lock; bila bulk insert tetap bentrok dengan
+    unique (job_id, interview_time) (mis. penulis lain di luar backend ini), jadwal
+    dibaca ulang dan alokasi diulang hingga SCHEDULING_CONFLICT_RETRIES kali.
+
+    Mengembalikan tuple (payload, http_status). Error Supabase dibiarkan naik ke
+    pemanggil.
+    """
+    with job_schedule_lock(job_id):
+        for attempt in range(1, settings.SCHEDULING_CONFLICT_RETRIES + 1):
+            try:
+                return _schedule_job_interviews(job_id)
+            except SlotConflictError as e:
+                logger.warning(f"Slot bentrok saat menjadwalkan job {job_id} (percobaan {attempt}): {e}")
+    return {"error": "Slot wawancara terus bentrok dengan penjadwalan lain, silakan coba lagi."}, 409
+
+
+def _schedule_job_interviews(job_id):
+    job_response = supabase.from_('jobs').select('*').eq('id', job_id).single().execute()
+    job_data = job_response.data
+
+    invalid = _check_job(job_data)
+    if invalid:
+        return invalid
+
+    # Satu kali baca untuk jadwal yang sudah ada: waktu (untuk index) dan pelamar (untuk filter)
+    existing_schedules = fetch_job_schedules(job_id)
+
+    applicants_response = _passed_applicants_query(supabase, job_id).execute()
+    applicants_data = applicants_response.data
+
+    applicants_to_schedule, assignments = _plan_assignments(job_data, existing_schedules, applicants_data)
+    if assignments:
+        persist_assignments(job_id, assignments)
+
+    # Perhitungan penuh selalu memperbarui cursor untuk penjadwalan inkremental berikutnya
+    save_cursor(job_id, job_data, _last_slot(existing_schedules, assignments))
+    return _schedule_result(applicants_data, applicants_to_schedule, assignments)
+
+
+async def aschedule_job_interviews(job_id):
+    """Versi async schedule_job_interviews untuk view ASGI (lock dan retry yang sama)."""
+    async with ajob_schedule_lock(job_id):
+        for attempt in range(1, settings.SCHEDULING_CONFLICT_RETRIES + 1):
+            try:
+                return await _aschedule_job_interviews(job_id)
+            except SlotConflictError as e:
+                logger.warning(f"Slot bentrok saat menjadwalkan job {job_id} (percobaan {attempt}): {e}")
+    return {"error": "Slot wawancara terus bentrok dengan penjadwalan lain, silakan coba lagi."}, 409
+
+
+async def _aschedule_job_interviews(job_id):
+    # Job, jadwal yang ada dan pelamar lolos tidak saling bergantung: tiga query dalam satu round trip waktu
+    job_response, existing_schedules, applicants_response = await asyncio.gather(
+        staged(DB_READ, async_supabase.from_('jobs').select('*').eq('id', job_id).single().execute(), table='jobs'),
+        afetch_job_schedules(job_id),
+        staged(DB_READ, _passed_applicants_query(async_supabase, job_id).execute(), table='applicants'),
+    )
+    job_data = job_response.data
+
+    invalid = _check_job(job_data)
+    if invalid:
+        return invalid
+
+    applicants_data = applicants_response.data
+    applicants_to_schedule, assignments = _plan_assignments(job_data, existing_schedules, applicants_data)
+    if assignments:
+        await apersist_assignments(job_id, assignments)
+
+    await sync_to_async(save_cursor)(job_id, job_data, _last_slot(existing_schedules, assignments))
+    return _schedule_result(applicants_data, applicants_to_schedule, assignments)
+
+
+def _check_job(job_data):
+    if not job_data:
+        return {"error": "Lowongan pekerjaan tidak ditemukan di Supabase."}, 404
+
+    if not has_schedule_parameters(job_data):
+        return {"error": "Parameter penjadwalan pekerjaan tidak diatur sepenuhnya di Supabase."}, 400
+    return None
+
+
+def _passed_applicants_query(client, job_id):
+    return client.from_('applicants').select('id, name').eq('job_id', job_id).eq('auto_screening_status', 'Lolos')
+
+
+def _plan_assignments(job_data, existing_schedules, applicants_data):
+    """Mengalokasikan slot untuk pelamar lolos yang belum dijadwalkan. Mengembalikan (applicants_to_schedule, assignments)."""
+    scheduled_applicant_ids = {s['applicant_id'] for s in existing_schedules}
+    # Tambahkan filter untuk mengecualikan pelamar yang sudah memiliki jadwal
+    applicants_to_schedule = [app for app in applicants_data or [] if app['id'] not in scheduled_applicant_ids]
+
+    assignments = []
+    if applicants_to_schedule:
+        availability = build_availability(job_data, existing_schedules)
+        assignments, unassigned = allocate_slots(applicants_to_schedule, availability)
+
+        for applicant in unassigned:
+            logger.warning(f"Tidak ada slot kosong untuk pelamar {applicant['id']}.")
+    return applicants_to_schedule, assignments
+
+
+def _last_slot(existing_schedules, assignments):
+    booked_starts = [datetime.fromisoformat(s['interview_time']) for s in existing_schedules]
+    booked_starts.extend(slot for _applicant, slot in assignments)
+    return max(booked_starts) if booked_starts else None
+
+
+def _schedule_result(applicants_data, applicants_to_schedule, assignments):
+    if not applicants_data:
+        return {"message": "Tidak ada kandidat dengan status Lolos."}, 200
+
+    if not applicants_to_schedule:
+        return {"message": "Semua kandidat lolos sudah dijadwalkan."}, 200
+
+    scheduled_applicants = [
+        {"name": applicant['name'], "interview_time": slot.isoformat()}
+        for applicant, slot in assignments
+    ]
+    return {"message": "Penjadwalan berhasil.", "schedules": scheduled_applicants}, 200
+
+
+def schedule_passed_applicant(job_id, applicant_id):
+    """
+    Penjadwalan inkremental untuk satu pelamar yang baru lolos: hanya membaca jadwal
+    setelah cursor job (slot terakhir yang dibagikan) lalu memesan slot kosong
+    berikutnya, tanpa membaca ulang semua pelamar dan jadwal job.
+
+    Mengembalikan (payload, http_status), atau None bila job perlu dijadwalkan penuh
+    lewat schedule_job_interviews: belum ada cursor, jendela penjadwalan job berubah
+    sejak cursor dibuat, atau slotnya bentrok dengan penulis lain.
+    """
+    with job_schedule_lock(job_id):
+        job_response = supabase.from_('jobs').select('*').eq('id', job_id).single().execute()
+        job_data = job_response.data
+        if not job_data or not has_schedule_parameters(job_data):
+            return None
+
+        cursor = JobScheduleCursor.objects.filter(job_id=job_id).first()
+        if cursor is None or cursor.window_signature != window_signature(job_data):
+            return None
+
+        already = supabase.from_('schedules').select('id').eq('applicant_id', str(applicant_id)).limit(1).execute()
+        if already.data:
+            return {"message": "Pelamar sudah dijadwalkan."}, 200
+
+        # Jadwal yang masih bisa beririsan dengan slot setelah cursor
+        duration = interview_duration(job_data)
+        after = cursor.last_slot - duration if cursor.last_slot else None
+        availability = build_availability(job_data, fetch_job_schedules(job_id, after=after), not_before=cursor.last_slot)
+        assignments, _unassigned = allocate_slots([{'id': applicant_id}], availability, not_before=cursor.last_slot)
+        if not assignments:
+            logger.warning(f"Tidak ada slot kosong untuk pelamar {applicant_id}.")
+            return {"message": "Tidak ada slot kosong tersisa.", "schedules": []}, 200
+
+        try:
+            persist_assignments(job_id, assignments)
+        except SlotConflictError as e:
+            logger.warning(f"Slot inkremental bentrok untuk job {job_id}, beralih ke penjadwalan penuh: {e}")
+            return None
+
+        slot = assignments[0][1]
+        save_cursor(job_id, job_data, slot)
+        return {"message": "Penjadwalan berhasil.", "schedules": [{"applicant_id": str(applicant_id), "interview_time": slot.isoformat()}]}, 200
+
+
+def window_signature(job_data):
+    """Sidik jari parameter jendela penjadwalan; berubah berarti cursor tidak berlaku lagi."""
+    window = [job_data.get(field) for field in (
+        'schedule_start_date', 'schedule_end_date', 'daily_start_time', 'daily_end_time', 'duration_per_interview_minutes',
+    )]
+    return hashlib.sha256(json.dumps(window, default=str).encode('utf-8')).hexdigest()
+
+
+def save_cursor(job_id, job_data, last_slot):
+    JobScheduleCursor.objects.update_or_create(
+        job_id=job_id,
+        defaults={'window_signature': window_signature(job_data), 'last_slot': last_slot},
+    )
+
+
+def reschedule_interview(schedule_id, new_interview_time):
+    """
+    Memindahkan jadwal ke `new_interview_time` (datetime ber-timezone) bila tidak
+    bertabrakan dengan jadwal lain di job yang sama. Mengembalikan (payload, http_status);
+    saat bentrok (409) payload menyertakan slot kosong terdekat sebagai saran.
+    """
+    schedule_response = supabase.from_('schedules').select('id, job_id').eq('id', str(schedule_id)).execute()
+    if not schedule_response.data:
+        return {"error": "Jadwal tidak ditemukan."}, 404
+    job_id = schedule_response.data[0]['job_id']
+
+    with job_schedule_lock(job_id):
+        return _reschedule_interview(job_id, schedule_id, new_interview_time)
+
+
+def _reschedule_interview(job_id, schedule_id, new_interview_time):
+    job_response = supabase.from_('jobs').select('*').eq('id', job_id).single().execute()
+    job_data = job_response.data
+    if job_data and has_schedule_parameters(job_data):
+        availability = build_availability(job_data, fetch_job_schedules(job_id), exclude_schedule_id=schedule_id)
+        block = availability.conflict(new_interview_time)
+        if block is not None:
+            suggestion = availability.next_free_slot(new_interview_time)
+            return {
+                "error": "Waktu baru bertabrakan dengan jadwal lain.",
+                "conflict": {"start": block[0].isoformat(), "end": block[1].isoformat()},
+                "next_available": suggestion.isoformat() if suggestion else None,
+            }, 409
+
+    try:
+        supabase.from_('schedules').update({
+            'interview_time': new_interview_time.astimezone(pytz.utc).isoformat()
+        }).eq('id', str(schedule_id)).execute()
+    except PostgrestAPIError as e:
+        if e.code == UNIQUE_VIOLATION:
+            return {"error": "Waktu baru sudah dipakai jadwal lain."}, 409
+        raise
+    return {"message": "Jadwal berhasil diperbarui."}, 200
+
+
+def request_reschedule(applicant_id):
+    """
+    Menghapus jadwal pelamar lalu langsung memesan slot kosong berikutnya setelah
+    jadwal lama (bukan slot yang sama lagi). Bila tidak ada jadwal lama atau slot
+    kosong, pelamar dikembalikan ke 'Lolos' agar ikut penjadwalan otomatis berikutnya.
+    """
+    schedules_response = supabase.from_('schedules').select('job_id, interview_time').eq('applicant_id', str(applicant_id)).execute()
+    old_schedules = schedules_response.data or []
+
+    if old_schedules:
+        job_id = old_schedules[0]['job_id']
+        with job_schedule_lock(job_id):
+            supabase.from_('schedules').delete().eq('applicant_id', str(applicant_id)).execute()
+            new_time = _book_after(job_id, applicant_id, old_schedules)
+        if new_time:
+            return {"message": "Jadwal baru berhasil dibuat.", "interview_time": new_time.isoformat()}, 200
+
+    supabase.from_('applicants').update({
+        'status': 'Shortlisted',
+        'auto_screening_status': 'Lolos'
+    }).eq('id', str(applicant_id)).execute()
+    return {"message": "Permintaan penjadwalan ulang berhasil dikirim. Jadwal baru akan segera dibuat."}, 200
+
+
+def _book_after(job_id, applicant_id, old_schedules):
+    job_response = supabase.from_('jobs').select('*').eq('id', job_id).single().execute()
+    job_data = job_response.data
+    if not job_data or not has_schedule_parameters(job_data):
+        return None
+    old_end = max(datetime.fromisoformat(s['interview_time']) for s in old_schedules) + interview_duration(job_data)
+    for _attempt in range(settings.SCHEDULING_CONFLICT_RETRIES):
+        availability = build_availability(job_data, fetch_job_schedules(job_id))
+        assignments, _unassigned = allocate_slots([{'id': applicant_id}], availability, not_before=old_end)
+        if not assignments:
+            return None
+        try:
+            persist_assignments(job_id, assignments)
+        except SlotConflictError:
+            continue
+        return assignments[0][1]
+    return None
+
+
+def has_schedule_parameters(job_data):
+    return all([
+        job_data.get('schedule_start_date'),
+        job_data.get('schedule_end_date'),
+        job_data.get('daily_start_time'),
+        job_data.get('daily_end_time'),
+        job_data.get('duration_per_interview_minutes')
+    ])
+
+
+def build_slot_grid(job_data, not_before=None):
+    """
+    Semua slot wawancara (datetime WIB, urut) dalam jendela job: setiap hari dari
+    daily_start_time, maju per duration_per_interview_minutes, selama slot masih
+    selesai sebelum daily_end_time. Dengan `not_before`, hari sebelumnya dilewati.
+    """
+    start_date = datetime.strptime(job_data['schedule_start_date'], '%Y-%m-%d').date()
+    if not_before is not None:
+        start_date = max(start_date, not_before.astimezone(WIB_TZ).date())
+    end_date = datetime.strptime(job_data['schedule_end_date'], '%Y-%m-%d').date()
+    daily_start_time = datetime.strptime(job_data['daily_start_time'], '%H:%M:%S').time()
+    daily_end_time = datetime.strptime(job_data['daily_end_time'], '%H:%M:%S').time()
+    duration = interview_duration(job_data)
+
+    slots = []
+    day = start_date
+    while day <= end_date:
+        slot = WIB_TZ.localize(datetime.combine(day, daily_start_time))
+        daily_end_datetime = WIB_TZ.localize(datetime.combine(day, daily_end_time))
+        while slot + duration <= daily_end_datetime:
+            slots.append(slot)
+            slot += duration
+        day += timedelta(days=1)
+    return slots
+
+
+def interview_duration(job_data):
+    return timedelta(minutes=job_data['duration_per_interview_minutes'])
+
+
+def _job_schedules_query(client, job_id, after=None):
+    query = client.from_('schedules').select('id, applicant_id, interview_time').eq('job_id', str(job_id))
+    if after is not None:
+        query = query.gt('interview_time', after.astimezone(pytz.utc).isoformat())
+    return query
+
+
+def fetch_job_schedules(job_id, after=None):
+    query = _job_schedules_query(supabase, job_id, after)
+    with stage(DB_READ, table='schedules', job_id=str(job_id)):
+        return query.execute().data or []
+
+
+async def afetch_job_schedules(job_id, after=None):
+    query = _job_schedules_query(async_supabase, job_id, after)
+    with stage(DB_READ, table='schedules', job_id=str(job_id)):
+        return (await query.execute()).data or []
+
+
+def build_availability(job_data, existing_schedules, exclude_schedule_id=None, not_before=None):
+    """
+    AvailabilityIndex untuk job: grid slot dari jendela job, dan setiap jadwal yang
+    sudah ada dipesan sebagai interval [interview_time, interview_time + durasi),
+    sehingga jadwal yang tidak tepat di grid (hasil reschedule) tetap terdeteksi.
+    """
+    availability = AvailabilityIndex(build_slot_grid(job_data, not_before=not_before), interview_duration(job_data))
+    for schedule in existing_schedules:
+        if exclude_schedule_id is not None and str(schedule.get('id')) == str(exclude_schedule_id):
+            continue
+        availability.book(datetime.fromisoformat(schedule['interview_time']))
+    return availability
+
+
+def allocate_slots(applicants, availability, not_before=None):
+    """
+    Memasangkan pelamar dengan slot kosong berikutnya secara berurutan dalam satu
+    lintasan, sambil memesan slot itu di index.
+    Mengembalikan (assignments, unassigned) dengan assignments = [(applicant, slot), ...].
+    """
+    assignments = []
+    cursor = not_before or (availability.slots[0] if availability.slots else None)
+    with stage(ALLOCATE, applicants=len(applicants)):
+        for position, applicant in enumerate(applicants):
+            slot = availability.next_free_slot(cursor) if cursor is not None else None
+            if slot is None:
+                return assignments, applicants[position:]
+            availability.book(slot)
+            assignments.append((applicant, slot))
+            cursor = slot
+    return assignments, []
+
+
+def persist_assignments(job_id, assignments):
+    """
+    Menyimpan hasil alokasi dengan satu bulk insert ke `schedules` dan satu bulk
+    update status pelamar. Update dipecah per SCHEDULING_UPDATE_CHUNK id hanya
+    karena filter `in` dikirim lewat URL.
+
+    Bulk insert bersifat all-or-nothing: bila salah satu slot melanggar unique
+    (job_id, interview_time), tidak ada baris yang tersimpan dan SlotConflictError
+    di-raise agar pemanggil menghitung ulang.
+    """
+    rows = _schedule_rows(job_id, assignments)
+    with stage(DB_WRITE, table='schedules', rows=len(rows)):
+        try:
+            supabase.from_('schedules').insert(rows).execute()
+        except PostgrestAPIError as e:
+            if e.code == UNIQUE_VIOLATION:
+                raise SlotConflictError(e.message)
+            raise
+
+        applicant_ids = [row['applicant_id'] for row in rows]
+        chunk = settings.SCHEDULING_UPDATE_CHUNK
+        for index in range(0, len(applicant_ids), chunk):
+            supabase.from_('applicants').update({'status': 'scheduled'}).in_('id', applicant_ids[index:index + chunk]).execute()
+
+
+def _schedule_rows(job_id, assignments):
+    return [
+        {
+            'applicant_id': str(applicant['id']),
+            'job_id': str(job_id),
+            'interview_time': slot.astimezone(pytz.utc).isoformat()
+        }
+        for applicant, slot in assignments
+    ]
+
+
+async def apersist_assignments(job_id, assignments):
+    """Versi async persist_assignments; update status per chunk dikirim bersamaan setelah insert berhasil."""
+    rows = _schedule_rows(job_id, assignments)
+    with stage(DB_WRITE, table='schedules', rows=len(rows)):
+        try:
+            await async_supabase.from_('schedules').insert(rows).execute()
+        except PostgrestAPIError as e:
+            if e.code == UNIQUE_VIOLATION:
+                raise SlotConflictError(e.message)
+            raise
+
+        applicant_ids = [row['applicant_id'] for row in rows]
+        chunk = settings.SCHEDULING_UPDATE_CHUNK
+        await asyncio.gather(*(
+            async_supabase.from_('applicants').update({'status': 'scheduled'}).in_('id', applicant_ids[index:index + chunk]).execute()
+            for index in range(0, len(applicant_ids), chunk)
+        ))
@@ -0,0 +1,308 @@
+# applications/screening_queue.py
+import logging
+import os
+import socket
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from .models import ScreeningTask
+from .scheduling_queue import DatabaseSchedulingQueue
+from .screening_service import rescreen_job, screen_applicant, mark_screening_failed
+
+logger = logging.getLogger(__name__)
+
+
+class LeaseLost(Exception):
+    """Task sudah diklaim ulang worker lain (visibility timeout habis) sebelum selesai."""
+
+
+def _retry_delay(attempts):
+    # Backoff eksponensial: 30s, 60s, 120s, ... (basis bisa diatur lewat settings)
+    return settings.SCREENING_QUEUE_RETRY_DELAY * (2 ** max(0, attempts - 1))
+
+
+def _give_up(applicant_id, error):
+    try:
+        mark_screening_failed(applicant_id, error)
+    except Exception as e:
+        logger.error(f"Gagal menandai screening pelamar {applicant_id} sebagai gagal: {e}")
+
+
+def _run_job_rescreen(job_id, on_progress):
+    """Menjalankan rescreen_job sampai selesai; setiap event progres diteruskan ke on_progress."""
+    event = None
+    for event in rescreen_job(job_id):
+        on_progress(event)
+    return event
+
+
+def _serialize_task(task_id, applicant_id, status, attempts, last_error, result, kind='applicant', job_id=None):
+    return {
+        'task_id': str(task_id),
+        'kind': kind,
+        'applicant_id': str(applicant_id) if applicant_id else None,
+        'job_id': str(job_id) if job_id else None,
+        'status': status,
+        'attempts': attempts,
+        'last_error': last_error or None,
+        'result': result,
+    }
+
+
+class DatabaseQueue:
+    """
+    Antrean berbasis tabel ScreeningTask. Web process hanya melakukan enqueue;
+    pemrosesan dilakukan oleh worker `manage.py run_screening_workers`.
+
+    Worker mengklaim task dengan SELECT ... FOR UPDATE SKIP LOCKED (di Postgres) dan
+    memperpanjang visible_at sebesar visibility timeout. Task 'running' yang
+    visible_at-nya lewat dianggap ditinggal worker (mis. proses mati) dan akan
+    diklaim ulang oleh worker lain.
+
+    Task 'job_rescreen' (rescreen semua pelamar satu job) menulis progres ke
+    `result` setelah setiap halaman dan sekaligus memperpanjang visible_at-nya.
+    """
+
+    def enqueue(self, applicant_id, job_id=None):
+        task = ScreeningTask.objects.create(
+            applicant_id=applicant_id,
+            job_id=job_id,
+            max_attempts=settings.SCREENING_QUEUE_MAX_ATTEMPTS,
+        )
+        return str(task.id)
+
+    def enqueue_job_rescreen(self, job_id):
+        task = ScreeningTask.objects.create(
+            kind='job_rescreen',
+            job_id=job_id,
+            max_attempts=settings.SCREENING_QUEUE_MAX_ATTEMPTS,
+        )
+        return str(task.id)
+
+    def get_status(self, applicant_id):
+        task = ScreeningTask.objects.filter(applicant_id=applicant_id).order_by('-created_at').first()
+        if not task:
+            return None
+        return self._serialize(task)
+
+    def get_task(self, task_id):
+        task = ScreeningTask.objects.filter(pk=task_id).first()
+        if not task:
+            return None
+        return self._serialize(task)
+
+    @staticmethod
+    def _serialize(task):
+        return _serialize_task(task.id, task.applicant_id, task.status, task.attempts, task.last_error, task.result,
+                               kind=task.kind, job_id=task.job_id)
+
+    def claim(self, worker_name):
+        now = timezone.now()
+        with transaction.atomic():
+            task = (
+                ScreeningTask.objects.select_for_update(skip_locked=True)
+                .filter(Q(status='queued') | Q(status='running'), visible_at__lte=now)
+                .order_by('visible_at')
+                .first()
+            )
+            if not task:
+                return None
+
+            if task.status == 'running' and task.attempts >= task.max_attempts:
+                # Lease habis pada percobaan terakhir: jangan diulang lagi
+                task.status = 'failed'
+                task.last_error = task.last_error or 'Visibility timeout habis.'
+                task.save(update_fields=['status', 'last_error', 'updated_at'])
+                if task.kind == 'applicant':
+                    transaction.on_commit(lambda: _give_up(task.applicant_id, task.last_error))
+                return None
+
+            task.status = 'running'
+            task.attempts += 1
+            task.locked_by = worker_name
+            task.visible_at = now + timedelta(seconds=settings.SCREENING_QUEUE_VISIBILITY_TIMEOUT)
+            task.save(update_fields=['status', 'attempts', 'locked_by', 'visible_at', 'updated_at'])
+            return task
+
+    def _update_leased(self, task, **fields):
+        """
+        UPDATE bersyarat: hanya berhasil selama lease klaim ini masih dipegang (worker dan
+        percobaan yang sama). Bila visibility timeout habis dan worker lain sudah mengklaim
+        ulang task, 0 baris berubah dan hasil percobaan ini tidak boleh menimpa milik worker itu.
+        """
+        updated = ScreeningTask.objects.filter(
+            pk=task.pk, status='running', locked_by=task.locked_by, attempts=task.attempts,
+        ).update(updated_at=timezone.now(), **fields)
+        return updated == 1
+
+    def _lease_lost_message(self, task):
+        return f"Lease task {task.id} (percobaan {task.attempts}) sudah tidak dipegang {task.locked_by}."
+
+    def report_progress(self, task, progress):
+        """Menyimpan progres task panjang dan memperpanjang lease-nya selama masih dipegang worker ini."""
+        visible_at = timezone.now() + timedelta(seconds=settings.SCREENING_QUEUE_VISIBILITY_TIMEOUT)
+        if not self._update_leased(task, result=progress, visible_at=visible_at):
+            raise LeaseLost(self._lease_lost_message(task))
+
+    def complete(self, task, result):
+        if not self._update_leased(task, status='done', result=result, last_error=''):
+            logger.warning(f"[SCREENING-WORKER] Hasil task {task.id} dibuang: {self._lease_lost_message(task)}")
+            return False
+        task.status = 'done'
+        task.result = result
+        task.last_error = ''
+        return True
+
+    def fail(self, task, error):
+        if task.attempts < task.max_attempts:
+            status = 'queued'
+            visible_at = timezone.now() + timedelta(seconds=_retry_delay(task.attempts))
+        else:
+            status = 'failed'
+            visible_at = task.visible_at
+        if not self._update_leased(task, status=status, visible_at=visible_at, last_error=str(error)):
+            logger.warning(f"[SCREENING-WORKER] Kegagalan task {task.id} tidak dicatat: {self._lease_lost_message(task)}")
+            return False
+        task.status = status
+        task.visible_at = visible_at
+        task.last_error = str(error)
+        if status == 'failed' and task.kind == 'applicant':
+            _give_up(task.applicant_id, error)
+        return True
+
+    def run_worker(self, worker_name, poll_interval=1.0, should_stop=lambda: False):
+        logger.info(f"[SCREENING-WORKER] {worker_name} mulai memproses antrean.")
+        # Worker yang sama juga menjalankan permintaan penjadwalan yang sudah digabung per job
+        scheduling_queue = DatabaseSchedulingQueue()
+        while not should_stop():
+            task = self.claim(worker_name)
+            if task:
+                self.process(task)
+                continue
+            if not scheduling_queue.run_once(worker_name):
+                time.sleep(poll_interval)
+
+    def process(self, task):
+        try:
+            if task.kind == 'job_rescreen':
+                result = _run_job_rescreen(task.job_id, lambda progress: self.report_progress(task, progress))
+            else:
+                result = screen_applicant(task.applicant_id)
+        except LeaseLost as e:
+            # Worker lain sudah mengambil alih task ini; hasil percobaan ini dibuang
+            logger.warning(f"[SCREENING-WORKER] Task {task.id} dihentikan: {e}")
+        except Exception as e:
+            logger.error(f"[SCREENING-WORKER] Task {task.id} gagal (percobaan {task.attempts}/{task.max_attempts}): {e}")
+            self.fail(task, e)
+        else:
+            self.complete(task, result)
+
+
+class InProcessQueue:
+    """
+    Pengganti lokal tanpa worker terpisah: task dijalankan di thread pool di dalam
+    web process dan statusnya disimpan di memori. Cocok untuk development; status
+    hilang saat proses restart.
+    """
+
+    def __init__(self, max_workers=2):
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='screening')
+        self._lock = threading.Lock()
+        self._tasks = {}
+        self._latest_by_applicant = {}
+
+    def enqueue(self, applicant_id, job_id=None):
+        task_id = self._submit('applicant', str(applicant_id), str(job_id) if job_id else None)
+        with self._lock:
+            self._latest_by_applicant[str(applicant_id)] = task_id
+        return task_id
+
+    def enqueue_job_rescreen(self, job_id):
+        return self._submit('job_rescreen', None, str(job_id))
+
+    def _submit(self, kind, applicant_id, job_id):
+        task_id = str(uuid.uuid4())
+        with self._lock:
+            self._tasks[task_id] = {
+                'kind': kind,
+                'applicant_id': applicant_id,
+                'job_id': job_id,
+                'status': 'queued',
+                'attempts': 0,
+                'last_error': '',
+                'result': None,
+            }
+        self._executor.submit(self._run, task_id)
+        return task_id
+
+    def get_status(self, applicant_id):
+        with self._lock:
+            task_id = self._latest_by_applicant.get(str(applicant_id))
+        return self.get_task(task_id) if task_id else None
+
+    def get_task(self, task_id):
+        with self._lock:
+            task = self._tasks.get(str(task_id))
+            if not task:
+                return None
+            task = dict(task)
+        return _serialize_task(task_id, task['applicant_id'], task['status'], task['attempts'], task['last_error'], task['result'],
+                               kind=task['kind'], job_id=task['job_id'])
+
+    def _update(self, task_id, **fields):
+        with self._lock:
+            self._tasks[task_id].update(fields)
+
+    def _execute(self, task_id, task):
+        if task['kind'] == 'job_rescreen':
+            return _run_job_rescreen(task['job_id'], lambda progress: self._update(task_id, result=progress))
+        return screen_applicant(task['applicant_id'])
+
+    def _run(self, task_id):
+        task = self._tasks[task_id]
+        max_attempts = settings.SCREENING_QUEUE_MAX_ATTEMPTS
+        for attempt in range(1, max_attempts + 1):
+            self._update(task_id, status='running', attempts=attempt)
+            try:
+                result = self._execute(task_id, task)
+            except Exception as e:
+                logger.error(f"[SCREENING] Task {task_id} gagal (percobaan {attempt}/{max_attempts}): {e}")
+                self._update(task_id, last_error=str(e))
+                if attempt < max_attempts:
+                    self._update(task_id, status='queued')
+                    time.sleep(_retry_delay(attempt))
+                    continue
+                self._update(task_id, status='failed')
+                if task['kind'] == 'applicant':
+                    _give_up(task['applicant_id'], e)
+            else:
+                self._update(task_id, status='done', result=result, last_error='')
+            return
+
+
+_queue = None
+_queue_lock = threading.Lock()
+
+
+def get_queue():
+    global _queue
+    if _queue is None:
+        with _queue_lock:
+            if _queue is None:
+                if settings.SCREENING_QUEUE_BACKEND == 'inprocess':
+                    _queue = InProcessQueue(max_workers=settings.SCREENING_QUEUE_INPROCESS_WORKERS)
+                else:
+                    _queue = DatabaseQueue()
+    return _queue
+
+
+def default_worker_name(index=0):
+    return f"{socket.gethostname()}-{os.getpid()}-{index}"
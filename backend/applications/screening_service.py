@@ -0,0 +1,392 @@
+# applications/screening_service.py
+import logging
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+
+from applications.supabase_client import supabase
+from applications.auto_screening import preprocess_answers, run_auto_screening
+from applications.cv_parser import parse_cv_texts
+from applications.cv_storage import open_cv
+from applications.extraction_service import get_extraction_service
+from applications.model_utils import get_ai_score, get_ai_scores_batch
+from applications.gemini_client import get_gemini_score_cached
+from applications.scheduling_queue import request_applicant_scheduling, request_job_scheduling
+from applications.parse_cache import get_parse_cache
+from applications.profiling import DB_READ, DB_WRITE, DOWNLOAD, EXTRACT, LLM, ML, NLP, stage
+
+logger = logging.getLogger(__name__)
+
+
+class ApplicantNotFound(ValueError):
+    pass
+
+
+class JobNotFound(ValueError):
+    pass
+
+
+def map_screening_status(auto_screening_status):
+    """Menerjemahkan hasil auto-screening menjadi status pelamar."""
+    if auto_screening_status == 'Lolos':
+        return 'Shortlisted'
+    elif auto_screening_status == 'Tidak Lolos':
+        return 'Rejected'
+    return 'Needs Review'
+
+
+def extract_and_parse_cv(cv_path, document):
+    """
+    Mengembalikan (cv_text, cv_data) untuk dokumen dari open_cv, memakai parse cache
+    bila isi file yang sama pernah diproses sehingga ekstraksi PDF/DOCX dan NLP dilewati.
+    """
+    cache = get_parse_cache()
+    key = document.cache_key
+    cached = cache.get(key) if key else None
+    if cached is not None:
+        return cached['text'], cached['parsed']
+
+    # Ekstraksi + NER berjalan di process pool terbatas (tahap extract/nlp dicatat di sana)
+    cv_text, cv_data = get_extraction_service().extract_and_parse(cv_path, document)
+    if not cv_text:
+        return cv_text, None
+    if key:
+        cache.set(key, {'text': cv_text, 'parsed': cv_data})
+    return cv_text, cv_data
+
+
+def fetch_applicant_and_job(applicant_id):
+    """Membaca data pelamar dan job yang dibutuhkan pipeline screening."""
+    with stage(DB_READ, table='applicants'):
+        applicant_data = supabase.from_('applicants').select('job_id, custom_answers, uploaded_files').eq('id', str(applicant_id)).single().execute().data
+    if not applicant_data:
+        raise ApplicantNotFound(f"Pelamar dengan ID '{applicant_id}' tidak ditemukan.")
+
+    job_id = applicant_data['job_id']
+    with stage(DB_READ, table='jobs'):
+        job_data = supabase.from_('jobs').select('custom_fields, title, recruitment_process_type').eq('id', job_id).single().execute().data
+    if not job_data:
+        raise JobNotFound(f"Lowongan dengan ID '{job_id}' tidak ditemukan.")
+    return applicant_data, job_data
+
+
+def load_cv(cv_path):
+    """Download + ekstraksi + parsing CV. Error download dibiarkan naik ke pemanggil."""
+    with stage(DOWNLOAD, path=cv_path):
+        document = open_cv(cv_path)
+    with document:
+        return extract_and_parse_cv(cv_path, document)
+
+
+def score_cv(cv_text, cv_data, job_data):
+    """Skor ML lalu Gemini untuk satu CV. Mengembalikan (ml_score, ai_score, alasan, dari_cache)."""
+    with stage(ML):
+        ml_score_data = get_ai_score(cv_data, job_data)
+    ml_score = ml_score_data['score'] if ml_score_data else 0
+
+    with stage(LLM) as context:
+        ai_score, gemini_reason, gemini_from_cache = get_gemini_score_cached(
+            cv_text=cv_text,
+            job_description=job_data['title'],
+            ml_score=ml_score
+        )
+        context['from_cache'] = gemini_from_cache
+    return ml_score, ai_score, gemini_reason, gemini_from_cache
+
+
+def save_screening_result(applicant_id, applicant_status, auto_screening_status, screening_result, ai_score, final_score, gemini_reason):
+    with stage(DB_WRITE, table='applicants'):
+        supabase.from_('applicants').update({
+            'status': applicant_status,
+            'auto_screening_status': auto_screening_status,
+            'auto_screening_log': screening_result['log'] if screening_result else {},
+            'ai_score': int(round(ai_score)) if ai_score is not None else None,
+            'final_score': int(round(final_score)) if final_score is not None else None,
+            'gemini_reason': gemini_reason
+        }).eq('id', str(applicant_id)).execute()
+
+
+def request_scheduling_if_passed(job_id, applicant_id, auto_screening_status, tag='SCREENING'):
+    if auto_screening_status != 'Lolos':
+        return
+    logger.info(f"[{tag}] Status pelamar lolos, meminta penjadwalan otomatis untuk Job ID: {job_id}")
+    try:
+        request_applicant_scheduling(job_id, applicant_id)
+    except Exception as e:
+        # Penjadwalan bisa diulang manual; jangan ulangi seluruh screening karenanya
+        logger.error(f"Gagal meminta penjadwalan wawancara untuk job {job_id}: {e}")
+
+
+def screen_applicant(applicant_id):
+    """
+    Menjalankan pipeline screening lengkap untuk pelamar yang sudah tersimpan
+    dengan status 'Pending': download CV -> ekstraksi teks -> parsing -> skor ML
+    -> Gemini -> auto-screening, lalu menulis hasilnya kembali ke Supabase.
+
+    Error jaringan/Supabase sengaja tidak ditangkap agar antrean bisa melakukan
+    retry. Kegagalan yang deterministik (CV tidak bisa dibaca) menghasilkan status
+    'Review' seperti sebelumnya.
+    """
+    logger.debug(f"[SCREENING] Memproses pelamar {applicant_id}.")
+    applicant_data, job_data = fetch_applicant_and_job(applicant_id)
+    job_id = applicant_data['job_id']
+
+    custom_answers = applicant_data.get('custom_answers') or {}
+    uploaded_files = applicant_data.get('uploaded_files') or []
+    cv_path = uploaded_files[0] if uploaded_files else None
+
+    screening_result = None
+    auto_screening_status = 'Pending'
+    applicant_status = 'Applied'
+    ai_score = None
+    final_score = None
+    gemini_reason = None
+    gemini_from_cache = False
+
+    if cv_path:
+        with stage(DOWNLOAD, path=cv_path):
+            document = open_cv(cv_path)
+
+        cv_text = None
+        with document:
+            try:
+                cv_text, cv_data = extract_and_parse_cv(cv_path, document)
+            except Exception as e:
+                logger.warning(f"[SCREENING] Gagal memproses CV pelamar {applicant_id}: {e}")
+
+        if cv_text:
+            combined_answers = {**custom_answers, **cv_data}
+
+            ml_score, ai_score, gemini_reason, gemini_from_cache = score_cv(cv_text, cv_data, job_data)
+            logger.debug(f"[SCREENING] Skor ML awal: {ml_score}, skor Gemini: {ai_score} (dari cache: {gemini_from_cache})")
+
+            if job_data.get('custom_fields') and combined_answers:
+                processed_answers = preprocess_answers(job_data['custom_fields'], combined_answers)
+                screening_result = run_auto_screening(job_data['custom_fields'], processed_answers, ai_score)
+                auto_screening_status = screening_result['status']
+                final_score = screening_result.get('final_score')
+                applicant_status = map_screening_status(auto_screening_status)
+        else:
+            logger.warning(f"[SCREENING] Tidak bisa mengekstrak teks dari CV pelamar {applicant_id}.")
+            auto_screening_status = 'Review'
+            screening_result = {'status': 'Review', 'log': {'Review': [{'reason': 'Gagal memproses CV.'}]}}
+    elif job_data.get('custom_fields'):
+        screening_result = run_auto_screening(job_data['custom_fields'], custom_answers, ai_score)
+        auto_screening_status = screening_result['status']
+        final_score = screening_result.get('final_score')
+        applicant_status = map_screening_status(auto_screening_status)
+
+    save_screening_result(applicant_id, applicant_status, auto_screening_status, screening_result, ai_score, final_score, gemini_reason)
+    logger.info(f"[SCREENING] Hasil screening otomatis pelamar {applicant_id}: {auto_screening_status}")
+    request_scheduling_if_passed(job_id, applicant_id, auto_screening_status)
+
+    return {
+        'auto_screening_status': auto_screening_status,
+        'applicant_status': applicant_status,
+        'ai_score': ai_score,
+        'final_score': final_score,
+        'gemini_from_cache': gemini_from_cache,
+    }
+
+
+def rescreen_applicant(applicant_id):
+    """
+    Rescreen satu pelamar secara sinkron (dipanggil view rescreen-applicant).
+    Berbeda dengan screen_applicant, CV yang gagal diunduh/diproses tidak
+    menggagalkan rescreen: screening tetap berjalan dengan jawaban custom saja.
+    """
+    logger.debug(f"[RESCREEN] Memproses rescreening untuk applicant ID: {applicant_id}")
+    applicant_data, job_data = fetch_applicant_and_job(applicant_id)
+    job_id = applicant_data['job_id']
+    uploaded_files = applicant_data.get('uploaded_files') or []
+    cv_path = uploaded_files[0] if uploaded_files else None
+
+    cv_text = None
+    cv_data = {}
+    if cv_path:
+        try:
+            cv_text, parsed = load_cv(cv_path)
+            if parsed:
+                cv_data = parsed
+        except Exception as e:
+            logger.warning(f"[RESCREEN] Gagal memproses CV pelamar {applicant_id}: {e}")
+
+    ai_score = None
+    gemini_reason = None
+    gemini_from_cache = False
+    if cv_text:
+        ml_score, ai_score, gemini_reason, gemini_from_cache = score_cv(cv_text, cv_data, job_data)
+        logger.debug(f"[RESCREEN] Skor ML awal: {ml_score}, skor Gemini: {ai_score} (dari cache: {gemini_from_cache})")
+
+    screening_result = _rescreen_result(job_data, applicant_data.get('custom_answers'), cv_data, ai_score)
+    new_status = screening_result['status']
+    final_score = screening_result.get('final_score')
+    applicant_status = map_screening_status(new_status)
+
+    save_screening_result(applicant_id, applicant_status, new_status, screening_result, ai_score, final_score, gemini_reason)
+    request_scheduling_if_passed(job_id, applicant_id, new_status, tag='RESCREEN')
+
+    return {
+        'new_status': new_status,
+        'applicant_status': applicant_status,
+        'ai_score': int(round(ai_score)) if ai_score is not None else None,
+        'final_score': int(round(final_score)) if final_score is not None else None,
+        'gemini_from_cache': gemini_from_cache,
+    }
+
+
+def mark_screening_failed(applicant_id, error):
+    """Dipanggil antrean saat semua percobaan habis agar pelamar tidak tertahan di 'Pending'."""
+    supabase.from_('applicants').update({
+        'status': 'Needs Review',
+        'auto_screening_status': 'Review',
+        'auto_screening_log': {'Review': [{'reason': f'Error saat memproses CV: {error}'}]},
+    }).eq('id', str(applicant_id)).execute()
+
+
+def _download_and_extract(cv_path):
+    """
+    Dijalankan di thread pool download; ekstraksi teks memakai pool ekstraksi bersama
+    (extraction_service) sehingga ikut batas dokumen dan CPU-nya. Parsing NLP tidak
+    dilakukan di sini agar bisa dibatch lewat parse_cv_texts.
+    """
+    if not cv_path:
+        return {'key': None, 'text': None, 'parsed': {}, 'error': None}
+    try:
+        with open_cv(cv_path) as document:
+            key = document.cache_key
+            cached = get_parse_cache().get(key) if key else None
+            if cached is not None:
+                return {'key': key, 'text': cached['text'], 'parsed': cached['parsed'], 'error': None}
+            return {'key': key, 'text': get_extraction_service().extract_text(cv_path, document), 'parsed': None, 'error': None}
+    except Exception as e:
+        return {'key': None, 'text': None, 'parsed': {}, 'error': str(e)}
+
+
+def _parse_missing(extracted):
+    """Mem-parse (batch, nlp.pipe) semua CV yang belum ada di parse cache."""
+    missing = [item for item in extracted if item['parsed'] is None]
+    texts = [item['text'] for item in missing]
+    parsed_list = parse_cv_texts(texts, batch_size=settings.NLP_BATCH_SIZE, n_process=settings.NLP_N_PROCESS)
+    cache = get_parse_cache()
+    for item, parsed in zip(missing, parsed_list):
+        item['parsed'] = parsed or {}
+        if item['key'] and item['text'] and parsed:
+            cache.set(item['key'], {'text': item['text'], 'parsed': parsed})
+
+
+def _rescreen_result(job_data, custom_answers, cv_data, ai_score):
+    combined_answers = {**(custom_answers or {}), **cv_data}
+    if job_data.get('custom_fields') and combined_answers:
+        return run_auto_screening(job_data['custom_fields'], combined_answers, ai_score)
+    return {'status': 'Needs Review', 'log': {'Review': [{'reason': 'Tidak ada custom fields atau jawaban.'}]}}
+
+
+def rescreen_job(job_id, page_size=None, download_concurrency=None):
+    """
+    Rescreen semua pelamar sebuah job. Generator yang menghasilkan event progres
+    (dict) setelah setiap halaman pelamar selesai ditulis. Dijalankan worker antrean
+    screening (task 'job_rescreen'), bukan di request web.
+
+    Data job dimuat sekali; CV satu halaman didownload paralel dan diekstrak lewat
+    pool ekstraksi bersama, skor ML dihitung dengan satu get_ai_scores_batch per
+    halaman, dan hasilnya ditulis kembali dengan satu upsert per halaman. NER untuk
+    CV yang belum ada di parse cache dijalankan sekaligus lewat parse_cv_texts (nlp.pipe).
+    """
+    page_size = page_size or settings.RESCREEN_PAGE_SIZE
+    download_concurrency = download_concurrency or settings.RESCREEN_DOWNLOAD_CONCURRENCY
+
+    job_response = supabase.from_('jobs').select('custom_fields, title, recruitment_process_type').eq('id', str(job_id)).single().execute()
+    job_data = job_response.data
+    if not job_data:
+        raise JobNotFound(f"Lowongan dengan ID '{job_id}' tidak ditemukan.")
+
+    count_response = supabase.from_('applicants').select('id', count='exact').eq('job_id', str(job_id)).limit(1).execute()
+    total = count_response.count or 0
+    yield {'event': 'started', 'job_id': str(job_id), 'total': total}
+
+    processed = 0
+    summary = {'Lolos': 0, 'Tidak Lolos': 0, 'Needs Review': 0}
+    any_passed = False
+    gemini_cache_hits = 0
+    offset = 0
+
+    with ThreadPoolExecutor(max_workers=download_concurrency) as download_pool, \
+            ThreadPoolExecutor(max_workers=settings.RESCREEN_GEMINI_CONCURRENCY) as gemini_pool:
+        while True:
+            with stage(DB_READ, table='applicants', job_id=str(job_id)):
+                page_response = (
+                    supabase.from_('applicants')
+                    .select('id, name, email, job_id, custom_answers, uploaded_files')
+                    .eq('job_id', str(job_id))
+                    .order('id')
+                    .range(offset, offset + page_size - 1)
+                    .execute()
+                )
+            applicants = page_response.data or []
+            if not applicants:
+                break
+            offset += len(applicants)
+
+            cv_paths = [(a.get('uploaded_files') or [None])[0] for a in applicants]
+            # Download + ekstraksi diukur sebagai satu tahap per halaman
+            with stage(DOWNLOAD, batch=len(cv_paths), includes=EXTRACT):
+                extracted = list(download_pool.map(_download_and_extract, cv_paths))
+            with stage(NLP, batch=len(extracted)):
+                _parse_missing(extracted)
+
+            with stage(ML, batch=len(extracted)):
+                ml_results = get_ai_scores_batch([item['parsed'] for item in extracted], job_data)
+
+            def gemini_for(index):
+                cv_text = extracted[index]['text']
+                if not cv_text:
+                    return None, None, False
+                ml_score = ml_results[index]['score'] if ml_results[index] else 0
+                return get_gemini_score_cached(cv_text=cv_text, job_description=job_data['title'], ml_score=ml_score)
+
+            with stage(LLM, batch=len(applicants)):
+                gemini_results = list(gemini_pool.map(gemini_for, range(len(applicants))))
+            gemini_cache_hits += sum(1 for _score, _reason, from_cache in gemini_results if from_cache)
+
+            rows = []
+            for applicant, item, (ai_score, gemini_reason, _from_cache) in zip(applicants, extracted, gemini_results):
+                if item['error']:
+                    logger.warning(f"[RESCREEN-JOB] Gagal memproses CV pelamar {applicant['id']}: {item['error']}")
+                screening_result = _rescreen_result(job_data, applicant.get('custom_answers'), item['parsed'], ai_score)
+                new_status = screening_result['status']
+                final_score = screening_result.get('final_score')
+                applicant_status = map_screening_status(new_status)
+                summary[new_status if new_status in summary else 'Needs Review'] += 1
+                any_passed = any_passed or new_status == 'Lolos'
+                rows.append({
+                    # Kolom wajib ikut dikirim karena upsert adalah INSERT ... ON CONFLICT
+                    'id': applicant['id'],
+                    'job_id': applicant['job_id'],
+                    'name': applicant['name'],
+                    'email': applicant['email'],
+                    'status': applicant_status,
+                    'auto_screening_status': new_status,
+                    'auto_screening_log': screening_result['log'],
+                    'ai_score': int(round(ai_score)) if ai_score is not None else None,
+                    'final_score': int(round(final_score)) if final_score is not None else None,
+                    'gemini_reason': gemini_reason
+                })
+
+            with stage(DB_WRITE, table='applicants', batch=len(rows)):
+                supabase.from_('applicants').upsert(rows).execute()
+            processed += len(rows)
+            yield {'event': 'progress', 'processed': processed, 'total': total, 'summary': dict(summary),
+                   'gemini_cache_hits': gemini_cache_hits}
+
+            if len(applicants) < page_size:
+                break
+
+    if any_passed:
+        try:
+            request_job_scheduling(job_id)
+        except Exception as e:
+            logger.error(f"Gagal meminta penjadwalan wawancara untuk job {job_id}: {e}")
+
+    yield {'event': 'completed', 'processed': processed, 'total': total, 'summary': summary,
+           'gemini_cache_hits': gemini_cache_hits}
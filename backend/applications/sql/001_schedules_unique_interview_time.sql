@@ -0,0 +1,23 @@
+-- Jalankan sekali di SQL editor Supabase (tabel `schedules` dikelola Supabase, bukan migrasi Django).
+--
+-- Menjamin satu job tidak pernah memiliki dua wawancara pada waktu yang sama, walaupun
+-- beberapa worker menjadwalkan bersamaan. Backend menangkap pelanggaran constraint ini
+-- (kode 23505), membaca ulang jadwal, lalu mengulang alokasi (lihat scheduling_service.py).
+
+-- Hapus duplikat lama lebih dulu: pertahankan satu baris per (job_id, interview_time).
+-- Pelamar yang jadwalnya terhapus dikembalikan ke 'Shortlisted' (auto_screening_status
+-- tetap 'Lolos') sehingga ikut dijadwalkan ulang pada penjadwalan berikutnya.
+WITH removed AS (
+  DELETE FROM schedules s
+  USING schedules d
+  WHERE s.job_id = d.job_id
+    AND s.interview_time = d.interview_time
+    AND s.ctid > d.ctid
+  RETURNING s.applicant_id
+)
+UPDATE applicants
+SET status = 'Shortlisted'
+WHERE id IN (SELECT applicant_id FROM removed);
+
+ALTER TABLE schedules
+  ADD CONSTRAINT schedules_job_interview_time_key UNIQUE (job_id, interview_time);
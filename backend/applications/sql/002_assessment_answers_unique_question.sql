@@ -0,0 +1,14 @@
+-- Jalankan sekali di SQL editor Supabase (tabel `assessment_answers` dikelola Supabase).
+--
+-- submit_assessment menyimpan semua jawaban dengan satu upsert
+-- (on_conflict=applicant_id,question_id), sehingga pasangan itu harus unik.
+
+-- Hapus duplikat lama lebih dulu: pertahankan baris terakhir per (applicant_id, question_id).
+DELETE FROM assessment_answers a
+USING assessment_answers d
+WHERE a.applicant_id = d.applicant_id
+  AND a.question_id = d.question_id
+  AND a.ctid < d.ctid;
+
+ALTER TABLE assessment_answers
+  ADD CONSTRAINT assessment_answers_applicant_question_key UNIQUE (applicant_id, question_id);
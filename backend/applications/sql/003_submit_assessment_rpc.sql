@@ -0,0 +1,63 @@
+-- Jalankan sekali di SQL editor Supabase setelah 002_assessment_answers_unique_question.sql.
+--
+-- submit_assessment (views.py) menilai jawaban di backend lalu memanggil fungsi ini lewat
+-- supabase.rpc('submit_assessment_answers', ...). Seluruh penulisan terjadi dalam satu
+-- transaksi: upsert jawaban, hapus jawaban lama yang tidak lagi dijawab, update status
+-- pelamar, dan simpan respons untuk idempotency key. Submit ulang dengan key yang sama
+-- (retry jaringan, klik ganda) dijawab dari respons yang tersimpan tanpa menulis apa pun.
+
+CREATE TABLE IF NOT EXISTS assessment_submissions (
+  idempotency_key text PRIMARY KEY,
+  applicant_id uuid NOT NULL REFERENCES applicants (id) ON DELETE CASCADE,
+  response jsonb NOT NULL,
+  created_at timestamptz NOT NULL DEFAULT now()
+);
+
+CREATE INDEX IF NOT EXISTS assessment_submissions_applicant_idx
+  ON assessment_submissions (applicant_id);
+
+CREATE OR REPLACE FUNCTION submit_assessment_answers(
+  p_applicant_id uuid,
+  p_idempotency_key text,
+  p_answers jsonb,
+  p_status text,
+  p_response jsonb
+) RETURNS jsonb
+LANGUAGE plpgsql
+AS $$
+DECLARE
+  stored jsonb;
+BEGIN
+  -- Submit bersamaan untuk pelamar yang sama diproses berurutan
+  PERFORM pg_advisory_xact_lock(hashtext('assessment-submit:' || p_applicant_id::text));
+
+  SELECT response INTO stored
+  FROM assessment_submissions
+  WHERE idempotency_key = p_idempotency_key;
+  IF FOUND THEN
+    RETURN jsonb_build_object('replayed', true, 'response', stored);
+  END IF;
+
+  INSERT INTO assessment_answers (applicant_id, question_id, answer, is_correct, score)
+  SELECT p_applicant_id, a.question_id, a.answer, a.is_correct, a.score
+  FROM jsonb_to_recordset(p_answers)
+    AS a(question_id uuid, answer text, is_correct boolean, score integer)
+  ON CONFLICT (applicant_id, question_id) DO UPDATE
+    SET answer = EXCLUDED.answer,
+        is_correct = EXCLUDED.is_correct,
+        score = EXCLUDED.score;
+
+  DELETE FROM assessment_answers
+  WHERE applicant_id = p_applicant_id
+    AND question_id NOT IN (
+      SELECT (value ->> 'question_id')::uuid FROM jsonb_array_elements(p_answers)
+    );
+
+  UPDATE applicants SET status = p_status WHERE id = p_applicant_id;
+
+  INSERT INTO assessment_submissions (idempotency_key, applicant_id, response)
+  VALUES (p_idempotency_key, p_applicant_id, p_response);
+
+  RETURN jsonb_build_object('replayed', false, 'response', p_response);
+END;
+$$;
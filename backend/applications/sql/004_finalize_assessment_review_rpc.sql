@@ -0,0 +1,48 @@
+-- Jalankan sekali di SQL editor Supabase.
+--
+-- review_assessment (POST) memanggil fungsi ini lewat
+-- supabase.rpc('finalize_assessment_review', ...). Semua nilai manual diterapkan
+-- dalam satu UPDATE, lalu SUM(score), COUNT(*) dan ambang lulus (2/3 dari skor
+-- maksimum) dihitung di database dan status pelamar diperbarui pada transaksi yang
+-- sama. Sebelumnya: satu UPDATE per pertanyaan + dua SELECT + satu UPDATE pelamar.
+
+CREATE OR REPLACE FUNCTION finalize_assessment_review(
+  p_applicant_id uuid,
+  p_scores jsonb
+) RETURNS jsonb
+LANGUAGE plpgsql
+AS $$
+DECLARE
+  v_final_score integer;
+  v_total_questions integer;
+  v_status text;
+BEGIN
+  UPDATE assessment_answers a
+  SET score = s.score,
+      is_correct = s.is_correct
+  FROM jsonb_to_recordset(p_scores) AS s(question_id uuid, score integer, is_correct boolean)
+  WHERE a.applicant_id = p_applicant_id
+    AND a.question_id = s.question_id;
+
+  SELECT COALESCE(SUM(score), 0)::integer, COUNT(*)
+  INTO v_final_score, v_total_questions
+  FROM assessment_answers
+  WHERE applicant_id = p_applicant_id;
+
+  v_status := CASE
+    WHEN v_final_score * 3 >= v_total_questions * 100 * 2 THEN 'Lolos Assessment'
+    ELSE 'Gagal Assessment'
+  END;
+
+  UPDATE applicants
+  SET status = v_status,
+      final_score = v_final_score
+  WHERE id = p_applicant_id;
+
+  RETURN jsonb_build_object(
+    'final_score', v_final_score,
+    'total_questions', v_total_questions,
+    'new_status', v_status
+  );
+END;
+$$;
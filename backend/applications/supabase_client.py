@@ -1,4 +1,346 @@
-from supabase import create_client, Client
+# applications/supabase_client.py
+import asyncio
+import contextvars
+import logging
+import os
+import random
+import threading
+import time
+import weakref
+from contextlib import contextmanager
+
+import httpx
 from django.conf import settings
+from postgrest import AsyncPostgrestClient, SyncPostgrestClient
+
+from .metrics import SUPABASE_RETRIES, SUPABASE_ROUND_TRIPS
+
+logger = logging.getLogger(__name__)
+
+IDEMPOTENT_METHODS = frozenset({'GET', 'HEAD', 'OPTIONS'})
+RETRY_STATUSES = frozenset({502, 503, 504})
+# Request belum sampai ke server: aman diulang untuk method apa pun
+CONNECT_ERRORS = (httpx.ConnectError, httpx.ConnectTimeout, httpx.PoolTimeout)
+# Request mungkin sudah diproses server: hanya diulang untuk method idempoten
+READ_ERRORS = (httpx.ReadTimeout, httpx.ReadError, httpx.RemoteProtocolError)
+
+_call_timeout = contextvars.ContextVar('supabase_call_timeout', default=None)
+_round_trips = contextvars.ContextVar('supabase_round_trips', default=None)
+
+
+@contextmanager
+def call_timeout(seconds):
+    """
+    Timeout (detik) khusus untuk panggilan Supabase di dalam blok ini:
+
+        with call_timeout(2):
+            supabase.from_('jobs').select('id').execute()
+    """
+    token = _call_timeout.set(seconds)
+    try:
+        yield
+    finally:
+        _call_timeout.reset(token)
+
+
+class RoundTripCounter:
+    def __init__(self):
+        self.count = 0
+
+
+@contextmanager
+def count_round_trips():
+    """Menghitung round trip HTTP ke Supabase (termasuk retry) di dalam blok ini."""
+    counter = RoundTripCounter()
+    token = _round_trips.set(counter)
+    try:
+        yield counter
+    finally:
+        _round_trips.reset(token)
+
+
+class RetryBudget:
+    """
+    Membatasi retry agar gangguan Supabase tidak dilipatgandakan oleh klien sendiri:
+    setiap request menabung `ratio` token (maksimal `capacity`), setiap retry
+    memakai satu token. Saat token habis request gagal langsung.
+    """
+
+    def __init__(self, ratio, capacity):
+        self.ratio = ratio
+        self.capacity = capacity
+        self._tokens = float(capacity)
+        self._lock = threading.Lock()
+
+    def deposit(self):
+        with self._lock:
+            self._tokens = min(self.capacity, self._tokens + self.ratio)
+
+    def withdraw(self):
+        with self._lock:
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return True
+            return False
+
+
+class _RetryPolicy:
+    """Aturan retry, timeout per panggilan dan hitungan round trip, dipakai transport sync dan async."""
+
+    def __init__(self, transport, budget, max_retries, backoff):
+        self._transport = transport
+        self.budget = budget
+        self.max_retries = max_retries
+        self.backoff = backoff
+
+    def _start(self, request):
+        timeout = _call_timeout.get()
+        if timeout is not None:
+            request.extensions['timeout'] = httpx.Timeout(timeout).as_dict()
+        self.budget.deposit()
+
+    def _count_attempt(self, request):
+        SUPABASE_ROUND_TRIPS.labels(method=request.method).inc()
+        counter = _round_trips.get()
+        if counter is not None:
+            counter.count += 1
+
+    def _may_retry(self, request, attempt, reason, safe):
+        if attempt >= self.max_retries or not (safe or request.method in IDEMPOTENT_METHODS):
+            return False
+        if not self.budget.withdraw():
+            SUPABASE_RETRIES.labels(reason=reason, outcome='budget_exhausted').inc()
+            return False
+        SUPABASE_RETRIES.labels(reason=reason, outcome='retried').inc()
+        return True
+
+    def _retry_reason(self, request, attempt, error=None, response=None):
+        """Alasan retry, atau None bila hasil percobaan ini harus dikembalikan/di-raise."""
+        if error is not None:
+            reason = type(error).__name__
+            return reason if self._may_retry(request, attempt, reason, safe=isinstance(error, CONNECT_ERRORS)) else None
+        if response.status_code not in RETRY_STATUSES:
+            return None
+        reason = str(response.status_code)
+        return reason if self._may_retry(request, attempt, reason, safe=False) else None
+
+    def _delay(self, request, attempt):
+        logger.debug(f"[DB] Retry {attempt} {request.method} {request.url.path}")
+        return self.backoff * 2 ** (attempt - 1) * random.uniform(0.5, 1.5)
+
+
+class PooledTransport(_RetryPolicy, httpx.BaseTransport):
+    """
+    Membungkus httpx.HTTPTransport (pool keep-alive, HTTP/2) dengan timeout per
+    panggilan, retry berbudget dengan backoff, dan penghitung round trip.
+    """
+
+    def handle_request(self, request):
+        self._start(request)
+        attempt = 0
+        while True:
+            self._count_attempt(request)
+            try:
+                response = self._transport.handle_request(request)
+            except CONNECT_ERRORS + READ_ERRORS as e:
+                if not self._retry_reason(request, attempt, error=e):
+                    raise
+            else:
+                if not self._retry_reason(request, attempt, response=response):
+                    return response
+                response.close()
+            attempt += 1
+            time.sleep(self._delay(request, attempt))
+
+    def close(self):
+        self._transport.close()
+
+
+class AsyncPooledTransport(_RetryPolicy, httpx.AsyncBaseTransport):
+    """Versi async PooledTransport untuk view ASGI."""
+
+    async def handle_async_request(self, request):
+        self._start(request)
+        attempt = 0
+        while True:
+            self._count_attempt(request)
+            try:
+                response = await self._transport.handle_async_request(request)
+            except CONNECT_ERRORS + READ_ERRORS as e:
+                if not self._retry_reason(request, attempt, error=e):
+                    raise
+            else:
+                if not self._retry_reason(request, attempt, response=response):
+                    return response
+                await response.aclose()
+            attempt += 1
+            await asyncio.sleep(self._delay(request, attempt))
+
+    async def aclose(self):
+        await self._transport.aclose()
+
+
+def _http2_enabled():
+    if not settings.SUPABASE_HTTP2:
+        return False
+    try:
+        import h2  # noqa: F401
+    except ImportError:
+        logger.warning("[DB] Paket h2 tidak terpasang; koneksi Supabase memakai HTTP/1.1.")
+        return False
+    return True
+
+
+_retry_budget = None
+
+
+def _client_options(transport_class, pooled_class, base_url, headers, timeout):
+    global _retry_budget
+    if _retry_budget is None:
+        _retry_budget = RetryBudget(settings.SUPABASE_RETRY_BUDGET_RATIO, settings.SUPABASE_RETRY_BUDGET_MIN)
+    limits = httpx.Limits(
+        max_connections=settings.SUPABASE_POOL_MAX_CONNECTIONS,
+        max_keepalive_connections=settings.SUPABASE_POOL_MAX_KEEPALIVE,
+        keepalive_expiry=settings.SUPABASE_KEEPALIVE_EXPIRY,
+    )
+    transport = pooled_class(
+        transport_class(http2=_http2_enabled(), limits=limits),
+        budget=_retry_budget,
+        max_retries=settings.SUPABASE_MAX_RETRIES,
+        backoff=settings.SUPABASE_RETRY_BACKOFF,
+    )
+    return {
+        'base_url': base_url,
+        'headers': headers,
+        'timeout': httpx.Timeout(timeout or settings.SUPABASE_TIMEOUT, connect=settings.SUPABASE_CONNECT_TIMEOUT),
+        'transport': transport,
+        'follow_redirects': True,
+    }
+
+
+def build_http_client(base_url='', headers=None, timeout=None):
+    """
+    httpx.Client untuk Supabase (PostgREST, Storage) sesuai setelan SUPABASE_*.
+    Satu client thread-safe per proses; jangan dibagi melewati fork.
+    """
+    return httpx.Client(**_client_options(httpx.HTTPTransport, PooledTransport, base_url, headers, timeout))
+
+
+def build_async_http_client(base_url='', headers=None, timeout=None):
+    """httpx.AsyncClient dengan setelan yang sama; hanya boleh dipakai di event loop pembuatnya."""
+    return httpx.AsyncClient(**_client_options(httpx.AsyncHTTPTransport, AsyncPooledTransport, base_url, headers, timeout))
+
+
+def _rest_config():
+    key = settings.SUPABASE_KEY
+    return f"{settings.SUPABASE_URL.rstrip('/')}/rest/v1", {'apiKey': key, 'Authorization': f"Bearer {key}"}
+
+
+def _create_postgrest():
+    rest_url, headers = _rest_config()
+    http_client = build_http_client(rest_url, headers)
+    try:
+        return SyncPostgrestClient(rest_url, headers=headers, http_client=http_client)
+    except TypeError:
+        # postgrest lama tanpa parameter http_client
+        client = SyncPostgrestClient(rest_url, headers=headers)
+        client.session.close()
+        client.session = http_client
+        return client
+
+
+_local = {'pid': None, 'postgrest': None, 'client': None}
+_lock = threading.Lock()
+
+
+def _for_this_process(name, factory):
+    # Proses hasil fork (gunicorn, worker screening) membuat pool koneksinya sendiri
+    if _local['pid'] != os.getpid():
+        with _lock:
+            if _local['pid'] != os.getpid():
+                _local.update(pid=os.getpid(), postgrest=None, client=None)
+    if _local[name] is None:
+        with _lock:
+            if _local[name] is None:
+                _local[name] = factory()
+    return _local[name]
+
+
+def get_postgrest():
+    return _for_this_process('postgrest', _create_postgrest)
+
+
+def get_client():
+    """Client supabase-py lengkap (auth, storage, functions), dibuat saat pertama dipakai."""
+    from supabase import create_client
+
+    return _for_this_process('client', lambda: create_client(settings.SUPABASE_URL, settings.SUPABASE_KEY))
+
+
+class SupabaseProxy:
+    """
+    Pengganti instance `create_client` global yang dipakai bersama semua view.
+    from_/table/rpc lewat PostgREST client per proses dengan pool httpx sendiri
+    (keep-alive, HTTP/2, timeout, retry berbudget, penghitung round trip); atribut
+    lain diteruskan ke client supabase-py lengkap.
+    """
+
+    def from_(self, table):
+        return get_postgrest().from_(table)
+
+    def table(self, table):
+        return get_postgrest().from_(table)
+
+    def rpc(self, fn, params=None, *args, **kwargs):
+        return get_postgrest().rpc(fn, params or {}, *args, **kwargs)
+
+    def __getattr__(self, name):
+        return getattr(get_client(), name)
+
+
+supabase = SupabaseProxy()
+
+
+# Client async terikat pada event loop pembuatnya (satu loop per worker uvicorn)
+_async_postgrest = weakref.WeakKeyDictionary()
+
+
+def _create_async_postgrest():
+    rest_url, headers = _rest_config()
+    http_client = build_async_http_client(rest_url, headers)
+    try:
+        return AsyncPostgrestClient(rest_url, headers=headers, http_client=http_client)
+    except TypeError:
+        # postgrest lama tanpa parameter http_client; session bawaannya belum pernah
+        # membuka koneksi sehingga cukup diganti (menutupnya butuh await)
+        client = AsyncPostgrestClient(rest_url, headers=headers)
+        client.session = http_client
+        return client
+
+
+def get_async_postgrest():
+    loop = asyncio.get_running_loop()
+    client = _async_postgrest.get(loop)
+    if client is None:
+        client = _async_postgrest[loop] = _create_async_postgrest()
+    return client
+
+
+class AsyncSupabaseProxy:
+    """
+    Padanan `supabase` untuk view async: from_/table/rpc mengembalikan request
+    builder PostgREST async (`await ....execute()`) dengan pool, retry dan hitungan
+    round trip yang sama.
+    """
+
+    def from_(self, table):
+        return get_async_postgrest().from_(table)
+
+    def table(self, table):
+        return get_async_postgrest().from_(table)
+
+    def rpc(self, fn, params=None, *args, **kwargs):
+        return get_async_postgrest().rpc(fn, params or {}, *args, **kwargs)
+
 
-supabase: Client = create_client(settings.SUPABASE_URL, settings.SUPABASE_KEY)
\ No newline at end of file
+async_supabase = AsyncSupabaseProxy()
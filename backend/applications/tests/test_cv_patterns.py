@@ -0,0 +1,34 @@
+import json
+import os
+
+from django.test import SimpleTestCase
+
+from applications import cv_patterns
+
+GOLDEN_FILE = os.path.join(os.path.dirname(os.path.abspath(cv_patterns.__file__)), 'data', 'golden', 'cv_patterns.json')
+
+EXTRACTORS = {
+    'email': cv_patterns.extract_email,
+    'phone_number': cv_patterns.extract_phone,
+    'experience_years': cv_patterns.extract_experience_years,
+    'projects_count': cv_patterns.extract_projects_count,
+}
+
+
+class CVPatternsGoldenTest(SimpleTestCase):
+    """Setiap ekstraktor di cv_patterns harus cocok dengan golden file data/golden/cv_patterns.json."""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        with open(GOLDEN_FILE, 'r') as f:
+            cls.cases = json.load(f)
+
+    def test_golden_file_not_empty(self):
+        self.assertTrue(self.cases)
+
+    def test_extractors_match_golden_file(self):
+        for index, case in enumerate(self.cases):
+            for field, extractor in EXTRACTORS.items():
+                with self.subTest(case=index, field=field):
+                    self.assertEqual(extractor(case['text']), case[field])
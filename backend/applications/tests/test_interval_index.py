@@ -0,0 +1,131 @@
+import random
+from datetime import datetime, timedelta
+
+from django.test import SimpleTestCase
+
+from applications.interval_index import AvailabilityIndex, IntervalIndex
+
+
+def brute_force_free(booked, start, end):
+    return all(end <= b_start or b_end <= start for b_start, b_end in booked)
+
+
+def brute_force_next_free(booked, after, length):
+    candidate = after
+    while not brute_force_free(booked, candidate, candidate + length):
+        candidate += 1
+    return candidate
+
+
+def brute_force_next_slot(booked, slots, after, duration):
+    for slot in slots:
+        if slot >= after and brute_force_free(booked, slot, slot + duration):
+            return slot
+    return None
+
+
+def as_intervals(points):
+    intervals = []
+    for point in sorted(points):
+        if intervals and intervals[-1][1] == point:
+            intervals[-1][1] = point + 1
+        else:
+            intervals.append([point, point + 1])
+    return [tuple(interval) for interval in intervals]
+
+
+class IntervalIndexTest(SimpleTestCase):
+
+    def test_add_merges_overlapping_and_touching_intervals(self):
+        index = IntervalIndex([(10, 20), (20, 30), (25, 40), (50, 60)])
+        self.assertEqual(list(index), [(10, 40), (50, 60)])
+
+    def test_remove_splits_merged_block(self):
+        index = IntervalIndex([(0, 10)])
+        index.remove(3, 5)
+        self.assertEqual(list(index), [(0, 3), (5, 10)])
+
+    def test_rejects_empty_interval(self):
+        with self.assertRaises(ValueError):
+            IntervalIndex().add(5, 5)
+
+    def test_next_free_skips_gaps_shorter_than_length(self):
+        index = IntervalIndex([(0, 10), (12, 20)])
+        self.assertEqual(index.next_free(0, 2), 10)
+        self.assertEqual(index.next_free(0, 3), 20)
+
+    def test_works_with_datetimes(self):
+        start = datetime(2026, 1, 5, 9, 0)
+        hour = timedelta(hours=1)
+        index = IntervalIndex([(start, start + hour)])
+        self.assertFalse(index.is_free(start + hour / 2, start + 2 * hour))
+        self.assertEqual(index.next_free(start, hour), start + hour)
+
+
+class AvailabilityIndexTest(SimpleTestCase):
+
+    def test_panel_booking_blocks_every_resource(self):
+        availability = AvailabilityIndex([0, 10, 20, 30], duration=10)
+        availability.book(0)
+        self.assertEqual(availability.next_free_slot(0, resource='a'), 10)
+        availability.book(10, resource='a')
+        self.assertEqual(availability.next_free_slot(0, resource='a'), 20)
+        self.assertEqual(availability.next_free_slot(0, resource='b'), 10)
+
+    def test_release_frees_slot(self):
+        availability = AvailabilityIndex([0, 10], duration=10)
+        availability.book(0)
+        availability.release(0)
+        self.assertEqual(availability.next_free_slot(0), 0)
+
+
+class IntervalIndexPropertyTest(SimpleTestCase):
+    """
+    Operasi acak dibandingkan dengan model brute force (himpunan titik waktu terisi).
+    Seed tetap agar kegagalan bisa diulang.
+    """
+
+    SEEDS = range(20)
+    CASES_PER_SEED = 25
+    OPERATIONS = 60
+
+    def test_matches_brute_force(self):
+        for seed in self.SEEDS:
+            rng = random.Random(seed)
+            for case in range(self.CASES_PER_SEED):
+                with self.subTest(seed=seed, case=case):
+                    self._run_case(rng)
+
+    def _run_case(self, rng):
+        horizon = rng.choice([50, 200, 1000])
+        duration = rng.randint(1, 10)
+        slots = sorted(rng.sample(range(horizon), k=rng.randint(0, horizon // 2)))
+        index = IntervalIndex()
+        availability = AvailabilityIndex(slots, duration)
+        # Jadwal boleh tumpang tindih; model referensinya himpunan titik terisi
+        occupied = set()
+
+        for _ in range(self.OPERATIONS):
+            start = rng.randrange(horizon)
+            end = start + rng.randint(1, 25)
+            op = rng.random()
+            if op < 0.45:
+                index.add(start, end)
+                availability.book(start, end)
+                occupied.update(range(start, end))
+            elif op < 0.55:
+                index.remove(start, end)
+                availability.release(start, end)
+                occupied.difference_update(range(start, end))
+
+            booked = as_intervals(occupied)
+            self.assertEqual(list(index), booked)
+
+            probe = rng.randrange(horizon)
+            length = rng.randint(1, 15)
+            self.assertEqual(index.is_free(probe, probe + length), brute_force_free(booked, probe, probe + length),
+                             f"is_free({probe}, {probe + length})")
+            self.assertEqual(index.next_free(probe, length), brute_force_next_free(booked, probe, length),
+                             f"next_free({probe}, {length})")
+            self.assertEqual(availability.next_free_slot(probe), brute_force_next_slot(booked, slots, probe, duration),
+                             f"next_free_slot({probe})")
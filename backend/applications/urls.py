@@ -1,15 +1,25 @@
+from django.conf import settings
 from django.urls import path
-from . import views
+from . import async_views, views
+
+# Di bawah ASGI endpoint yang didominasi I/O Supabase memakai versi async (applications/async_views.py)
+io_views = async_views if settings.ASYNC_VIEWS else views
 
 urlpatterns = [
-   path('apply', views.apply, name='apply'),
+   path('apply', io_views.apply, name='apply'),
     path('rescreen-applicant', views.rescreen_applicant, name='rescreen_applicant'),
-    path('jobs/<uuid:job_id>/schedule/', views.auto_schedule_interviews, name='auto-schedule-interviews'),
-    path('auto_schedule_interviews/<uuid:job_id>/', views.auto_schedule_interviews, name='auto_schedule_interviews'),
+    path('applicants/<uuid:applicant_id>/screening-status/', views.screening_status, name='screening_status'),
+    path('parse-cache/stats/', views.parse_cache_stats, name='parse_cache_stats'),
+    path('profiling/stats/', views.profiling_stats, name='profiling_stats'),
+    path('jobs/<uuid:job_id>/rescreen/', views.rescreen_job_applicants, name='rescreen_job_applicants'),
+    path('screening-tasks/<uuid:task_id>/', views.screening_task_status, name='screening_task_status'),
+    path('jobs/<uuid:job_id>/schedule/', io_views.auto_schedule_interviews, name='auto-schedule-interviews'),
+    path('auto_schedule_interviews/<uuid:job_id>/', io_views.auto_schedule_interviews, name='auto_schedule_interviews'),
     path('question-bank/', views.manage_question_bank, name='question_bank'),
     path('assessment-templates/', views.manage_assessment_templates, name='assessment_templates'),
     path('assessment-templates/<uuid:template_id>/questions/', views.add_question_to_template, name='add_question_to_template'),
     path('applicants/<uuid:applicant_id>/review_assessment/', views.review_assessment, name='review_assessment'),
-    path('applicants/<uuid:applicant_id>/submit-assessment/', views.submit_assessment, name='submit_assessment'),
-    path('jobs/<uuid:job_id>/assessment-questions/', views.get_job_assessment_questions, name='get_job_assessment_questions'),
+    path('applicants/<uuid:applicant_id>/submit-assessment/', io_views.submit_assessment, name='submit_assessment'),
+    path('jobs/<uuid:job_id>/assessment-questions/', io_views.get_job_assessment_questions, name='get_job_assessment_questions'),
+    path('jobs/<uuid:job_id>/assessment-questions/invalidate/', views.invalidate_job_assessment_questions, name='invalidate_job_assessment_questions'),
 ]
\ No newline at end of file
@@ -12,5 +12,7 @@ import os
 from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'backend.settings')
+# Endpoint I/O-bound memakai view async (applications/async_views.py)
+os.environ.setdefault('ASYNC_VIEWS', 'true')
 
 application = get_asgi_application()
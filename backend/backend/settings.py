@@ -1,5 +1,9 @@
 from pathlib import Path
 import os
+import time
+
+# Titik awal instrumentasi startup (lihat applications/apps.py)
+STARTUP_STARTED_AT = time.perf_counter()
 from dotenv import load_dotenv
 import dj_database_url
 
@@ -69,6 +73,7 @@ MIDDLEWARE = [
     "django.contrib.auth.middleware.AuthenticationMiddleware",
     "django.contrib.messages.middleware.MessageMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
+    "applications.middleware.SupabaseRoundTripMiddleware",
 ]
 
 ROOT_URLCONF = "backend.urls"
@@ -89,6 +94,13 @@ TEMPLATES = [
 ]
 
 WSGI_APPLICATION = "backend.wsgi.application"
+ASGI_APPLICATION = "backend.asgi.application"
+
+# View async untuk apply, submit asesmen, pertanyaan asesmen dan auto-schedule
+# (applications/async_views.py). Aktif otomatis bila dijalankan lewat backend.asgi
+# (WEB_SERVER_MODE=asgi di gunicorn.conf.py); di bawah WSGI view async justru
+# lebih lambat karena tiap request dibungkus event loop sendiri.
+ASYNC_VIEWS = os.environ.get("ASYNC_VIEWS", "false").lower() == "true"
 
 # --------------------------------------------------
 # Database
@@ -132,4 +144,200 @@ DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
 SUPABASE_URL = os.environ.get("SUPABASE_URL")
 SUPABASE_KEY = os.environ.get("SUPABASE_SERVICE_KEY") or os.environ.get(
     "SUPABASE_ANON_KEY"
-)
\ No newline at end of file
+)
+
+# Pool httpx per proses untuk PostgREST/Storage (applications/supabase_client.py)
+SUPABASE_TIMEOUT = float(os.environ.get("SUPABASE_TIMEOUT", "10"))
+SUPABASE_CONNECT_TIMEOUT = float(os.environ.get("SUPABASE_CONNECT_TIMEOUT", "5"))
+SUPABASE_HTTP2 = os.environ.get("SUPABASE_HTTP2", "true").lower() == "true"
+SUPABASE_POOL_MAX_CONNECTIONS = int(os.environ.get("SUPABASE_POOL_MAX_CONNECTIONS", "20"))
+SUPABASE_POOL_MAX_KEEPALIVE = int(os.environ.get("SUPABASE_POOL_MAX_KEEPALIVE", "10"))
+SUPABASE_KEEPALIVE_EXPIRY = float(os.environ.get("SUPABASE_KEEPALIVE_EXPIRY", "30"))
+# Retry untuk error koneksi (semua method) serta timeout baca dan 502/503/504 (GET/HEAD).
+# Setiap request menabung SUPABASE_RETRY_BUDGET_RATIO token, maksimal
+# SUPABASE_RETRY_BUDGET_MIN; satu retry memakai satu token.
+SUPABASE_MAX_RETRIES = int(os.environ.get("SUPABASE_MAX_RETRIES", "2"))
+SUPABASE_RETRY_BACKOFF = float(os.environ.get("SUPABASE_RETRY_BACKOFF", "0.2"))
+SUPABASE_RETRY_BUDGET_RATIO = float(os.environ.get("SUPABASE_RETRY_BUDGET_RATIO", "0.1"))
+SUPABASE_RETRY_BUDGET_MIN = int(os.environ.get("SUPABASE_RETRY_BUDGET_MIN", "10"))
+# Request dengan round trip sebanyak ini atau lebih dicatat sebagai peringatan (0 = mati)
+SUPABASE_ROUND_TRIP_WARN = int(os.environ.get("SUPABASE_ROUND_TRIP_WARN", "10"))
+
+# --------------------------------------------------
+# Download CV dari Supabase Storage (applications/cv_storage.py)
+# --------------------------------------------------
+# STORAGE_ENDPOINT opsional, misalnya "http://localhost:8766" untuk server palsu
+# `manage.py run_fake_storage`; default "<SUPABASE_URL>/storage/v1".
+STORAGE_ENDPOINT = os.environ.get("STORAGE_ENDPOINT")
+STORAGE_TIMEOUT = float(os.environ.get("STORAGE_TIMEOUT", "30"))
+# Batas keras byte yang diunduh per CV; lebih dari ini CVTooLarge
+CV_MAX_BYTES = int(os.environ.get("CV_MAX_BYTES", str(10 * 1024 * 1024)))
+# Di atas ukuran ini spool dipindah dari memori ke file sementara (dibaca lewat mmap)
+CV_SPOOL_BYTES = int(os.environ.get("CV_SPOOL_BYTES", str(1024 * 1024)))
+# Bila aktif, file lebih besar dari CV_RANGE_THRESHOLD dibaca per blok CV_RANGE_BLOCK
+# lewat HTTP Range. Default mati: pypdf (strict=False) memeriksa header setiap objek
+# saat membuka dokumen, sehingga hampir semua blok tetap diambil dan jumlah round
+# trip justru naik. Ukur dulu dengan `manage.py benchmark_cv_download`.
+CV_RANGE_READS = os.environ.get("CV_RANGE_READS", "false").lower() == "true"
+CV_RANGE_THRESHOLD = int(os.environ.get("CV_RANGE_THRESHOLD", str(2 * 1024 * 1024)))
+CV_RANGE_BLOCK = int(os.environ.get("CV_RANGE_BLOCK", str(64 * 1024)))
+
+# --------------------------------------------------
+# Screening queue
+# --------------------------------------------------
+# "database": task disimpan di tabel ScreeningTask dan diproses oleh
+#             `manage.py run_screening_workers` (lihat Procfile).
+# "inprocess": task dijalankan di thread pool dalam web process (development).
+SCREENING_QUEUE_BACKEND = os.environ.get("SCREENING_QUEUE_BACKEND", "database")
+SCREENING_QUEUE_VISIBILITY_TIMEOUT = int(os.environ.get("SCREENING_QUEUE_VISIBILITY_TIMEOUT", "300"))
+SCREENING_QUEUE_MAX_ATTEMPTS = int(os.environ.get("SCREENING_QUEUE_MAX_ATTEMPTS", "3"))
+SCREENING_QUEUE_RETRY_DELAY = int(os.environ.get("SCREENING_QUEUE_RETRY_DELAY", "30"))
+SCREENING_QUEUE_INPROCESS_WORKERS = int(os.environ.get("SCREENING_QUEUE_INPROCESS_WORKERS", "2"))
+# --------------------------------------------------
+# CV parse cache (teks CV + hasil parse_cv_text, key = SHA-256 file)
+# --------------------------------------------------
+CV_PARSE_CACHE_DIR = os.environ.get("CV_PARSE_CACHE_DIR", str(BASE_DIR / ".cache" / "cv_parse"))
+CV_PARSE_CACHE_MEMORY_BYTES = int(os.environ.get("CV_PARSE_CACHE_MEMORY_BYTES", str(32 * 1024 * 1024)))
+CV_PARSE_CACHE_DISK_BYTES = int(os.environ.get("CV_PARSE_CACHE_DISK_BYTES", str(512 * 1024 * 1024)))
+
+# --------------------------------------------------
+# Pool ekstraksi dokumen (applications/extraction_service.py)
+# --------------------------------------------------
+# "process": ekstraksi PDF/DOCX + NER di ProcessPoolExecutor; "inline": di thread pemanggil
+EXTRACTION_MODE = os.environ.get("EXTRACTION_MODE", "process")
+EXTRACTION_WORKERS = int(os.environ.get("EXTRACTION_WORKERS", "2"))
+# Proses anak diganti setelah sekian dokumen (butuh Python >= 3.11)
+EXTRACTION_MAX_TASKS_PER_CHILD = int(os.environ.get("EXTRACTION_MAX_TASKS_PER_CHILD", "50"))
+# Batas per dokumen di proses anak, dihitung sejak dokumen mulai diproses (detik):
+# wall-clock (SIGALRM) dan waktu CPU (RLIMIT_CPU)
+EXTRACTION_TIMEOUT = float(os.environ.get("EXTRACTION_TIMEOUT", "60"))
+EXTRACTION_CPU_SECONDS = int(os.environ.get("EXTRACTION_CPU_SECONDS", "30"))
+# Dokumen yang boleh menunggu/berjalan sekaligus; pemanggil berikutnya menunggu slot
+# paling lama EXTRACTION_SLOT_TIMEOUT detik lalu gagal dengan ExtractionBusy
+EXTRACTION_MAX_PENDING = int(os.environ.get("EXTRACTION_MAX_PENDING", "16"))
+EXTRACTION_SLOT_TIMEOUT = float(os.environ.get("EXTRACTION_SLOT_TIMEOUT", "30"))
+
+# --------------------------------------------------
+# Rescreen massal per job (jobs/<job_id>/rescreen/)
+# --------------------------------------------------
+RESCREEN_PAGE_SIZE = int(os.environ.get("RESCREEN_PAGE_SIZE", "100"))
+# Rescreen berjalan di worker antrean (task 'job_rescreen'); CV satu halaman didownload
+# paralel, ekstraksinya tetap lewat pool ekstraksi bersama (EXTRACTION_*)
+RESCREEN_DOWNLOAD_CONCURRENCY = int(os.environ.get("RESCREEN_DOWNLOAD_CONCURRENCY", "4"))
+RESCREEN_GEMINI_CONCURRENCY = int(os.environ.get("RESCREEN_GEMINI_CONCURRENCY", "4"))
+
+# Batch NER (parse_cv_texts / nlp.pipe) untuk rescreen massal
+NLP_BATCH_SIZE = int(os.environ.get("NLP_BATCH_SIZE", "32"))
+NLP_N_PROCESS = int(os.environ.get("NLP_N_PROCESS", "1"))
+
+# --------------------------------------------------
+# Penjadwalan wawancara otomatis (applications/scheduling_service.py)
+# --------------------------------------------------
+# Jumlah id per bulk update status pelamar (filter `in` dikirim lewat URL)
+SCHEDULING_UPDATE_CHUNK = int(os.environ.get("SCHEDULING_UPDATE_CHUNK", "500"))
+# Berapa kali alokasi diulang bila bulk insert melanggar unique (job_id, interview_time)
+SCHEDULING_CONFLICT_RETRIES = int(os.environ.get("SCHEDULING_CONFLICT_RETRIES", "3"))
+# "incremental": pelamar yang baru lolos langsung diberi slot setelah cursor job;
+# "full": setiap kelulusan memicu penjadwalan ulang seluruh job (lewat antrean).
+SCHEDULING_MODE = os.environ.get("SCHEDULING_MODE", "incremental")
+
+# --------------------------------------------------
+# Profiling per tahap service layer (applications/profiling.py)
+# --------------------------------------------------
+# Dotted path ke callable hook(stage, detik, context), dipisah koma. Default mengumpulkan
+# agregat per proses (lihat /api/profiling/stats/) dan histogram Prometheus (/metrics);
+# tambahkan "applications.profiling.log_stage" untuk satu baris log per tahap.
+PROFILING_HOOKS = [
+    path.strip()
+    for path in os.environ.get(
+        "PROFILING_HOOKS", "applications.profiling.stage_stats,applications.metrics.observe_stage"
+    ).split(",")
+    if path.strip()
+]
+
+# --------------------------------------------------
+# Metrik Prometheus multi-proses (applications/metrics.py)
+# --------------------------------------------------
+# Setiap proses menulis metriknya ke PROMETHEUS_MULTIPROC_DIR dan scrape menjumlahkan
+# semuanya. gunicorn.conf.py mengisi direktori untuk worker web (/metrics);
+# Procfile mengisi direktori terpisah untuk worker screening, yang diekspor oleh
+# run_screening_workers di SCREENING_METRICS_PORT (0 = mati). prometheus_client
+# membaca variabel ini saat diimport, jadi harus di-set sebelum Django dimuat.
+PROMETHEUS_MULTIPROC_DIR = os.environ.get("PROMETHEUS_MULTIPROC_DIR", "")
+if PROMETHEUS_MULTIPROC_DIR:
+    os.makedirs(PROMETHEUS_MULTIPROC_DIR, exist_ok=True)
+SCREENING_METRICS_PORT = int(os.environ.get("SCREENING_METRICS_PORT", "9101"))
+# /metrics di domain aplikasi hanya dilayani bila salah satu diisi (selain itu 404):
+# METRICS_TOKEN dikirim scraper sebagai "Authorization: Bearer <token>";
+# METRICS_ALLOWED_IPS berisi IP/CIDR dipisah koma, dicocokkan dengan REMOTE_ADDR
+# (alamat koneksi langsung, bukan X-Forwarded-For yang bisa dipalsukan).
+METRICS_TOKEN = os.environ.get("METRICS_TOKEN", "")
+METRICS_ALLOWED_IPS = [ip.strip() for ip in os.environ.get("METRICS_ALLOWED_IPS", "").split(",") if ip.strip()]
+
+# --------------------------------------------------
+# Cache Django (dipakai bersama semua proses gunicorn di host yang sama)
+# --------------------------------------------------
+CACHES = {
+    "default": {
+        "BACKEND": os.environ.get("DJANGO_CACHE_BACKEND", "django.core.cache.backends.filebased.FileBasedCache"),
+        "LOCATION": os.environ.get("DJANGO_CACHE_LOCATION", str(BASE_DIR / ".cache" / "django")),
+    }
+}
+# Daftar pertanyaan asesmen per job (applications/assessment_questions.py). Job yang
+# diubah langsung lewat Supabase baru terlihat setelah TTL ini, kecuali frontend
+# memanggil jobs/<job_id>/assessment-questions/invalidate/.
+ASSESSMENT_QUESTIONS_CACHE_TTL = int(os.environ.get("ASSESSMENT_QUESTIONS_CACHE_TTL", "300"))
+
+# --------------------------------------------------
+# Penilaian asesmen (applications/assessment_grading.py)
+# --------------------------------------------------
+# "exact": MULTIPLE_CHOICE bernilai 100 hanya bila set pilihan sama persis dengan solusi;
+# "partial": nilai sebanding pilihan benar dikurangi pilihan salah (minimal 0).
+ASSESSMENT_MULTIPLE_CHOICE_SCORING = os.environ.get("ASSESSMENT_MULTIPLE_CHOICE_SCORING", "exact")
+# Bila RPC submit_assessment_answers (applications/sql/003_*.sql) belum dibuat:
+# "true" menyimpan jawaban tanpa transaksi dan tanpa idempotensi (dicatat sebagai
+# error dan metrik roxy_rpc_fallbacks_total); "false" menolak submit (fail closed).
+ASSESSMENT_SUBMIT_RPC_FALLBACK = os.environ.get("ASSESSMENT_SUBMIT_RPC_FALLBACK", "true").lower() == "true"
+
+# --------------------------------------------------
+# Gemini client (lihat applications/gemini_client.py)
+# --------------------------------------------------
+# GEMINI_API_ENDPOINT opsional, misalnya "http://localhost:8765" untuk server palsu
+# `manage.py run_fake_llm` saat mengukur latensi secara offline.
+GEMINI_MODEL_NAME = os.environ.get("GEMINI_MODEL_NAME", "gemini-1.5-flash")
+GEMINI_MAX_CONCURRENCY = int(os.environ.get("GEMINI_MAX_CONCURRENCY", "4"))
+GEMINI_TIMEOUT = float(os.environ.get("GEMINI_TIMEOUT", "30"))
+GEMINI_MAX_RETRIES = int(os.environ.get("GEMINI_MAX_RETRIES", "3"))
+GEMINI_BACKOFF_BASE = float(os.environ.get("GEMINI_BACKOFF_BASE", "0.5"))
+
+# Cache jawaban Gemini (lihat applications/llm_cache.py). Backend lain bisa
+# dipasang lewat dotted path, misalnya "applications.llm_cache.MemoryBackend".
+LLM_CACHE_ENABLED = os.environ.get("LLM_CACHE_ENABLED", "true").lower() == "true"
+LLM_CACHE_BACKEND = os.environ.get("LLM_CACHE_BACKEND", "applications.llm_cache.SQLiteBackend")
+LLM_CACHE_PATH = os.environ.get("LLM_CACHE_PATH", str(BASE_DIR / ".cache" / "llm_cache.sqlite3"))
+LLM_CACHE_TTL = int(os.environ.get("LLM_CACHE_TTL", str(7 * 24 * 3600)))
+LLM_CACHE_MAX_ENTRIES = int(os.environ.get("LLM_CACHE_MAX_ENTRIES", "20000"))
+
+# --------------------------------------------------
+# Logging
+# --------------------------------------------------
+# Hanya sebagian (LOG_SAMPLE_RATE, 0..1) log INFO/DEBUG yang ditulis; WARNING ke atas
+# selalu ditulis. Tingkat log diatur lewat APP_LOG_LEVEL.
+LOG_SAMPLE_RATE = float(os.environ.get("LOG_SAMPLE_RATE", "1.0"))
+
+LOGGING = {
+    "version": 1,
+    "disable_existing_loggers": False,
+    "filters": {
+        "sampled": {"()": "applications.log_sampling.SamplingFilter", "rate": LOG_SAMPLE_RATE},
+    },
+    "handlers": {
+        "console": {"class": "logging.StreamHandler", "filters": ["sampled"]},
+    },
+    "loggers": {
+        "applications": {
+            "handlers": ["console"],
+            "level": os.environ.get("APP_LOG_LEVEL", "INFO"),
+        },
+    },
+}
@@ -17,7 +17,10 @@ Including another URLconf
 from django.contrib import admin
 from django.urls import path, include
 
+from applications import views as application_views
+
 urlpatterns = [
     path('admin/', admin.site.urls),
+    path('metrics', application_views.metrics, name='metrics'),
     path('api/', include('applications.urls')), 
 ]
@@ -0,0 +1,56 @@
+# backend/gunicorn.conf.py
+# Dipakai lewat Procfile: gunicorn -c gunicorn.conf.py
+import os
+
+bind = f"0.0.0.0:{os.environ.get('PORT', '8000')}"
+workers = int(os.environ.get("WEB_CONCURRENCY", "2"))
+# Worker yang tidak merespons lebih lama dari ini dibunuh master. Pekerjaan panjang
+# (screening, rescreen satu job) berjalan di worker antrean, bukan di request web.
+timeout = int(os.environ.get("WEB_TIMEOUT", "30"))
+
+# "wsgi": worker sync biasa (satu request per worker).
+# "asgi": worker uvicorn dengan view async untuk endpoint I/O-bound; satu worker
+# melayani banyak request yang sedang menunggu Supabase. Bandingkan keduanya
+# dengan `manage.py load_test`.
+if os.environ.get("WEB_SERVER_MODE", "wsgi").lower() == "asgi":
+    wsgi_app = "backend.asgi:application"
+    worker_class = "uvicorn.workers.UvicornWorker"
+else:
+    wsgi_app = "backend.wsgi:application"
+
+# Metrik semua worker dijumlahkan lewat file di direktori ini (applications/metrics.py);
+# harus di-set sebelum aplikasi dimuat (preload_app).
+os.environ.setdefault("PROMETHEUS_MULTIPROC_DIR", "/tmp/roxy-metrics/web")
+
+# Muat aplikasi (dan model, lihat when_ready) di master sebelum fork agar memori
+# model spaCy/joblib dibagi ke semua worker lewat copy-on-write.
+preload_app = True
+
+
+def on_starting(server):
+    # Nilai dari run sebelumnya tidak boleh ikut dijumlahkan
+    from applications.metrics import clear_multiprocess_dir
+
+    clear_multiprocess_dir(os.environ["PROMETHEUS_MULTIPROC_DIR"])
+
+
+def when_ready(server):
+    if os.environ.get("PRELOAD_MODELS", "true").lower() != "true":
+        return
+    from applications.model_registry import preload
+
+    timings = preload()
+    server.log.info(f"[STARTUP] Model dimuat sebelum fork: {timings}")
+
+
+def post_fork(server, worker):
+    # Koneksi database yang mungkin dibuka master tidak boleh dipakai bersama worker
+    from django.db import connections
+
+    connections.close_all()
+
+
+def child_exit(server, worker):
+    from applications.metrics import mark_process_dead
+
+    mark_process_dead(worker.pid)
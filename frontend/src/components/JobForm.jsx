@@ -237,6 +237,10 @@ export default function JobForm({ onClose, onJobAdded, jobToEdit }) {
             });
           }
 
+        // Job disimpan langsung ke Supabase: minta backend membuang cache pertanyaan asesmennya
+        if (jobToEdit) {
+            await axios.post(`https://roxycareers-production.up.railway.app/api/jobs/${jobId}/assessment-questions/invalidate/`);
+        }
 
         // 5. Jalankan penjadwalan otomatis jika diperlukan
         if (jobResponse.data[0].recruitment_process_type === 'interview_scheduling') {